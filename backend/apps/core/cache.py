@@ -0,0 +1,129 @@
+"""
+Caching helpers shared by the apps.
+
+``canonical_json`` serializes a payload deterministically, so every worker
+process derives the same cache key or digest from it (unlike ``hash()``,
+which is salted per process). ``select_fields`` picks the inputs a cached
+value actually depends on.
+
+``TwoTierCache`` keeps a small per-process LRU in front of the shared Django
+cache (Redis in production) and counts hits and misses for each tier.
+Subclasses can bound the LRU by another measure than entry count (see
+``weigh``), read its size from settings (see ``maxsize``) or keep entries
+local only (see ``use_shared``).
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def canonical_json(payload: Any) -> str:
+    """Serialize ``payload`` deterministically (sorted keys, no whitespace)."""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder)
+
+
+def select_fields(data: Optional[Dict[str, Any]], fields: Iterable[str]) -> Dict[str, Any]:
+    """Return the subset of ``data`` that is present and not None."""
+    data = data or {}
+    return {field: data[field] for field in fields if data.get(field) is not None}
+
+
+class TwoTierCache:
+    """Per-process LRU backed by the shared Django cache."""
+
+    def __init__(self, name: str, timeout: int = 3600, maxsize: int = 1024):
+        self.name = name
+        self.timeout = timeout
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'sets': 0}
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum total weight of the local tier."""
+        return self._maxsize
+
+    @property
+    def use_shared(self) -> bool:
+        """Whether entries are also stored in the shared Django cache."""
+        return True
+
+    def weigh(self, value: Any) -> int:
+        """Return how much of ``maxsize`` ``value`` uses (one per entry by default)."""
+        return 1
+
+    def _discard(self, key: str):
+        """Drop ``key`` from the local tier; the lock must be held."""
+        _, _, weight = self._entries.pop(key)
+        self._weight -= weight
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _remember(self, key: str, value: Any):
+        """Store ``value`` in the local tier, evicting the least recently used entry."""
+        weight = self.weigh(value)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + self.timeout, value, weight)
+            self._weight += weight
+            while self._weight > self.maxsize and self._entries:
+                self._discard(next(iter(self._entries)))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None, checking the local tier first."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counters['local_hits'] += 1
+                    return value
+                self._discard(key)
+
+        value = cache.get(key) if self.use_shared else None
+        if value is None:
+            self._count('misses')
+            return None
+
+        self._count('shared_hits')
+        self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store ``value`` in both tiers."""
+        if self.use_shared:
+            cache.set(key, value, self.timeout)
+        self._remember(key, value)
+        self._count('sets')
+
+    def clear_local(self):
+        """Drop the local tier (the shared cache is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def reset_stats(self):
+        with self._lock:
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the hit rate for this process."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['local_size'] = len(self._entries)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else None
+        return stats
@@ -0,0 +1,85 @@
+"""
+HTTP caching for dataset endpoints.
+
+University responses only change when a new dataset version becomes active,
+so their validators are derived without touching DuckDB:
+
+* ``ETag`` - digest of the active version, the request path and the
+  normalized query parameters.
+* ``Last-Modified`` - when the active version's files were curated.
+
+``cache_by_dataset_version`` answers a matching ``If-None-Match`` or
+``If-Modified-Since`` with 304 before the view runs, and marks successful
+responses ``public`` for ``DATASET_HTTP_MAX_AGE`` seconds so a CDN or reverse
+proxy can serve repeats and revalidate cheaply once they go stale.
+"""
+
+import functools
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .engine import get_engine
+
+# Responses that may be stored and revalidated; errors are never cached
+CACHEABLE_STATUSES = (200, 304)
+
+
+def normalized_query(request) -> str:
+    """
+    Return the query string with parameters sorted and empty values dropped.
+
+    ``?country=US&q=mit`` and ``?q=mit&country=US&has_rank=`` normalize to the
+    same string, so they share an ETag.
+    """
+    items = []
+    for name in sorted(request.GET.keys()):
+        values = sorted(value for value in request.GET.getlist(name) if value != '')
+        items.extend(f"{name}={value}" for value in values)
+    return '&'.join(items)
+
+
+def request_digest(request) -> str:
+    """Return a digest of the active dataset version, path and normalized query."""
+    engine = get_engine()
+    payload = '\n'.join((engine.version, str(engine.dataset_path), request.path, normalized_query(request)))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def dataset_etag(request, *args, **kwargs) -> str:
+    """Return a weak ETag for ``request`` against the active dataset version."""
+    return f'W/"{request_digest(request)[:32]}"'
+
+
+def dataset_last_modified(request, *args, **kwargs) -> Optional[datetime]:
+    """Return when the active dataset version was curated."""
+    return get_engine().modified_at
+
+
+def cache_by_dataset_version(view):
+    """
+    Add dataset-version validators and ``Cache-Control`` to a GET view.
+
+    Must wrap the DRF view (i.e. go above ``@api_view``) so 304s are
+    returned before authentication, validation or any query runs.
+    """
+    conditional_view = condition(etag_func=dataset_etag, last_modified_func=dataset_last_modified)(view)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code in CACHEABLE_STATUSES:
+            patch_cache_control(response, public=True, max_age=getattr(settings, 'DATASET_HTTP_MAX_AGE', 300))
+        else:
+            # Never let a client revalidate an error into a 304
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response.headers[header]
+            patch_cache_control(response, no_store=True)
+        return response
+
+    return wrapper
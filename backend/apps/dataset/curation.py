@@ -0,0 +1,222 @@
+"""
+Row-level curation steps and their multi-process execution.
+
+``clean_institutions`` is the cleaning step of the ``curate`` command:
+coordinates, typed counts and the ``normalized_name`` used to match
+rankings. ``curate_shards`` runs it, together with search tokenization, on
+shards of the raw rows in a process pool (``curate --workers N``).
+
+Rows are dealt to shards round-robin by input row, so shards are the same
+size whatever the countries. Shard outputs are put back in input order, so
+the result does not depend on the number of workers. This module does not
+import Django, so spawned workers only load Polars and the search helpers.
+
+``record_hashes`` and ``diff_records`` support ``curate --incremental``: a
+version stores a digest of every raw record, and the next version only
+cleans the records whose digest is new.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from .search import search_tokens_expr, with_words
+
+# Affixes dropped by normalized_name (the prefix group may match nothing)
+NAME_PREFIX_PATTERN = r'^(the |university of |)'
+NAME_SUFFIX_PATTERN = r'( university| college| institute| school| tech| technological)$'
+
+
+def normalized_name(name):
+    """
+    Normalize institution names for matching, as a Polars expression.
+
+    Lowercases, drops a leading "the " or "university of " and a trailing
+    institution kind, removes punctuation and collapses whitespace. Nulls
+    become ''.
+    """
+    return (
+        name.str.to_lowercase()
+        .str.replace(NAME_PREFIX_PATTERN, '')
+        .str.replace(NAME_SUFFIX_PATTERN, '')
+        .str.replace_all(r'[^\w\s]', '')
+        .str.strip_chars()
+        .str.replace_all(r'\s+', ' ')
+        .fill_null('')
+    )
+
+
+def coordinate(df, field):
+    """
+    Return the ``geo_<field>`` coordinate of each institution as an expression.
+
+    Uses the ``geo_latitude``/``geo_longitude`` columns when the input has
+    them, else reads ``field`` from the ``geo`` column, which is a struct
+    when the source was JSON and a JSON string when it was CSV.
+    """
+    schema = df.collect_schema()
+    column = f'geo_{field}'
+    if column in schema:
+        return pl.col(column).cast(pl.Float64, strict=False)
+    if 'geo' not in schema:
+        return pl.lit(None, dtype=pl.Float64)
+
+    geo_type = schema['geo']
+    if isinstance(geo_type, pl.Struct):
+        if field not in [f.name for f in geo_type.fields]:
+            return pl.lit(None, dtype=pl.Float64)
+        value = pl.col('geo').struct.field(field)
+    else:
+        value = pl.col('geo').cast(pl.Utf8).str.json_path_match(f'$.{field}')
+    return value.cast(pl.Float64, strict=False)
+
+
+def clean_institutions(df):
+    """Clean and normalize raw institutions (a DataFrame or LazyFrame)."""
+
+    # Extract geographic coordinates
+    df = df.with_columns([
+        coordinate(df, 'latitude').alias('geo_latitude'),
+        coordinate(df, 'longitude').alias('geo_longitude'),
+    ])
+
+    # Create search-friendly name
+    df = df.with_columns([
+        pl.col('display_name').fill_null('').alias('display_name'),
+        pl.col('canonical_name').fill_null('').alias('canonical_name'),
+    ])
+
+    # Ensure numeric fields are properly typed
+    df = df.with_columns([
+        pl.col('works_count').cast(pl.Int64, strict=False).fill_null(0),
+        pl.col('cited_by_count').cast(pl.Int64, strict=False).fill_null(0),
+    ])
+
+    # Create a normalized name for matching
+    return df.with_columns([
+        normalized_name(pl.col('display_name')).alias('normalized_name')
+    ])
+
+
+@contextmanager
+def process_pool(processes: int):
+    """
+    Yield a ``ProcessPoolExecutor`` of ``processes`` spawned workers.
+
+    Workers are spawned rather than forked, so none inherits Polars' thread
+    pool mid-operation, and each starts with ``POLARS_MAX_THREADS`` sized so
+    together they use the CPU count instead of oversubscribing it.
+    """
+    previous = os.environ.get('POLARS_MAX_THREADS')
+    os.environ['POLARS_MAX_THREADS'] = str(max(1, (os.cpu_count() or 1) // processes))
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+            yield executor
+    finally:
+        if previous is None:
+            os.environ.pop('POLARS_MAX_THREADS', None)
+        else:
+            os.environ['POLARS_MAX_THREADS'] = previous
+
+
+def curate_shard(shard: pl.DataFrame) -> Tuple[pl.DataFrame, float]:
+    """
+    Clean one shard of raw institutions and tokenize its names for search.
+
+    Returns the shard with ``search_tokens`` added and the seconds it took.
+    """
+    started = time.perf_counter()
+    cleaned = clean_institutions(shard)
+    cleaned = with_words(cleaned, 'display_name', '_words').with_columns(
+        search_tokens_expr(pl.col('_words')).alias('search_tokens')
+    ).drop('_words')
+    return cleaned, time.perf_counter() - started
+
+
+def curate_shards(raw: pl.DataFrame, workers: int) -> Tuple[pl.DataFrame, List[Dict[str, Any]]]:
+    """
+    Run ``curate_shard`` over ``workers`` shards of ``raw`` in a process pool.
+
+    Returns the cleaned institutions with ``search_tokens``, in the order of
+    ``raw``, and each shard's row count and timing.
+    """
+    raw = raw.with_row_index('_shard_row')
+    if workers > 1:
+        shards = raw.with_columns((pl.col('_shard_row') % workers).alias('_shard')).partition_by(
+            '_shard', include_key=False, maintain_order=True
+        )
+    else:
+        shards = [raw]
+
+    if len(shards) <= 1:
+        results = [curate_shard(shard) for shard in shards]
+    else:
+        with process_pool(len(shards)) as executor:
+            results = list(executor.map(curate_shard, shards))
+
+    timings = [
+        {'shard': index, 'rows': cleaned.height, 'seconds': round(seconds, 3)}
+        for index, (cleaned, seconds) in enumerate(results)
+    ]
+    cleaned = pl.concat([cleaned for cleaned, _ in results]).sort('_shard_row').drop('_shard_row')
+    return cleaned, timings
+
+
+def record_hashes(raw: pl.DataFrame) -> pl.Series:
+    """
+    Return a stable digest of every raw record as the ``record_hash`` Series.
+
+    Columns are taken in name order and nulls are told apart from empty
+    strings, so a record keeps its digest across dumps unless one of its
+    values (or the set of columns) changes.
+    """
+    columns = sorted(raw.columns)
+    rows = raw.select(
+        pl.concat_str(
+            [pl.col(column).cast(pl.Utf8).fill_null('\x00') for column in columns],
+            separator='\x1f'
+        )
+    ).to_series()
+    digests = [hashlib.blake2b(row.encode('utf-8'), digest_size=16).hexdigest() for row in rows]
+    return pl.Series('record_hash', digests, dtype=pl.Utf8)
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """Return the SHA-256 of the file at ``path``, or None if it does not exist."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def diff_records(current: pl.DataFrame, base: pl.DataFrame) -> Dict[str, Any]:
+    """
+    Compare the ``id`` and ``record_hash`` columns of two versions.
+
+    Returns the sorted ``added``, ``removed`` and ``modified`` ids and the
+    number of ``unchanged`` records.
+    """
+    joined = current.select(['id', 'record_hash']).join(
+        base.select(['id', 'record_hash']), on='id', how='full', suffix='_base', coalesce=True
+    )
+    current_hash, base_hash = pl.col('record_hash'), pl.col('record_hash_base')
+
+    def ids(condition):
+        return joined.filter(condition)['id'].sort().to_list()
+
+    return {
+        'added': ids(base_hash.is_null()),
+        'removed': ids(current_hash.is_null()),
+        'modified': ids(current_hash.is_not_null() & base_hash.is_not_null() & (current_hash != base_hash)),
+        'unchanged': joined.filter(current_hash == base_hash).height,
+    }
@@ -0,0 +1,93 @@
+"""
+Keyset (cursor) pagination for university search.
+
+Every search ordering is a list of sort keys ending in ``id``, so rows are
+totally ordered. A page's cursor holds the ordering and the sort key values
+of its last row; the next page asks for rows that sort after those values
+instead of skipping an offset, so DuckDB never materializes earlier pages.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON array.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Tuple
+
+# Sort keys of each search ordering: (column, 'ASC' | 'DESC'). NULLs sort last.
+SEARCH_ORDERINGS = {
+    'display_name': [('display_name', 'ASC')],
+    'country': [('country_code', 'ASC'), ('display_name', 'ASC')],
+    'rank': [('webometrics_rank', 'ASC')],
+    'works_count': [('works_count', 'DESC')],
+    'relevance': [('relevance', 'DESC'), ('display_name', 'ASC')],
+    'distance': [('distance_km', 'ASC')],
+}
+
+
+def ordering_keys(ordering: str) -> List[Tuple[str, str]]:
+    """Return the sort keys for ``ordering``, including the ``id`` tiebreaker."""
+    return SEARCH_ORDERINGS[ordering] + [('id', 'ASC')]
+
+
+def order_by_clause(ordering: str) -> str:
+    """Return the ORDER BY expression list for ``ordering``."""
+    return ', '.join(f"{column} {direction} NULLS LAST" for column, direction in ordering_keys(ordering))
+
+
+def encode_cursor(ordering: str, row: Dict[str, Any]) -> str:
+    """Return the cursor for the page that starts after ``row``."""
+    values = [row[column] for column, _ in ordering_keys(ordering)]
+    payload = json.dumps([ordering, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[Any]]:
+    """
+    Return ``(ordering, values)`` from a cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ordering, values = json.loads(payload)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if ordering not in SEARCH_ORDERINGS or not isinstance(values, list) or len(values) != len(ordering_keys(ordering)):
+        raise ValueError("Invalid cursor")
+    return ordering, values
+
+
+def keyset_condition(ordering: str, values: List[Any]) -> Tuple[str, List[Any]]:
+    """
+    Return a WHERE condition selecting rows that sort after ``values``.
+
+    Built key by key: a row comes after the cursor if its first key sorts
+    after the cursor's, or is equal and the remaining keys sort after. With
+    NULLS LAST, any NULL sorts after a value and a NULL cursor key is only
+    followed by NULLs.
+    """
+    keys = ordering_keys(ordering)
+
+    def after(position: int) -> Tuple[str, List[Any]]:
+        column, direction = keys[position]
+        value = values[position]
+        last = position == len(keys) - 1
+        comparison = '>' if direction == 'ASC' else '<'
+
+        if value is None:
+            if last:
+                return 'FALSE', []
+            rest, rest_params = after(position + 1)
+            return f"({column} IS NULL AND {rest})", rest_params
+
+        if last:
+            return f"({column} {comparison} ? OR {column} IS NULL)", [value]
+        rest, rest_params = after(position + 1)
+        return (
+            f"({column} {comparison} ? OR ({column} = ? AND {rest}) OR {column} IS NULL)",
+            [value, value] + rest_params
+        )
+
+    return after(0)
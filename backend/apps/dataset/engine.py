@@ -0,0 +1,411 @@
+"""
+Process-wide DuckDB engine for the curated university dataset.
+
+Each worker process keeps a single engine per active dataset version. The
+institutions table is loaded once when the engine is first used (attached
+read-only from ``institutions.duckdb`` when ``curate`` produced one, else
+copied from ``institutions.parquet`` into memory) together with the name
+search and autocomplete indexes and the memory-mapped scoring features, and
+every thread gets its own cursor on the shared database.
+When the ``current`` version pointer changes, the new version is built in
+the background and swapped in without interrupting queries on the old one.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+from django.conf import settings
+from django.utils import timezone
+
+from .features import FEATURE_IDS_FILE, FEATURES_FILE, FeatureMatrix
+from .geo import GeoIndex
+from .search import SearchIndex
+from .suggest import TERMS_FILE, TRIGRAMS_FILE, SuggestIndex
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetEngine:
+    """DuckDB database holding the tables for one dataset version."""
+
+    def __init__(self, version: str, dataset_path: Path):
+        self.version = version
+        self.dataset_path = dataset_path
+        self.storage = None
+        self.search_index: Optional[SearchIndex] = None
+        self.suggest_index: Optional[SuggestIndex] = None
+        self.feature_matrix: Optional[FeatureMatrix] = None
+        self.geo_index: Optional[GeoIndex] = None
+        self._connection = None
+        self._load_lock = threading.Lock()
+        self._local = threading.local()
+        self._cursors = []
+        self._lease_lock = threading.Lock()
+        self._leases = 0
+        self._retired = False
+        self._modified_at = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True once the institutions table has been loaded."""
+        return self._connection is not None
+
+    @property
+    def is_retired(self) -> bool:
+        """Return True once a newer version has replaced this engine."""
+        return self._retired
+
+    @property
+    def modified_at(self) -> Optional[datetime]:
+        """
+        Return when this version's institutions files were written, or None.
+
+        Curated files never change after ``curate``, so this is only read
+        from disk once, and does not load the tables.
+        """
+        if self._modified_at is None:
+            mtimes = []
+            for filename in ('institutions.duckdb', 'institutions.parquet'):
+                try:
+                    mtimes.append((self.dataset_path / filename).stat().st_mtime)
+                except OSError:
+                    continue
+            if mtimes:
+                self._modified_at = datetime.fromtimestamp(max(mtimes), tz=dt_timezone.utc)
+        return self._modified_at
+
+    def load(self):
+        """Load the institutions table into a fresh in-memory database (once)."""
+        if self._connection is not None:
+            return
+
+        with self._load_lock:
+            if self._connection is not None:
+                return
+            if self._retired:
+                raise RuntimeError(f"Dataset version {self.version} has been retired")
+
+            database_path = self.dataset_path / 'institutions.duckdb'
+            institutions_path = self.dataset_path / 'institutions.parquet'
+            if not database_path.exists() and not institutions_path.exists():
+                raise FileNotFoundError(f"Institutions dataset not found: {institutions_path}")
+
+            connection = duckdb.connect(":memory:")
+            try:
+                memory_limit = getattr(settings, 'DUCKDB_MEMORY_LIMIT', '2GB')
+                threads = getattr(settings, 'DUCKDB_THREADS', 4)
+
+                connection.execute(f"SET memory_limit='{memory_limit}'")
+                connection.execute(f"SET threads={threads}")
+
+                if database_path.exists():
+                    # Curated database: attached read-only so every worker
+                    # process shares the file's pages through the OS cache.
+                    connection.execute(f"ATTACH '{database_path}' AS dataset (READ_ONLY)")
+                    connection.execute("CREATE VIEW institutions AS SELECT * FROM dataset.institutions")
+                    self.storage = 'duckdb'
+                else:
+                    connection.execute(f"""
+                        CREATE TABLE institutions AS
+                        SELECT * FROM read_parquet('{institutions_path}')
+                    """)
+                    self.storage = 'parquet'
+            except Exception:
+                connection.close()
+                raise
+
+            search_index_path = self.dataset_path / 'search_index.parquet'
+            if search_index_path.exists():
+                try:
+                    self.search_index = SearchIndex.from_parquet(search_index_path)
+                except Exception as e:
+                    connection.close()
+                    raise RuntimeError(f"Error building search index: {e}") from e
+
+            if (self.dataset_path / TERMS_FILE).exists() and (self.dataset_path / TRIGRAMS_FILE).exists():
+                try:
+                    self.suggest_index = SuggestIndex.from_parquet(self.dataset_path)
+                except Exception as e:
+                    connection.close()
+                    raise RuntimeError(f"Error loading suggest index: {e}") from e
+
+            if (self.dataset_path / FEATURES_FILE).exists() and (self.dataset_path / FEATURE_IDS_FILE).exists():
+                try:
+                    self.feature_matrix = FeatureMatrix.from_files(self.dataset_path)
+                except Exception as e:
+                    connection.close()
+                    raise RuntimeError(f"Error loading feature matrix: {e}") from e
+
+            self._connection = connection
+            logger.info(f"Loaded dataset version {self.version} from {self.storage} files in {self.dataset_path}")
+
+    def features(self) -> FeatureMatrix:
+        """Return the feature matrix, computing it from the table if curate did not write a current one."""
+        self.load()
+        if self.feature_matrix is None:
+            with self._load_lock:
+                if self.feature_matrix is None:
+                    cursor = self._connection.cursor()
+                    try:
+                        frame = cursor.execute("SELECT * FROM institutions").pl()
+                    finally:
+                        cursor.close()
+                    self.feature_matrix = FeatureMatrix.from_frame(frame)
+                    logger.info(f"Computed feature matrix for dataset version {self.version}")
+        return self.feature_matrix
+
+    def geo(self) -> GeoIndex:
+        """Return the spatial index, building it from the feature matrix on first use."""
+        if self.geo_index is None:
+            features = self.features()
+            with self._load_lock:
+                if self.geo_index is None:
+                    self.geo_index = GeoIndex.from_features(features)
+        return self.geo_index
+
+    def cursor(self):
+        """Return this thread's cursor on the shared database."""
+        self.load()
+
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._connection.cursor()
+            self._local.cursor = cursor
+            with self._lease_lock:
+                self._cursors.append(cursor)
+        return cursor
+
+    def acquire(self) -> bool:
+        """
+        Register an in-flight user of this engine.
+
+        Returns False if the engine has been retired, in which case the
+        caller should switch to the currently active engine.
+        """
+        with self._lease_lock:
+            if self._retired:
+                return False
+            self._leases += 1
+            return True
+
+    def release(self):
+        """Release a lease taken with ``acquire``."""
+        with self._lease_lock:
+            self._leases -= 1
+            drained = self._retired and self._leases == 0
+        if drained:
+            self.close()
+
+    def retire(self):
+        """Stop accepting new leases and close once in-flight queries drain."""
+        with self._lease_lock:
+            self._retired = True
+            drained = self._leases == 0
+        if drained:
+            self.close()
+
+    def close(self):
+        """Close the underlying database and all cursors derived from it."""
+        with self._lease_lock:
+            cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            cursor.close()
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            logger.info(f"Closed dataset version {self.version}")
+
+
+class EngineRegistry:
+    """
+    Tracks the active dataset engine for this process.
+
+    When the ``current`` pointer moves to a new version, the new engine is
+    built on a background thread while the old one keeps serving. Once the
+    build finishes the active reference is swapped, and the old engine is
+    retired so its tables are freed after in-flight queries drain. A version
+    that fails to build is retried after ``DATASET_ENGINE_RETRY_SECONDS``, or
+    once the pointer file is rewritten.
+    """
+
+    def __init__(self):
+        self._active: Optional[DatasetEngine] = None
+        self._pending: Optional[DatasetEngine] = None
+        self._failed_path: Optional[Path] = None
+        self._failed_pointer = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.last_swap = {}
+        self.last_error = None
+
+    def get_engine(self) -> DatasetEngine:
+        """Return the active engine, scheduling a swap if the version changed."""
+        base_path = get_base_path()
+        version = read_current_version(base_path)
+        dataset_path = base_path / 'curated' / version
+
+        active = self._active
+        if active is not None and active.dataset_path == dataset_path:
+            return active
+
+        with self._lock:
+            active = self._active
+            if active is not None and active.dataset_path == dataset_path:
+                return active
+
+            if active is None or not active.is_loaded:
+                # Nothing is being served yet, so switch immediately and
+                # let the first query load the tables.
+                self._active = DatasetEngine(version, dataset_path)
+                if active is not None:
+                    active.retire()
+                return self._active
+
+            if self._pending is None and self._should_build(dataset_path):
+                self._start_build(active, DatasetEngine(version, dataset_path))
+
+            return active
+
+    def _should_build(self, dataset_path: Path) -> bool:
+        """Return False while ``dataset_path`` recently failed and the pointer is unchanged."""
+        if dataset_path != self._failed_path or _pointer_state['stat'] != self._failed_pointer:
+            return True
+        retry_seconds = getattr(settings, 'DATASET_ENGINE_RETRY_SECONDS', 60)
+        return time.monotonic() - self._failed_at >= retry_seconds
+
+    def _start_build(self, active: DatasetEngine, engine: DatasetEngine):
+        """Build ``engine`` in the background and swap it in when ready."""
+        self._pending = engine
+        requested_at = time.perf_counter()
+        logger.info(f"Building dataset version {engine.version} to replace {active.version}")
+
+        thread = threading.Thread(
+            target=self._build,
+            args=(engine, requested_at),
+            name=f'dataset-engine-{engine.version}',
+            daemon=True,
+        )
+        thread.start()
+
+    def _build(self, engine: DatasetEngine, requested_at: float):
+        """Load ``engine`` and atomically make it the active engine."""
+        try:
+            engine.load()
+        except Exception as e:
+            logger.error(f"Error building dataset version {engine.version}: {e}")
+            engine.close()
+            with self._lock:
+                self._pending = None
+                self._failed_path = engine.dataset_path
+                self._failed_pointer = _pointer_state['stat']
+                self._failed_at = time.monotonic()
+                self.last_error = str(e)
+                self._idle.notify_all()
+            return
+
+        built_at = time.perf_counter()
+        with self._lock:
+            previous = self._active
+            self._active = engine
+            self._pending = None
+            self._failed_path = None
+            self.last_error = None
+            self.last_swap = {
+                'from_version': previous.version if previous else None,
+                'to_version': engine.version,
+                'build_ms': round((built_at - requested_at) * 1000, 2),
+                'latency_ms': round((time.perf_counter() - requested_at) * 1000, 2),
+                'swapped_at': timezone.now().isoformat(),
+            }
+            if previous is not None:
+                previous.retire()
+            self._idle.notify_all()
+
+        logger.info(f"Swapped dataset version {self.last_swap['from_version']} -> {engine.version}")
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no build is pending; returns False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending is None, timeout)
+
+    def status(self) -> dict:
+        """Return active/pending versions and the last swap for health checks."""
+        with self._lock:
+            active, pending = self._active, self._pending
+            return {
+                'active_version': active.version if active else None,
+                'pending_version': pending.version if pending else None,
+                'swap_latency_ms': self.last_swap.get('latency_ms'),
+                'last_swap': dict(self.last_swap),
+                'last_error': self.last_error,
+            }
+
+    def reset(self):
+        """Close the active engine and forget all swap state."""
+        self.wait_until_idle()
+        with self._lock:
+            active, self._active = self._active, None
+            self._failed_path = None
+            self.last_swap = {}
+            self.last_error = None
+        if active is not None:
+            active.close()
+
+
+registry = EngineRegistry()
+_pointer_state = {'path': None, 'stat': None, 'version': None}
+
+
+def get_base_path() -> Path:
+    """Return the dataset base directory from settings."""
+    return Path(getattr(settings, 'DATASET_BASE_PATH', '/data'))
+
+
+def read_current_version(base_path: Path) -> str:
+    """
+    Return the active dataset version.
+
+    The ``current`` pointer file is only re-read when its mtime or size
+    changes, so checking it on every request costs a single ``stat``.
+    """
+    current_file = base_path / 'current'
+
+    try:
+        file_stat = current_file.stat()
+        stat_key = (file_stat.st_mtime_ns, file_stat.st_size)
+    except OSError:
+        stat_key = None
+
+    if stat_key is not None:
+        if _pointer_state['path'] == current_file and _pointer_state['stat'] == stat_key:
+            return _pointer_state['version']
+
+        try:
+            with open(current_file, 'r') as f:
+                version = f.read().strip()
+            if version:
+                _pointer_state.update(path=current_file, stat=stat_key, version=version)
+                return version
+        except Exception as e:
+            logger.warning(f"Error reading current version file: {e}")
+
+    # Fallback to environment variable
+    return getattr(settings, 'DATASET_CURRENT_VERSION', '2025.09')
+
+
+def get_engine() -> DatasetEngine:
+    """Return the engine for the active dataset version."""
+    return registry.get_engine()
+
+
+def reset_engine():
+    """Drop the process-wide engine so the next request starts cold."""
+    registry.reset()
+    _pointer_state.update(path=None, stat=None, version=None)
@@ -0,0 +1,91 @@
+"""
+Facet counts for university search.
+
+``DatasetService.search_universities_with_facets`` counts the universities
+matching a search by country, ranked vs unranked and research output
+(``works_count``) bucket. The counts are one ``GROUPING SETS`` aggregate over
+the matched rows in the same DuckDB statement that reads the result page,
+and are cached per dataset version and filters, so paging through results or
+re-opening the facet panel only reads the page.
+"""
+
+import hashlib
+from typing import Any, Dict, List
+
+from apps.core.cache import canonical_json
+
+# Lower bounds of the works_count buckets
+WORKS_COUNT_BUCKETS = (0, 1000, 10000, 50000, 100000)
+
+# GROUPING(country_code, ranked, works_bucket) of each grouping set
+_COUNTRY_SET, _RANKED_SET, _WORKS_SET = 0b011, 0b101, 0b110
+
+
+def bucket_label(index: int) -> str:
+    """Return the label of works_count bucket ``index`` (e.g. ``1000-9999``)."""
+    lower = WORKS_COUNT_BUCKETS[index]
+    if index == len(WORKS_COUNT_BUCKETS) - 1:
+        return f"{lower}+"
+    return f"{lower}-{WORKS_COUNT_BUCKETS[index + 1] - 1}"
+
+
+def facet_ctes(source: str) -> str:
+    """
+    Return CTEs aggregating ``source`` into a single ``facet_list`` row.
+
+    ``facet_list.facets`` is a list of structs, one per facet value.
+    """
+    buckets = ' '.join(
+        f"WHEN works_count >= {lower} THEN {index}"
+        for index, lower in reversed(list(enumerate(WORKS_COUNT_BUCKETS)))
+    )
+    return f"""
+        facet_counts AS (
+            SELECT
+                GROUPING(country_code, ranked, works_bucket) AS grouping_set,
+                country_code,
+                ranked,
+                works_bucket,
+                count(*) AS matches
+            FROM (
+                SELECT
+                    country_code,
+                    webometrics_rank IS NOT NULL AS ranked,
+                    CASE {buckets} ELSE 0 END AS works_bucket
+                FROM {source}
+            )
+            GROUP BY GROUPING SETS ((country_code), (ranked), (works_bucket))
+        ),
+        facet_list AS (
+            SELECT list(struct_pack(grouping_set, country_code, ranked, works_bucket, matches)) AS facets
+            FROM facet_counts
+        )
+    """
+
+
+def parse_facets(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Turn ``facet_list.facets`` into value/count lists, largest first."""
+    facets = {'country': [], 'has_rank': [], 'works_count': []}
+    for row in rows or []:
+        if row['grouping_set'] == _COUNTRY_SET:
+            facets['country'].append({'value': row['country_code'], 'count': row['matches']})
+        elif row['grouping_set'] == _RANKED_SET:
+            facets['has_rank'].append({'value': row['ranked'], 'count': row['matches']})
+        elif row['grouping_set'] == _WORKS_SET:
+            facets['works_count'].append({'value': bucket_label(row['works_bucket']), 'count': row['matches']})
+
+    for name in ('country', 'has_rank'):
+        facets[name].sort(key=lambda facet: (-facet['count'], str(facet['value'])))
+    # Buckets keep their natural order, empty ones included
+    counts = {facet['value']: facet['count'] for facet in facets['works_count']}
+    facets['works_count'] = [
+        {'value': bucket_label(index), 'count': counts.get(bucket_label(index), 0)}
+        for index in range(len(WORKS_COUNT_BUCKETS))
+    ]
+    return facets
+
+
+def facet_cache_key(version: str, filters: Dict[str, Any]) -> str:
+    """Return the cache key for the facets of ``filters`` in dataset ``version``."""
+    digest = hashlib.sha256(canonical_json(filters).encode('utf-8')).hexdigest()
+    return f"dataset:facets:{version}:{digest}"
@@ -0,0 +1,226 @@
+"""
+Precomputed per-institution scoring features.
+
+``curate`` writes two files next to the curated dataset:
+
+* ``features.npy`` - a float32 matrix with one row per feature and one
+  column per institution, so each feature is contiguous and the file can be
+  memory-mapped by every worker process.
+* ``features_ids.parquet`` - the institution id and country code of each
+  column.
+
+The scoring features are percentiles in [0, 1] over the whole dataset rather
+than ratios against fixed constants, so they stay spread out however large
+the institutions are. Geographic coordinates are stored alongside in degrees
+(NaN when unknown) and never enter the score.
+
+Scoring a request is then one matrix-vector product of the weight vector
+with the score rows, plus a boost for columns in preferred countries,
+followed by a partial sort for the top results (see ``scoring``).
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+FEATURES_FILE = 'features.npy'
+FEATURE_IDS_FILE = 'features_ids.parquet'
+
+# Institution columns the features are computed from
+FEATURE_COLUMNS = [
+    'id', 'country_code', 'works_count', 'cited_by_count', 'webometrics_rank', 'geo_latitude', 'geo_longitude'
+]
+
+FEATURE_NAMES = ('research_activity', 'citation_impact', 'rank_percentile', 'latitude', 'longitude')
+
+# Features that enter the score, mapped to the weight that scales each
+SCORE_WEIGHTS = {
+    'research_activity': 'research_activity',
+    'citation_impact': 'citation_impact',
+    'rank_percentile': 'ranking',
+}
+
+
+def _column(df: pl.DataFrame, name: str) -> pl.Expr:
+    """Return column ``name`` as a float expression (all null if missing)."""
+    if name in df.columns:
+        return pl.col(name).cast(pl.Float64, strict=False)
+    return pl.lit(None, dtype=pl.Float64)
+
+
+def _percentile(values: pl.Expr) -> pl.Expr:
+    """
+    Percentile of each value among the non-null values, in [0, 1].
+
+    The smallest value maps to 0 and ties share the lower percentile; nulls
+    map to 0.
+    """
+    ranks = values.rank('min')
+    count = values.count()
+    return (
+        pl.when(values.is_null()).then(0.0)
+        .when(count > 1).then((ranks - 1) / (count - 1))
+        .otherwise(1.0)
+    )
+
+
+def build_feature_matrix(df: pl.DataFrame) -> Tuple[List[str], List[Optional[str]], np.ndarray]:
+    """
+    Compute the feature matrix for curated institutions.
+
+    Returns:
+        Tuple of (institution ids, their country codes, float32 matrix of
+        shape ``(len(FEATURE_NAMES), len(ids))``)
+    """
+    works = _column(df, 'works_count')
+    citations = _column(df, 'cited_by_count')
+    impact = pl.when(works > 0).then(citations / works).otherwise(None)
+    rank = _column(df, 'webometrics_rank')
+
+    features = df.select([
+        _percentile(works.fill_null(0.0)).alias('research_activity'),
+        _percentile(impact).alias('citation_impact'),
+        # Best rank maps to 1, the worst to 1 / ranked count, unranked to 0
+        pl.when(rank.is_null()).then(0.0)
+        .otherwise(1.0 - (rank.rank('min') - 1) / rank.count())
+        .alias('rank_percentile'),
+        _column(df, 'geo_latitude').alias('latitude'),
+        _column(df, 'geo_longitude').alias('longitude'),
+    ])
+
+    matrix = np.ascontiguousarray(features.to_numpy().T, dtype=np.float32)
+    countries = df['country_code'].to_list() if 'country_code' in df.columns else [None] * df.height
+    return df['id'].to_list(), countries, matrix
+
+
+def write_feature_matrix(df: pl.DataFrame, output_dir: Path) -> Dict[str, int]:
+    """Build the feature matrix for ``df`` and write it to ``output_dir``."""
+    ids, countries, matrix = build_feature_matrix(df)
+
+    features_file = output_dir / FEATURES_FILE
+    temp_file = output_dir / f'.{FEATURES_FILE}.{os.getpid()}'
+    with open(temp_file, 'wb') as f:
+        np.save(f, matrix)
+    pl.DataFrame(
+        {'id': ids, 'country_code': countries},
+        schema={'id': pl.Utf8, 'country_code': pl.Utf8}
+    ).write_parquet(output_dir / FEATURE_IDS_FILE)
+    # Replace atomically so a worker never maps a half-written file
+    os.replace(temp_file, features_file)
+
+    return {'institutions': len(ids), 'bytes': features_file.stat().st_size}
+
+
+class FeatureMatrix:
+    """Memory-mapped feature matrix with id-to-column and country lookups."""
+
+    def __init__(self, ids: List[str], countries: List[Optional[str]], matrix: np.ndarray):
+        if matrix.shape != (len(FEATURE_NAMES), len(ids)) or len(countries) != len(ids):
+            raise ValueError(
+                f"Feature matrix has shape {matrix.shape} for {len(countries)} countries, "
+                f"expected {(len(FEATURE_NAMES), len(ids))}"
+            )
+        self.ids = ids
+        self.matrix = matrix
+        self._columns = {institution_id: column for column, institution_id in enumerate(ids)}
+        # Each column's country as an index into the distinct codes
+        codes = [(country or '').upper() for country in countries]
+        self._country_codes, self._country_index = np.unique(np.array(codes, dtype=object), return_inverse=True)
+
+    @classmethod
+    def from_files(cls, dataset_path: Path) -> Optional['FeatureMatrix']:
+        """
+        Map the matrix written by ``write_feature_matrix``.
+
+        Returns None for matrices written before country codes were stored.
+        """
+        columns = pl.read_parquet(dataset_path / FEATURE_IDS_FILE)
+        if 'country_code' not in columns.columns:
+            return None
+        matrix = np.load(dataset_path / FEATURES_FILE, mmap_mode='r')
+        features = cls(columns['id'].to_list(), columns['country_code'].to_list(), matrix)
+        logger.info(f"Mapped feature matrix for {features.size} institutions")
+        return features
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> 'FeatureMatrix':
+        """Compute the matrix in memory (datasets curated before it was written)."""
+        return cls(*build_feature_matrix(df))
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def feature(self, name: str) -> np.ndarray:
+        """Return one feature for every institution."""
+        return self.matrix[FEATURE_NAMES.index(name)]
+
+    def columns_for(self, ids: Iterable[str]) -> np.ndarray:
+        """Return the matrix columns of ``ids`` (ids without features are skipped)."""
+        columns = self._columns
+        return np.fromiter((columns[i] for i in ids if i in columns), dtype=np.int64)
+
+    def country_mask(self, countries: Iterable[str]) -> np.ndarray:
+        """Return a mask of the columns whose country is one of ``countries``."""
+        wanted = np.isin(self._country_codes, [country.upper() for country in countries])
+        return wanted[self._country_index]
+
+    def scores(
+        self,
+        weights: np.ndarray,
+        offset: float = 0.0,
+        columns: Optional[np.ndarray] = None,
+        countries: Iterable[str] = (),
+        country_boost: float = 0.0
+    ) -> np.ndarray:
+        """
+        Return ``weights @ score features + offset`` for every (or the given) institution.
+
+        Institutions in one of ``countries`` get ``country_boost`` on top.
+        """
+        block = self.matrix[:len(SCORE_WEIGHTS)]
+        if columns is not None:
+            block = block[:, columns]
+        scores = weights @ block + np.float32(offset)
+
+        countries = list(countries)
+        if countries and country_boost:
+            mask = self.country_mask(countries)
+            if columns is not None:
+                mask = mask[columns]
+            scores += np.float32(country_boost) * mask
+        return scores
+
+    def top(
+        self,
+        weights: np.ndarray,
+        limit: int,
+        offset: float = 0.0,
+        columns: Optional[np.ndarray] = None,
+        countries: Iterable[str] = (),
+        country_boost: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the ``limit`` best scoring institutions as ``(id, score)``, best first.
+
+        Equal scores keep dataset order.
+        """
+        scores = self.scores(weights, offset, columns, countries, country_boost)
+        if columns is None:
+            columns = np.arange(self.size)
+        if limit <= 0 or not len(columns):
+            return []
+
+        if limit < len(scores):
+            best = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.lexsort((columns[best], -scores[best]))]
+
+        return [(self.ids[columns[i]], float(scores[i])) for i in best]
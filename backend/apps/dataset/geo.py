@@ -0,0 +1,181 @@
+"""
+Geographic proximity queries over institution coordinates.
+
+``GeoIndex`` buckets every institution with coordinates into a grid of
+``CELL_DEGREES`` cells and sorts them by cell, so the institutions of a run
+of adjacent cells in one grid row are a contiguous slice found with a binary
+search. A radius or bounding-box query only visits the cells it overlaps,
+then computes exact (vectorized haversine) distances for those candidates.
+Nearest-N queries widen a search radius until it holds N institutions.
+
+The index is built once per dataset version from the coordinates in the
+feature matrix (see ``features``).
+"""
+
+import logging
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from .features import FeatureMatrix
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Half the Earth's circumference; every point is within this distance
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+CELL_DEGREES = 1.0
+
+# First radius tried by ``nearest``, quadrupled until enough institutions are found
+NEAREST_START_KM = 50.0
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Return great-circle distances in km from ``(lat, lon)`` to each point."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lats - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lats) * np.sin((lons - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """Grid index over institution coordinates."""
+
+    def __init__(self, ids, latitudes: np.ndarray, longitudes: np.ndarray, cell_degrees: float = CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.rows = int(math.ceil(180.0 / cell_degrees))
+        self.cols = int(math.ceil(360.0 / cell_degrees))
+
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        located = np.flatnonzero(
+            np.isfinite(latitudes) & np.isfinite(longitudes)
+            & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+        )
+
+        cells = self._row(latitudes[located]) * self.cols + self._col(longitudes[located])
+        order = np.argsort(cells, kind='stable')
+
+        self._ids = ids
+        self._members = located[order]
+        self._cells = cells[order]
+        self._latitudes = latitudes[self._members]
+        self._longitudes = longitudes[self._members]
+
+    @classmethod
+    def from_features(cls, features: FeatureMatrix) -> 'GeoIndex':
+        """Build the index from the coordinates in the feature matrix."""
+        index = cls(features.ids, features.feature('latitude'), features.feature('longitude'))
+        logger.info(f"Built geo index with {index.size} located institutions")
+        return index
+
+    @property
+    def size(self) -> int:
+        return len(self._members)
+
+    def _row(self, latitudes):
+        return np.minimum(((np.asarray(latitudes) + 90.0) // self.cell_degrees).astype(np.int64), self.rows - 1)
+
+    def _col(self, longitudes):
+        return np.minimum(((np.asarray(longitudes) + 180.0) // self.cell_degrees).astype(np.int64), self.cols - 1)
+
+    def _positions(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Return index positions in the cells overlapping a box (``west > east`` wraps)."""
+        first_row, last_row = int(self._row(max(south, -90.0))), int(self._row(min(north, 90.0)))
+        west_col, east_col = int(self._col(west)), int(self._col(east))
+        col_ranges = [(west_col, east_col)] if west <= east else [(west_col, self.cols - 1), (0, east_col)]
+
+        bounds = []
+        for row in range(first_row, last_row + 1):
+            for first_col, last_col in col_ranges:
+                bounds.append((row * self.cols + first_col, row * self.cols + last_col + 1))
+        if not bounds:
+            return np.empty(0, dtype=np.int64)
+
+        bounds = np.array(bounds, dtype=np.int64)
+        starts = np.searchsorted(self._cells, bounds[:, 0])
+        stops = np.searchsorted(self._cells, bounds[:, 1])
+        return np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return ``(columns, distances_km)`` of institutions within ``radius_km``.
+
+        Columns index the feature matrix; results are nearest first.
+        """
+        lat_delta = radius_km / KM_PER_DEGREE
+        south, north = lat - lat_delta, lat + lat_delta
+        widest = max(abs(south), abs(north))
+        if north >= 90 or south <= -90 or widest >= 89.9:
+            west, east = -180.0, 180.0
+        else:
+            lon_delta = lat_delta / math.cos(math.radians(widest))
+            if lon_delta >= 180:
+                west, east = -180.0, 180.0
+            else:
+                west = (lon - lon_delta + 180.0) % 360.0 - 180.0
+                east = (lon + lon_delta + 180.0) % 360.0 - 180.0
+
+        positions = self._positions(south, west, north, east)
+        distances = haversine_km(lat, lon, self._latitudes[positions], self._longitudes[positions])
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+
+        order = np.lexsort((self._members[positions], distances))
+        return self._members[positions[order]], distances[order]
+
+    def within_bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        origin: Optional[Tuple[float, float]] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Return ``(columns, distances_km)`` of institutions inside a bounding box.
+
+        A box with ``west > east`` crosses the antimeridian. Distances are
+        measured from ``origin`` (nearest first) when given, else None.
+        """
+        positions = self._positions(south, west, north, east)
+        latitudes, longitudes = self._latitudes[positions], self._longitudes[positions]
+        inside = (latitudes >= south) & (latitudes <= north)
+        if west <= east:
+            inside &= (longitudes >= west) & (longitudes <= east)
+        else:
+            inside &= (longitudes >= west) | (longitudes <= east)
+        positions = positions[inside]
+
+        if origin is None:
+            return np.sort(self._members[positions]), None
+
+        distances = haversine_km(origin[0], origin[1], self._latitudes[positions], self._longitudes[positions])
+        order = np.lexsort((self._members[positions], distances))
+        return self._members[positions[order]], distances[order]
+
+    def nearest(self, lat: float, lon: float, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(columns, distances_km)`` of the ``count`` nearest institutions."""
+        radius = NEAREST_START_KM
+        while True:
+            columns, distances = self.within_radius(lat, lon, radius)
+            # Everything outside the radius is further than everything inside
+            if len(columns) >= count or radius >= MAX_DISTANCE_KM:
+                return columns[:count], distances[:count]
+            radius = min(radius * 4, MAX_DISTANCE_KM)
+
+    def hits_table(self, columns: np.ndarray, distances: Optional[np.ndarray]) -> pa.Table:
+        """Return query results as an Arrow table of ``(id, distance_km)``."""
+        return pa.table({
+            'id': pa.array([self._ids[column] for column in columns], type=pa.string()),
+            'distance_km': pa.array(distances if distances is not None else [None] * len(columns), type=pa.float64()),
+        })
@@ -0,0 +1,107 @@
+"""
+Readiness checks for the health endpoints.
+
+``/api/livez/`` only proves the process answers requests. ``/api/readyz/``
+(and ``/api/healthz/``) also checks the dataset and the database:
+
+* The dataset check loads the active version and runs the stats aggregate
+  of ``DatasetService.validate_dataset``. Its result is kept per dataset
+  version, so after the first probe of a version it costs nothing; a failed
+  check is retried on the next probe.
+* The database check runs ``SELECT 1``.
+
+Both run concurrently on a small thread pool and are each given
+``HEALTH_CHECK_TIMEOUT`` seconds. A check that overruns is reported as timed
+out while it keeps running in the background, so a slow dependency cannot
+stall the probe, and a dataset check that finishes late is cached for the
+next probe.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.db import connection
+
+from .engine import get_engine
+from .services import DatasetService
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-check')
+_dataset_checks: Dict[tuple, Future] = {}
+_lock = threading.Lock()
+
+
+def _validate_dataset() -> Dict[str, Any]:
+    result = DatasetService().validate_dataset()
+    if not result.get('valid'):
+        raise RuntimeError(result.get('error') or 'Dataset is not valid')
+    return result
+
+
+def _check_database() -> Dict[str, Any]:
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        # Pool threads never see request_finished, so close explicitly
+        connection.close()
+    return {}
+
+
+def dataset_check() -> Future:
+    """Return the (possibly still running) dataset check for the active version."""
+    engine = get_engine()
+    key = (engine.version, engine.dataset_path)
+    with _lock:
+        future = _dataset_checks.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            _dataset_checks.clear()
+            future = _dataset_checks[key] = _executor.submit(_validate_dataset)
+    return future
+
+
+def run_checks(checks: Dict[str, Callable[[], Future]], timeout: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Start every check and wait at most ``timeout`` seconds for all of them.
+
+    Returns, per check, ``ok``, its ``result`` or ``error`` and
+    ``latency_ms`` (how long it took to finish, or the timeout).
+    """
+    started = time.perf_counter()
+    futures = {start(): name for name, start in checks.items()}
+
+    results = {
+        name: {'ok': False, 'result': None, 'error': f'Timed out after {timeout}s', 'latency_ms': timeout * 1000}
+        for name in futures.values()
+    }
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            name = futures[future]
+            latency_ms = round((time.perf_counter() - started) * 1000, 2)
+            try:
+                results[name] = {'ok': True, 'result': future.result(), 'error': None, 'latency_ms': latency_ms}
+            except Exception as e:
+                results[name] = {'ok': False, 'result': None, 'error': str(e), 'latency_ms': latency_ms}
+    except TimeoutError:
+        # Checks still running keep their timed-out result
+        pass
+    return results
+
+
+def readiness() -> Dict[str, Dict[str, Any]]:
+    """Run the dataset and database checks concurrently."""
+    return run_checks(
+        {
+            'duckdb': dataset_check,
+            'database': lambda: _executor.submit(_check_database),
+        },
+        getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2.0)
+    )
+
+
+def reset():
+    """Forget cached dataset checks."""
+    with _lock:
+        _dataset_checks.clear()
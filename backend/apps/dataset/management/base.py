@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+
+class DatasetCommand(BaseCommand):
+    """
+    Base class for dataset commands.
+
+    Dataset commands take ``--version`` as the dataset version identifier,
+    which clashes with Django's built-in ``--version`` flag, so the built-in
+    one is not registered.
+    """
+
+    def add_base_argument(self, parser, *args, **kwargs):
+        if '--version' in args:
+            return
+        super().add_base_argument(parser, *args, **kwargs)
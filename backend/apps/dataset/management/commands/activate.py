@@ -1,21 +1,25 @@
 """
 Django management command to activate a dataset version.
 
-This command updates the current dataset version pointer.
+This command updates the current dataset version pointer. Running API
+workers notice the new pointer on their next request, build the new version
+in the background and swap to it once it is ready.
 
 Example usage:
     python manage.py activate --version 2025.09
 """
 
 import json
+import os
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.conf import settings
 from django.utils import timezone
 from apps.dataset.models import IngestionRun
+from apps.dataset.management.base import DatasetCommand
 
 
-class Command(BaseCommand):
+class Command(DatasetCommand):
     help = 'Activate a dataset version as current'
     
     def add_arguments(self, parser):
@@ -53,8 +57,11 @@ class Command(BaseCommand):
         current_file = base_path / 'current'
         
         try:
-            with open(current_file, 'w') as f:
+            # Write then rename so workers never read a partially written pointer
+            temp_file = current_file.with_name(f'.current.{os.getpid()}')
+            with open(temp_file, 'w') as f:
                 f.write(version)
+            os.replace(temp_file, current_file)
             
             self.stdout.write(self.style.SUCCESS(f"Successfully activated dataset version {version}"))
             
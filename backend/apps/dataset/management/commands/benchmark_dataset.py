@@ -0,0 +1,636 @@
+"""
+Django management command to benchmark the dataset API.
+
+Builds a synthetic curated dataset in a temporary directory and measures
+request latency against it, so results do not depend on the real data.
+
+Example usage:
+    python manage.py benchmark_dataset --suite api --rows 100000 --requests 200
+    python manage.py benchmark_dataset --suite search --suite suggest
+    python manage.py benchmark_dataset --suite features --rows 1000000
+    python manage.py benchmark_dataset --suite geo
+    python manage.py benchmark_dataset --suite paging --rows 100000
+    python manage.py benchmark_dataset --suite curate --rows 1000000
+    python manage.py benchmark_dataset --suite match --rows 100000
+    python manage.py benchmark_dataset --suite memory --rows 1000000 --memory-limit 512MB
+"""
+
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from apps.dataset.engine import get_engine, reset_engine
+from apps.dataset.features import write_feature_matrix
+from apps.dataset.matching import match_rankings
+from apps.dataset.scoring import compile_score
+from apps.dataset.curation import normalized_name
+from apps.dataset.management.commands.curate import Command as CurateCommand, parse_memory_limit
+from apps.dataset.search import create_search_tokens, search_tokens_expr, with_words
+from apps.dataset.suggest import create_suggest_terms, suggest_terms_frame, write_suggest_index
+
+COUNTRIES = ['US', 'GB', 'DE', 'FR', 'CA', 'AU', 'IN', 'CN', 'JP', 'BR', 'ES', 'IT', 'NL', 'SE', 'CH']
+NAME_WORDS = [
+    'State', 'Technical', 'National', 'Central', 'Northern', 'Southern', 'Western',
+    'Eastern', 'Metropolitan', 'Polytechnic', 'Medical', 'Agricultural', 'Royal',
+    'Catholic', 'Open', 'Free', 'Applied', 'Sciences', 'Arts', 'Engineering',
+]
+NAME_KINDS = ['University', 'College', 'Institute of Technology', 'School of Medicine']
+
+# Runs curate in a fresh process with the given arguments and prints the
+# process's peak RSS (KiB) before and after curating. VmHWM starts afresh at
+# exec, unlike ru_maxrss, which Linux carries over from the parent.
+CURATE_RSS_SCRIPT = """
+import os, sys
+import django
+django.setup()
+from django.core.management import call_command
+from django.db import connection
+import apps.dataset.management.commands.curate
+def peak_rss():
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+connection.creation.create_test_db(verbosity=0)
+baseline = peak_rss()
+with open(os.devnull, 'w') as devnull:
+    call_command('curate', *sys.argv[1:], stdout=devnull)
+print('rss', baseline, peak_rss())
+"""
+
+
+def synthetic_institutions(rows, seed=42):
+    """Return a DataFrame of ``rows`` synthetic institutions in curated format."""
+    rng = random.Random(seed)
+    records = []
+
+    for i in range(rows):
+        words = rng.sample(NAME_WORDS, rng.randint(1, 3))
+        name = f"{' '.join(words)} {rng.choice(NAME_KINDS)} {i}"
+        ranked = rng.random() < 0.3
+        records.append({
+            'id': f'https://openalex.org/I{i:08d}',
+            'display_name': name,
+            'canonical_name': name.lower().replace(' ', '-'),
+            'country_code': rng.choice(COUNTRIES),
+            'homepage_url': f'https://www.inst{i}.edu',
+            'image_url': None,
+            'works_count': rng.randint(0, 200000),
+            'cited_by_count': rng.randint(0, 5000000),
+            'geo_latitude': rng.uniform(-60, 70),
+            'geo_longitude': rng.uniform(-180, 180),
+            'type': 'education',
+            'webometrics_rank': rng.randint(1, 30000) if ranked else None,
+        })
+
+    return pl.DataFrame(records, schema_overrides={'image_url': pl.Utf8, 'webometrics_rank': pl.Int64})
+
+
+def write_synthetic_dataset(base_path, version, rows):
+    """Write a synthetic curated version under ``base_path`` and activate it."""
+    version_path = Path(base_path) / 'curated' / version
+    version_path.mkdir(parents=True, exist_ok=True)
+
+    institutions = synthetic_institutions(rows)
+    institutions.write_parquet(version_path / 'institutions.parquet')
+    with_words(institutions.select(['id', 'display_name', 'canonical_name', 'country_code']), 'display_name', '_words').with_columns(
+        search_tokens_expr(pl.col('_words')).alias('search_tokens')
+    ).drop('_words').write_parquet(version_path / 'search_index.parquet')
+    write_suggest_index(institutions, version_path)
+    write_feature_matrix(institutions, version_path)
+
+    (Path(base_path) / 'current').write_text(version)
+    return version_path
+
+
+def write_raw_institutions(path, institutions):
+    """
+    Write curated-format ``institutions`` as a raw Kaggle CSV.
+
+    Coordinates go into a JSON ``geo`` column and every 50th name gets
+    accented, so curation sees both ASCII and non-ASCII names.
+    """
+    raw = institutions.with_row_index('_row').with_columns(
+        pl.when(pl.col('_row') % 50 == 0)
+        .then(pl.col('display_name').str.replace('University', 'Universität Zürich'))
+        .otherwise(pl.col('display_name'))
+        .alias('display_name'),
+        pl.concat_str([
+            pl.lit('{"latitude": '), pl.col('geo_latitude').cast(pl.Utf8),
+            pl.lit(', "longitude": '), pl.col('geo_longitude').cast(pl.Utf8), pl.lit('}'),
+        ]).alias('geo'),
+    )
+    raw.drop(['_row', 'geo_latitude', 'geo_longitude', 'webometrics_rank']).write_csv(path)
+    return raw
+
+
+PLACE_SYLLABLES = ['ka', 'lo', 'ven', 'dor', 'mi', 'sa', 'ber', 'tu', 'ran', 'gel', 'fa', 'nor',
+                   'il', 'stad', 'bru', 'po', 'kes', 'ma', 'vi', 'hal', 'ten', 'ro', 'qua', 'zen']
+
+
+def synthetic_rankings(institutions, seed=42):
+    """
+    Return Webometrics-style rankings for the ranked synthetic ``institutions``.
+
+    Both sides name institutions after a made-up place instead of a number,
+    so name tokens repeat the way real ones do. Rankings then spell a
+    quarter of the names as they are, give a quarter an abbreviated name
+    and a subdomain of the homepage, translate "University" in a quarter
+    and drop the first word of the rest. ``source_row`` is the institution
+    each ranking was made from.
+    """
+    rng = random.Random(seed)
+    places = [
+        ''.join(rng.choice(PLACE_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        for _ in range(institutions.height)
+    ]
+    institutions = institutions.with_columns(
+        pl.col('display_name').str.replace(r' \d+$', '').alias('display_name')
+    ).with_columns(
+        pl.concat_str([pl.col('display_name'), pl.lit(' of '), pl.Series(places)]).alias('display_name')
+    )
+
+    variant = pl.col('source_row') % 4
+    rankings = institutions.with_row_index('source_row').filter(pl.col('webometrics_rank').is_not_null()).select([
+        'source_row',
+        pl.when(variant == 0).then(pl.col('display_name'))
+        .when(variant == 1).then(pl.col('display_name').str.replace('University', 'Univ.'))
+        .when(variant == 2).then(pl.col('display_name').str.replace('University', 'Universiteit'))
+        .otherwise(pl.col('display_name').str.replace(r'^\S+ ', ''))
+        .alias('name'),
+        pl.col('webometrics_rank').alias('rank'),
+        pl.col('country_code').alias('country'),
+        pl.when(variant == 1).then(pl.col('homepage_url').str.replace('www.', 'en.', literal=True) + '/about')
+        .otherwise(None)
+        .alias('homepage_url'),
+    ])
+    return institutions, rankings
+
+
+def legacy_normalize_name(name):
+    """Row-wise name normalization as curate did it before (for comparison)."""
+    if not name:
+        return ''
+    normalized = name.lower()
+    normalized = re.sub(r'^(the |university of |)', '', normalized)
+    normalized = re.sub(r'( university| college| institute| school| tech| technological)$', '', normalized)
+    normalized = re.sub(r'[^\w\s]', '', normalized)
+    return re.sub(r'\s+', ' ', normalized.strip())
+
+
+def legacy_curate_stages(institutions, webometrics):
+    """Return the ``map_elements`` versions of the curate stages (for comparison)."""
+    def clean():
+        def geo(field):
+            def extract(value):
+                try:
+                    value = json.loads(value) if isinstance(value, str) else value
+                except ValueError:
+                    return None
+                return value.get(field) if isinstance(value, dict) else None
+            return pl.col('geo').map_elements(extract, return_dtype=pl.Float64).alias(f'geo_{field}')
+        return institutions.with_columns([geo('latitude'), geo('longitude')]).with_columns(
+            pl.col('display_name').map_elements(legacy_normalize_name, return_dtype=pl.Utf8).alias('normalized_name')
+        )
+
+    def merge():
+        return webometrics.with_columns(
+            pl.col('name').map_elements(legacy_normalize_name, return_dtype=pl.Utf8).alias('normalized_name')
+        )
+
+    def search():
+        return institutions.select(
+            pl.col('display_name').map_elements(create_search_tokens, return_dtype=pl.List(pl.Utf8))
+        )
+
+    def suggest():
+        return institutions.select(
+            pl.struct(['display_name', 'canonical_name']).map_elements(
+                lambda row: create_suggest_terms(row['display_name'], row['canonical_name']),
+                return_dtype=pl.List(pl.Utf8)
+            )
+        )
+
+    return {'clean': clean, 'merge': merge, 'search tokens': search, 'suggest terms': suggest}
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile (0-100) of a list of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dataset queries and endpoints against a synthetic dataset'
+
+    suites = ['api', 'search', 'suggest', 'features', 'geo', 'paging', 'curate', 'match', 'memory']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--suite',
+            choices=self.suites,
+            action='append',
+            help='Benchmark suite to run (repeatable, defaults to all)'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of synthetic institutions to generate'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of timed requests per scenario'
+        )
+        parser.add_argument(
+            '--memory-limit',
+            default='512MB',
+            help='Memory limit the memory suite curates under (default: 512MB)'
+        )
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        self.requests = options['requests']
+        self.memory_limit = options['memory_limit']
+        suites = options['suite'] or self.suites
+
+        temp_dir = tempfile.mkdtemp(prefix='uniquest-bench-')
+        try:
+            # The curate, match and memory suites need no curated dataset
+            if set(suites) - {'curate', 'match', 'memory'}:
+                self.stdout.write(f"Generating {self.rows} synthetic institutions in {temp_dir}")
+                write_synthetic_dataset(temp_dir, 'bench', self.rows)
+
+            # Repeated URLs would otherwise time the response cache, not the queries
+            with override_settings(DATASET_BASE_PATH=temp_dir, ALLOWED_HOSTS=['*'], DATASET_RESPONSE_CACHE_BYTES=0):
+                for suite in suites:
+                    getattr(self, f'_bench_{suite}')(temp_dir)
+        finally:
+            reset_engine()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _report(self, label, samples_ms):
+        """Print p50/p99 latency for a list of samples in milliseconds."""
+        self.stdout.write(
+            f"  {label:<32} p50={percentile(samples_ms, 50):8.2f} ms  "
+            f"p99={percentile(samples_ms, 99):8.2f} ms  "
+            f"mean={statistics.mean(samples_ms):8.2f} ms"
+        )
+
+    def _time_requests(self, client, urls, before_each=None):
+        """Issue GET requests for ``urls`` and return latencies in milliseconds."""
+        samples = []
+        for url in urls:
+            if before_each:
+                before_each()
+            start = time.perf_counter()
+            response = client.get(url)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return samples
+
+    def _bench_api(self, base_path):
+        """p50/p99 of /api/universities/ with a cold vs shared engine."""
+        self.stdout.write(self.style.MIGRATE_HEADING("GET /api/universities/"))
+
+        rng = random.Random(7)
+        urls = [
+            f"/api/universities/?country={rng.choice(COUNTRIES)}&ordering=rank&limit=20"
+            for _ in range(self.requests)
+        ]
+        client = Client()
+
+        # Before: every request rebuilds the institutions table from Parquet,
+        # which is what each fresh DatasetService used to do.
+        cold = self._time_requests(client, urls, before_each=reset_engine)
+        self._report('per-request load (before)', cold)
+
+        reset_engine()
+        client.get(urls[0])
+        shared = self._time_requests(client, urls)
+        self._report('shared engine (after)', shared)
+
+        speedup = percentile(cold, 50) / max(percentile(shared, 50), 1e-9)
+        self.stdout.write(f"  p50 speedup: {speedup:.1f}x")
+
+    def _bench_search(self, base_path):
+        """Inverted index lookups vs ILIKE scans for name queries."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Name search (top 20)"))
+
+        reset_engine()
+        engine = get_engine()
+        start = time.perf_counter()
+        engine.load()
+        self.stdout.write(f"  engine + index load: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        rng = random.Random(11)
+        queries = [
+            rng.choice(['state', 'technical university', 'poly', 'royal college', 'medical', 'open univ', 'sci'])
+            for _ in range(self.requests)
+        ]
+        cursor = engine.cursor()
+
+        ilike = []
+        for query in queries:
+            start = time.perf_counter()
+            cursor.execute(
+                "SELECT id FROM institutions WHERE display_name ILIKE ? ORDER BY display_name LIMIT 20",
+                [f"%{query}%"]
+            ).fetchall()
+            ilike.append((time.perf_counter() - start) * 1000)
+        self._report('ILIKE scan', ilike)
+
+        indexed = []
+        for query in queries:
+            start = time.perf_counter()
+            engine.search_index.search(query, limit=20)
+            indexed.append((time.perf_counter() - start) * 1000)
+        self._report('inverted index (BM25)', indexed)
+
+        speedup = percentile(ilike, 50) / max(percentile(indexed, 50), 1e-9)
+        self.stdout.write(f"  p50 speedup: {speedup:.1f}x")
+
+    def _bench_suggest(self, base_path):
+        """Autocomplete keystrokes: ILIKE scans vs the trigram suggest index."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Autocomplete (top 10)"))
+
+        reset_engine()
+        engine = get_engine()
+        start = time.perf_counter()
+        engine.load()
+        self.stdout.write(f"  engine + index load: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        # Every keystroke of a few names, some typed with a swapped letter
+        rng = random.Random(13)
+        keystrokes = []
+        while len(keystrokes) < self.requests:
+            name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_KINDS)}".lower()
+            if rng.random() < 0.5:
+                i = rng.randrange(1, len(name) - 1)
+                name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+            keystrokes.extend(name[:length] for length in range(1, len(name) + 1))
+        keystrokes = keystrokes[:self.requests]
+        cursor = engine.cursor()
+
+        ilike = []
+        for query in keystrokes:
+            start = time.perf_counter()
+            cursor.execute(
+                "SELECT id FROM institutions WHERE display_name ILIKE ? ORDER BY display_name LIMIT 10",
+                [f"%{query}%"]
+            ).fetchall()
+            ilike.append((time.perf_counter() - start) * 1000)
+        self._report('ILIKE scan', ilike)
+
+        indexed = []
+        for query in keystrokes:
+            start = time.perf_counter()
+            engine.suggest_index.suggest(query, limit=10)
+            indexed.append((time.perf_counter() - start) * 1000)
+        self._report('trigram suggest index', indexed)
+
+        speedup = percentile(ilike, 50) / max(percentile(indexed, 50), 1e-9)
+        self.stdout.write(f"  p50 speedup: {speedup:.1f}x")
+
+    def _bench_features(self, base_path):
+        """Top-20 recommendations: per-row SQL score expression vs the feature matrix."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Recommendation scoring (top 20)"))
+
+        reset_engine()
+        engine = get_engine()
+        start = time.perf_counter()
+        engine.load()
+        self.stdout.write(f"  engine + feature map: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        rng = random.Random(17)
+        weight_sets = [
+            {'research_activity': rng.random(), 'ranking': rng.random(), 'citation_impact': rng.random()}
+            for _ in range(self.requests)
+        ]
+        cursor = engine.cursor()
+
+        # Before: the score was recomputed in SQL from raw columns per request
+        sql = []
+        for weights in weight_sets:
+            start = time.perf_counter()
+            cursor.execute(f"""
+                SELECT id, {weights['research_activity']} * COALESCE(LEAST(works_count / 100000.0, 1.0), 0.0)
+                    + {weights['ranking']} * COALESCE(1.0 - (webometrics_rank / 10000.0), 0.0) AS score
+                FROM institutions ORDER BY score DESC LIMIT 20
+            """).fetchall()
+            sql.append((time.perf_counter() - start) * 1000)
+        self._report('SQL score expression', sql)
+
+        features = engine.features()
+        matrix = []
+        for weights in weight_sets:
+            start = time.perf_counter()
+            vector, offset, _ = compile_score(weights, None)
+            features.top(vector, 20, offset)
+            matrix.append((time.perf_counter() - start) * 1000)
+        self._report('feature matrix product', matrix)
+
+        speedup = percentile(sql, 50) / max(percentile(matrix, 50), 1e-9)
+        self.stdout.write(f"  p50 speedup: {speedup:.1f}x")
+
+    def _bench_geo(self, base_path):
+        """Radius and nearest-20 queries: SQL haversine scans vs the grid index."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Geo proximity"))
+
+        reset_engine()
+        engine = get_engine()
+        engine.load()
+        start = time.perf_counter()
+        geo_index = engine.geo()
+        self.stdout.write(f"  geo index build: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        rng = random.Random(19)
+        origins = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(self.requests)]
+        cursor = engine.cursor()
+        distance_sql = """
+            2 * 6371.0088 * asin(sqrt(
+                pow(sin(radians(geo_latitude - ?) / 2), 2)
+                + cos(radians(?)) * cos(radians(geo_latitude)) * pow(sin(radians(geo_longitude - ?) / 2), 2)
+            ))
+        """
+
+        for label, sql_suffix, indexed_query in [
+            ('within 200 km', 'WHERE distance_km <= 200', lambda lat, lon: geo_index.within_radius(lat, lon, 200)),
+            ('nearest 20', 'ORDER BY distance_km LIMIT 20', lambda lat, lon: geo_index.nearest(lat, lon, 20)),
+        ]:
+            scan = []
+            for lat, lon in origins:
+                start = time.perf_counter()
+                cursor.execute(
+                    f"SELECT id, distance_km FROM (SELECT id, {distance_sql} AS distance_km FROM institutions) {sql_suffix}",
+                    [lat, lat, lon]
+                ).fetchall()
+                scan.append((time.perf_counter() - start) * 1000)
+            self._report(f'SQL haversine scan ({label})', scan)
+
+            indexed = []
+            for lat, lon in origins:
+                start = time.perf_counter()
+                indexed_query(lat, lon)
+                indexed.append((time.perf_counter() - start) * 1000)
+            self._report(f'grid index ({label})', indexed)
+
+            speedup = percentile(scan, 50) / max(percentile(indexed, 50), 1e-9)
+            self.stdout.write(f"  p50 speedup ({label}): {speedup:.1f}x")
+
+    def _bench_paging(self, base_path):
+        """Latency of page 1 vs deep pages of /api/universities/ with offset vs cursor paging."""
+        self.stdout.write(self.style.MIGRATE_HEADING("Deep paging (20 per page)"))
+
+        client = Client()
+        page_size = 20
+        last_page = min(500, self.rows // page_size - 1)
+        client.get('/api/universities/?limit=1')
+
+        for ordering in ['display_name', 'rank', 'works_count']:
+            # Walk the cursors once to find the cursor for each sampled page
+            cursors = {1: None}
+            response = client.get(f'/api/universities/?ordering={ordering}&limit={page_size}')
+            for page in range(2, last_page + 1):
+                next_cursor = response.json()['meta']['nextCursor']
+                cursors[page] = next_cursor
+                response = client.get(f'/api/universities/?cursor={next_cursor}&limit={page_size}')
+
+            for page in (1, last_page):
+                offset = (page - 1) * page_size
+                urls = [f'/api/universities/?ordering={ordering}&limit={page_size}&offset={offset}'] * self.requests
+                self._report(f'{ordering} page {page} offset', self._time_requests(client, urls))
+
+                if cursors[page] is None:
+                    continue
+                urls = [f'/api/universities/?cursor={cursors[page]}&limit={page_size}'] * self.requests
+                self._report(f'{ordering} page {page} cursor', self._time_requests(client, urls))
+
+    def _bench_curate(self, base_path):
+        """Curate stages over a raw CSV: row-wise map_elements vs native Polars expressions."""
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Curate pipeline ({self.rows} raw institutions)"))
+
+        raw_file = Path(base_path) / 'raw_institutions.csv'
+        write_raw_institutions(raw_file, synthetic_institutions(self.rows))
+        ranked = synthetic_institutions(self.rows).filter(pl.col('webometrics_rank').is_not_null())
+        webometrics = ranked.select([
+            pl.col('display_name').alias('name'),
+            pl.col('webometrics_rank').alias('rank'),
+            pl.col('country_code').alias('country'),
+        ])
+
+        start = time.perf_counter()
+        raw = pl.read_csv(raw_file)
+        self.stdout.write(f"  read CSV: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        command = CurateCommand()
+        cleaned = command._clean_institutions(raw)
+        native = {
+            'clean': lambda: command._clean_institutions(raw),
+            # The ranking match itself is timed by the match suite
+            'merge': lambda: webometrics.with_columns(normalized_name(pl.col('name')).alias('normalized_name')),
+            'search tokens': lambda: with_words(cleaned, 'display_name', '_words').select(
+                search_tokens_expr(pl.col('_words'))
+            ),
+            'suggest terms': lambda: suggest_terms_frame(cleaned.select(['id', 'display_name', 'canonical_name'])),
+        }
+
+        totals = {'map_elements': 0.0, 'native': 0.0}
+        for stage, legacy in legacy_curate_stages(raw, webometrics).items():
+            timings = {}
+            for label, run in (('map_elements', legacy), ('native', native[stage])):
+                start = time.perf_counter()
+                run()
+                timings[label] = (time.perf_counter() - start) * 1000
+                totals[label] += timings[label]
+            self.stdout.write(
+                f"  {stage:<16} map_elements={timings['map_elements']:9.0f} ms  "
+                f"native={timings['native']:8.0f} ms  "
+                f"speedup={timings['map_elements'] / max(timings['native'], 1e-9):6.1f}x"
+            )
+
+        self.stdout.write(
+            f"  total speedup: {totals['map_elements'] / max(totals['native'], 1e-9):.1f}x "
+            f"({totals['map_elements']:.0f} ms -> {totals['native']:.0f} ms)"
+        )
+
+    def _bench_memory(self, base_path):
+        """Peak RSS of curate in memory vs streamed under --memory-limit, each in a fresh process."""
+        limit = parse_memory_limit(self.memory_limit)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Curate peak memory ({self.rows} raw institutions, --memory-limit {self.memory_limit})"
+        ))
+
+        input_dir = Path(base_path) / 'raw'
+        for source in ('kaggle', 'webometrics'):
+            (input_dir / source / 'bench').mkdir(parents=True, exist_ok=True)
+        institutions, rankings = synthetic_rankings(synthetic_institutions(self.rows))
+        write_raw_institutions(input_dir / 'kaggle' / 'bench' / 'institutions.csv', institutions)
+        rankings.drop('source_row').write_ndjson(input_dir / 'webometrics' / 'bench' / 'webometrics.jsonl')
+        del institutions, rankings
+
+        for label, options in (('in memory', []), ('streaming', ['--memory-limit', self.memory_limit])):
+            output_dir = Path(base_path) / 'memory' / label.replace(' ', '-')
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, '-c', CURATE_RSS_SCRIPT, '--version', 'bench', '--force',
+                 '--input-dir', str(input_dir), '--output-dir', str(output_dir), *options],
+                cwd=Path(__file__).resolve().parents[4], capture_output=True, text=True
+            )
+            elapsed = time.perf_counter() - start
+            rss = [line.split() for line in result.stdout.splitlines() if line.startswith('rss ')]
+            if result.returncode != 0 or not rss:
+                raise RuntimeError(f"curate failed: {result.stderr[-2000:]}")
+
+            baseline, peak = (int(value) * 1024 for value in rss[-1][1:])
+            used = peak - baseline
+            verdict = ('within' if used <= limit else 'over') + ' limit' if options else ''
+            self.stdout.write(
+                f"  {label:<10} {elapsed:7.1f} s  peak RSS={peak / 2 ** 20:7.0f} MiB  "
+                f"curate={used / 2 ** 20:7.0f} MiB  {verdict}"
+            )
+        self.stdout.write(f"  (curate = peak RSS above the process after imports and setup; limit {limit / 2 ** 20:.0f} MiB)")
+
+    def _bench_match(self, base_path):
+        """Ranking match: blocked candidate pairs vs the full cross product."""
+        institutions, rankings = synthetic_rankings(synthetic_institutions(self.rows))
+        institutions = institutions.select([
+            normalized_name(pl.col('display_name')).alias('normalized_name'), 'country_code', 'homepage_url'
+        ])
+        rankings = rankings.with_columns(normalized_name(pl.col('name')).alias('normalized_name'))
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Ranking match ({institutions.height} institutions x {rankings.height} rankings)"
+        ))
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            matches, stats = match_rankings(institutions, rankings, workers=workers)
+            elapsed = time.perf_counter() - start
+
+            source_rows = rankings['source_row'].gather(matches['ranking'])
+            correct = int((matches['row'] == source_rows).sum())
+            self.stdout.write(
+                f"  workers={workers:<3} {elapsed:8.2f} s  "
+                f"match rate={stats['ranking_match_rate']:.1%}  "
+                f"correct={correct / max(matches.height, 1):.1%}  "
+                f"{stats['ranking_matches']}"
+            )
+        self.stdout.write(
+            f"  candidate pairs: {stats['ranking_candidate_pairs']} "
+            f"(cross product: {institutions.height * rankings.height})"
+        )
+        self.stdout.write(f"  confidence: {stats['ranking_match_confidence']}")
@@ -2,26 +2,128 @@
 Django management command to curate and merge dataset sources.
 
 This command:
-1. Merges OpenAlex institutions with Webometrics rankings
+1. Merges OpenAlex institutions with Webometrics rankings (exact, domain and
+   blocked fuzzy name matching)
 2. Creates normalized and searchable dataset
-3. Builds search index for fast queries
+3. Builds search and autocomplete indexes for fast queries
 4. Outputs final Parquet files
+5. Outputs a read-only DuckDB database with typed, indexed tables
+6. Outputs a memory-mappable matrix of percentile-normalized scoring features
+
+With ``--streaming``, the inputs are scanned lazily instead of read into
+memory: only the columns the output needs are read, the rankings join runs in
+Polars' streaming engine, and the result is sunk straight to Parquet. The
+search and suggest indexes are then built from that file a chunk of rows at a
+time, and the feature matrix from its few numeric columns. ``--memory-limit``
+sets the chunk size and the memory DuckDB may use (spilling to disk beyond
+it) while sorting the suggest index and building the database. Matching
+rankings is not bounded by it: the match keys (normalized name, country and
+homepage) of every institution are collected, so that step grows with the
+input.
+
+With ``--workers N``, the raw rows are split into N shards that are cleaned,
+normalized and tokenized in a process pool, and ranking blocks are matched
+on N processes. Shard outputs are merged in input order, so the curated
+files are the same for any number of workers.
+
+Every in-memory run saves a digest of each raw record. With ``--incremental
+--base-version X``, records whose digest is unchanged since version X are
+copied from X's curated files and only new and modified records are cleaned,
+tokenized and matched; a changes.json manifest lists the added, removed and
+modified ids.
 
 Example usage:
     python manage.py curate --version 2025.09
+    python manage.py curate --version 2025.09 --streaming --memory-limit 1GB
+    python manage.py curate --version 2025.09 --workers 8
+    python manage.py curate --version 2025.10 --incremental --base-version 2025.09
 """
 
 import json
+import os
+import re
+import shutil
+import duckdb
 import pandas as pd
 import polars as pl
+import pyarrow.parquet as pq
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.conf import settings
 from django.utils import timezone
+from apps.dataset.curation import (
+    clean_institutions, curate_shards, diff_records, file_digest, normalized_name, record_hashes
+)
+from apps.dataset.features import FEATURE_COLUMNS, write_feature_matrix
+from apps.dataset.matching import match_rankings
 from apps.dataset.models import IngestionRun
+from apps.dataset.search import search_tokens_expr, with_words
+from apps.dataset.suggest import write_suggest_index, write_suggest_index_batched
+from apps.dataset.management.base import DatasetCommand
+
+
+# Column types for the curated DuckDB database, in output order
+INSTITUTION_COLUMN_TYPES = {
+    'id': 'VARCHAR NOT NULL',
+    'display_name': 'VARCHAR NOT NULL',
+    'canonical_name': 'VARCHAR',
+    'country_code': 'VARCHAR',
+    'homepage_url': 'VARCHAR',
+    'image_url': 'VARCHAR',
+    'works_count': 'BIGINT',
+    'cited_by_count': 'BIGINT',
+    'geo_latitude': 'DOUBLE',
+    'geo_longitude': 'DOUBLE',
+    'type': 'VARCHAR',
+    'webometrics_rank': 'INTEGER',
+}
+
+# Curated columns written to institutions.parquet, in output order
+FINAL_COLUMNS = list(INSTITUTION_COLUMN_TYPES)
+
+# Rough in-flight size of one raw institution row while streaming, used to
+# derive a streaming chunk size from --memory-limit
+STREAMING_ROW_BYTES = 8 * 1024
+MIN_STREAMING_CHUNK_SIZE = 1000
+MAX_STREAMING_CHUNK_SIZE = 250000
+
+# Institution columns the search index is built from
+SEARCH_COLUMNS = ['id', 'display_name', 'canonical_name', 'country_code']
+
+MEMORY_UNITS = {'': 1, 'B': 1, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4,
+                'KIB': 1024, 'MIB': 1024 ** 2, 'GIB': 1024 ** 3, 'TIB': 1024 ** 4}
+
 
+def parse_memory_limit(value):
+    """
+    Parse a memory size such as ``512MB`` or ``2GiB`` into bytes.
 
-class Command(BaseCommand):
+    Raises:
+        CommandError: If the size is malformed
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([A-Za-z]*)\s*', str(value))
+    unit = match.group(2).upper() if match else None
+    if unit not in MEMORY_UNITS:
+        raise CommandError(f"Invalid memory limit: {value!r} (expected e.g. 512MB or 2GB)")
+    return int(float(match.group(1)) * MEMORY_UNITS[unit])
+
+
+def streaming_chunk_size(memory_limit):
+    """Rows per streaming chunk for a memory ceiling of ``memory_limit`` bytes."""
+    return max(MIN_STREAMING_CHUNK_SIZE, min(MAX_STREAMING_CHUNK_SIZE, memory_limit // STREAMING_ROW_BYTES))
+
+
+def search_index_frame(df):
+    """Return the search index rows for ``df`` (its search columns plus ``search_tokens``)."""
+    if 'search_tokens' in df.columns:
+        return df.select(SEARCH_COLUMNS + ['search_tokens'])
+    return with_words(df.select(SEARCH_COLUMNS), 'display_name', '_words').with_columns([
+        # Create searchable tokens (words plus acronyms, see apps.dataset.search)
+        search_tokens_expr(pl.col('_words')).alias('search_tokens')
+    ]).drop('_words')
+
+
+class Command(DatasetCommand):
     help = 'Curate and merge dataset sources into final format'
     
     def add_arguments(self, parser):
@@ -51,11 +153,52 @@ class Command(BaseCommand):
             action='store_true',
             help='Force curation even if data already exists'
         )
+        parser.add_argument(
+            '--streaming',
+            action='store_true',
+            help='Scan inputs lazily and stream the curated table to Parquet'
+        )
+        parser.add_argument(
+            '--memory-limit',
+            type=str,
+            help='Memory ceiling for the streaming sink, index batches and DuckDB sorts (e.g. 1GB); '
+                 'ranking matching is not bounded; implies --streaming'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Clean and tokenize institutions in this many processes, one shard each'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only curate records that changed since --base-version and copy the rest'
+        )
+        parser.add_argument(
+            '--base-version',
+            type=str,
+            help='Curated version an --incremental run starts from'
+        )
     
     def handle(self, *args, **options):
         version = options['version']
         dry_run = options['dry_run']
         force = options['force']
+        memory_limit = options['memory_limit']
+        streaming = options['streaming'] or memory_limit is not None
+        memory_bytes = parse_memory_limit(memory_limit) if memory_limit is not None else None
+        workers = options['workers']
+        
+        if workers is not None and workers < 1:
+            raise CommandError("--workers must be at least 1")
+        if workers is not None and streaming:
+            raise CommandError("--workers cannot be combined with --streaming or --memory-limit")
+        incremental = options['incremental']
+        base_version = options['base_version']
+        if incremental and not base_version:
+            raise CommandError("--incremental requires --base-version")
+        if incremental and streaming:
+            raise CommandError("--incremental cannot be combined with --streaming or --memory-limit")
         
         base_path = Path(getattr(settings, 'DATASET_BASE_PATH', '/data'))
         
@@ -72,6 +215,14 @@ class Command(BaseCommand):
         
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        if incremental:
+            base_dir = base_path / 'curated' / base_version
+            for name in ('institutions.parquet', 'search_index.parquet', 'record_hashes.parquet'):
+                if not (base_dir / name).exists():
+                    raise CommandError(
+                        f"Base version {base_version} has no {name}; curate it without --streaming first"
+                    )
+        
         self.stdout.write(f"Curating dataset version {version}")
         self.stdout.write(f"Input directory: {input_dir}")
         self.stdout.write(f"Output directory: {output_dir}")
@@ -96,14 +247,46 @@ class Command(BaseCommand):
         )
         
         try:
-            # Load and process data
-            institutions_df = self._curate_data(input_dir, version, run)
-            
-            # Save as Parquet
-            self._save_parquet(institutions_df, output_dir, run)
+            if streaming:
+                # Stream inputs to Parquet
+                self._stream_parquet(input_dir, version, output_dir, run, memory_bytes)
+                
+                # Build the indexes from the written file, reading only the
+                # columns each one needs, a chunk of rows at a time
+                batch_size = streaming_chunk_size(memory_bytes) if memory_bytes else MAX_STREAMING_CHUNK_SIZE
+                self._create_search_index_batched(institutions_file, output_dir, run, batch_size)
+                self._create_suggest_index_batched(institutions_file, output_dir, run, memory_bytes)
+                
+                # The feature matrix holds a few numbers per institution
+                available_columns = pl.read_parquet_schema(institutions_file).keys()
+                feature_columns = [col for col in FEATURE_COLUMNS if col in available_columns]
+                self._create_feature_matrix(
+                    pl.read_parquet(institutions_file, columns=feature_columns), output_dir, run
+                )
+            else:
+                # Load and process data
+                if incremental:
+                    institutions_df = self._curate_incremental(
+                        input_dir, version, base_version, base_dir, output_dir, run, workers
+                    )
+                else:
+                    institutions_df = self._curate_data(input_dir, version, run, workers)
+                
+                # Save as Parquet, with the record digests a later --incremental run diffs against
+                self._save_parquet(institutions_df, output_dir, run)
+                self._save_record_hashes(institutions_df, output_dir, run)
+                
+                # Create search index
+                self._create_search_index(institutions_df, output_dir, run)
+                
+                # Create the autocomplete index served by /universities/suggest/
+                self._create_suggest_index(institutions_df, output_dir, run)
+                
+                # Precompute the scoring features mapped by every API worker
+                self._create_feature_matrix(institutions_df, output_dir, run)
             
-            # Create search index
-            self._create_search_index(institutions_df, output_dir, run)
+            # Build the DuckDB database attached read-only by the API
+            self._save_duckdb(output_dir, run, memory_bytes)
             
             # Mark run as successful
             run.status = 'SUCCESS'
@@ -146,10 +329,115 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING(f"Webometrics data not found: {webometrics_file}"))
     
-    def _curate_data(self, input_dir, version, run):
-        """Load and curate the data."""
+    def _curate_data(self, input_dir, version, run, workers=None):
+        """
+        Load and curate the data.
+        
+        With ``workers``, cleaning and search tokenization run on that many
+        shards in a process pool (see ``apps.dataset.curation``), and the
+        per-shard timings are recorded on the run.
+        """
+        
+        institutions_df = self._load_institutions(input_dir, version)
+        
+        # Clean and normalize the data
+        if workers:
+            institutions_df = self._curate_shards(institutions_df, workers, run)
+        else:
+            institutions_df = self._clean_institutions(institutions_df)
+        institutions_df = institutions_df.with_columns(pl.col('country_code').alias('source_country_code'))
+        
+        # Merge with Webometrics rankings (optional)
+        webometrics_df = self._load_rankings(input_dir, version, run)
+        if webometrics_df is not None:
+            institutions_df = self._merge_rankings(institutions_df, webometrics_df, run, workers)
+        
+        self._count_institutions(institutions_df, run)
+        
+        return institutions_df
+    
+    def _curate_incremental(self, input_dir, version, base_version, base_dir, output_dir, run, workers=None):
+        """
+        Curate only the records that changed since ``base_version``.
+        
+        Records whose digest matches the base version are copied from its
+        curated files, with their search tokens and, while the rankings file
+        is unchanged, their ranking. New and modified records are cleaned,
+        tokenized and matched against the rankings not already held by
+        copied records; if the rankings file changed, every record is
+        matched again. The added, removed and modified ids are written to
+        changes.json. The ranking match rate covers every record; the other
+        match statistics only the matched ones (``incremental_*``).
+        """
+        
+        institutions_df = self._load_institutions(input_dir, version).with_row_index('_input_row')
+        webometrics_df = self._load_rankings(input_dir, version, run)
+        
+        base_hashes_file = base_dir / 'record_hashes.parquet'
+        base_hashes = pl.read_parquet(base_hashes_file)
+        base_rankings_digest = pl.read_parquet_metadata(base_hashes_file).get('rankings_digest') or None
+        rankings_changed = base_rankings_digest != run.get_stat('rankings_digest')
+        
+        changes = diff_records(institutions_df, base_hashes)
+        self.stdout.write(
+            f"Since {base_version}: {len(changes['added'])} added, {len(changes['removed'])} removed, "
+            f"{len(changes['modified'])} modified, {changes['unchanged']} unchanged"
+            + (" (rankings changed)" if rankings_changed else "")
+        )
+        
+        unchanged = institutions_df.join(base_hashes.select(['id', 'record_hash']), on=['id', 'record_hash'], how='semi')
+        changed = institutions_df.join(unchanged.select('id'), on='id', how='anti')
+        
+        # Copy unchanged records as the base version curated them
+        kept = (
+            unchanged.select(['_input_row', 'id', 'record_hash'])
+            .join(pl.read_parquet(base_dir / 'institutions.parquet'), on='id')
+            .join(base_hashes.select(['id', 'normalized_name', 'source_country_code', 'ranking_hash']), on='id')
+            .join(pl.read_parquet(base_dir / 'search_index.parquet').select(['id', 'search_tokens']), on='id')
+        )
+        
+        # Clean and tokenize new and modified records
+        changed = self._curate_shards(changed, workers or 1, run)
+        changed = changed.with_columns(pl.col('country_code').alias('source_country_code'))
+        
+        def aligned(frames):
+            columns = [col for col in frames[0].columns if all(col in frame.columns for frame in frames)]
+            return pl.concat([frame.select(columns) for frame in frames], how='vertical_relaxed')
+        
+        if rankings_changed:
+            # Copied records may match differently now, so all are matched again
+            kept = kept.with_columns(pl.col('source_country_code').alias('country_code'))
+            kept = kept.drop(['webometrics_rank', 'ranking_hash'], strict=False)
+            changed, kept = aligned([kept, changed]), None
+        
+        if webometrics_df is not None:
+            claimed = kept['ranking_hash'].drop_nulls() if kept is not None else None
+            changed = self._merge_rankings(changed, webometrics_df, run, workers, claimed)
+        
+        institutions_df = aligned([kept, changed] if kept is not None else [changed])
+        institutions_df = institutions_df.sort('_input_row').drop('_input_row')
+        
+        if kept is not None and webometrics_df is not None:
+            # Copied records keep their rankings, so the match rate covers every record
+            named_rankings = webometrics_df.select((normalized_name(pl.col('name')) != '').sum()).item()
+            matched_rankings = institutions_df['ranking_hash'].drop_nulls().n_unique()
+            run.set_stat('ranking_match_rate', round(matched_rankings / named_rankings, 4) if named_rankings else 0.0)
+        
+        manifest = {'version': version, 'base_version': base_version, 'rankings_changed': rankings_changed, **changes}
+        with open(output_dir / 'changes.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        run.set_stat('incremental_base_version', base_version)
+        for name in ('added', 'removed', 'modified'):
+            run.set_stat(f'records_{name}', len(changes[name]))
+        run.set_stat('records_unchanged', changes['unchanged'])
+        self._count_institutions(institutions_df, run)
+        
+        return institutions_df
+    
+    def _load_institutions(self, input_dir, version):
+        """Read the raw Kaggle institutions, with a ``record_hash`` per record."""
         
-        # Load Kaggle institutions
         self.stdout.write("Loading Kaggle dataset institutions...")
         kaggle_file = input_dir / 'kaggle' / version / 'institutions.csv'
         
@@ -161,79 +449,166 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Loaded {len(institutions_df)} Kaggle institutions")
         
-        # Clean and normalize the data
-        institutions_df = self._clean_institutions(institutions_df)
+        return institutions_df.with_columns(record_hashes(institutions_df))
+    
+    def _load_rankings(self, input_dir, version, run):
+        """Read the Webometrics rankings, if any, and record the file's digest on the run."""
         
-        # Load Webometrics rankings (optional)
         webometrics_file = input_dir / 'webometrics' / version / 'webometrics.jsonl'
+        run.set_stat('rankings_digest', file_digest(webometrics_file))
         
-        if webometrics_file.exists():
-            self.stdout.write("Loading Webometrics rankings...")
-            webometrics_df = pl.read_ndjson(webometrics_file)
-            
-            self.stdout.write(f"Loaded {len(webometrics_df)} Webometrics rankings")
-            
-            # Merge with rankings
-            institutions_df = self._merge_rankings(institutions_df, webometrics_df)
-        else:
+        if not webometrics_file.exists():
             self.stdout.write("Webometrics data not found, skipping rankings merge")
+            return None
+        
+        self.stdout.write("Loading Webometrics rankings...")
+        webometrics_df = pl.read_ndjson(webometrics_file)
+        
+        self.stdout.write(f"Loaded {len(webometrics_df)} Webometrics rankings")
+        
+        return webometrics_df
+    
+    def _curate_shards(self, institutions_df, workers, run):
+        """Clean and tokenize ``institutions_df`` in ``workers`` shards, recording their timings."""
+        
+        self.stdout.write(f"Cleaning {len(institutions_df)} institutions in {workers} shards")
+        institutions_df, timings = curate_shards(institutions_df, workers)
+        for timing in timings:
+            self.stdout.write(f"  shard {timing['shard']}: {timing['rows']} rows in {timing['seconds']:.2f}s")
+        
+        run.set_stat('workers', workers)
+        run.set_stat('shard_timings', timings)
+        return institutions_df
+    
+    def _count_institutions(self, institutions_df, run):
+        """Record the total and ranked institution counts."""
         
-        # Update run statistics
         run.set_stat('total_institutions', len(institutions_df))
-        ranked_count = institutions_df.filter(pl.col('webometrics_rank').is_not_null()).height
+        ranked_count = (
+            institutions_df.filter(pl.col('webometrics_rank').is_not_null()).height
+            if 'webometrics_rank' in institutions_df.columns else 0
+        )
         run.set_stat('ranked_institutions', ranked_count)
         run.save()
-        
-        return institutions_df
     
-    def _clean_institutions(self, df):
-        """Clean and normalize institutions data."""
+    def _stream_parquet(self, input_dir, version, output_dir, run, memory_limit=None):
+        """
+        Curate the inputs lazily and sink the result to institutions.parquet.
         
-        # Extract geographic coordinates
-        df = df.with_columns([
-            pl.col('geo').map_elements(lambda x: x.get('latitude') if isinstance(x, dict) else None).alias('geo_latitude'),
-            pl.col('geo').map_elements(lambda x: x.get('longitude') if isinstance(x, dict) else None).alias('geo_longitude'),
-        ])
+        The same cleaning and merge steps as ``_curate_data`` run on
+        LazyFrames, so Polars only reads the columns the output uses and
+        executes the plan in its streaming engine, a chunk at a time.
+        """
         
-        # Create search-friendly name
-        df = df.with_columns([
-            pl.col('display_name').fill_null('').alias('display_name'),
-            pl.col('canonical_name').fill_null('').alias('canonical_name'),
-        ])
+        kaggle_file = input_dir / 'kaggle' / version / 'institutions.csv'
+        if not kaggle_file.exists():
+            raise CommandError(f"Kaggle data not found: {kaggle_file}")
         
-        # Ensure numeric fields are properly typed
-        df = df.with_columns([
-            pl.col('works_count').cast(pl.Int64, strict=False).fill_null(0),
-            pl.col('cited_by_count').cast(pl.Int64, strict=False).fill_null(0),
-        ])
+        self.stdout.write(f"Scanning Kaggle dataset institutions from {kaggle_file}")
+        institutions = self._clean_institutions(pl.scan_csv(kaggle_file))
         
-        # Create a normalized name for matching
-        df = df.with_columns([
-            pl.col('display_name').map_elements(self._normalize_name).alias('normalized_name')
-        ])
+        webometrics_file = input_dir / 'webometrics' / version / 'webometrics.jsonl'
+        if webometrics_file.exists():
+            self.stdout.write(f"Scanning Webometrics rankings from {webometrics_file}")
+            webometrics = pl.scan_ndjson(webometrics_file)
+            webometrics = webometrics.select([
+                col for col in ('name', 'rank', 'country', 'homepage_url')
+                if col in webometrics.collect_schema().names()
+            ])
+            institutions = self._merge_rankings(institutions, webometrics, run)
+        else:
+            self.stdout.write("Webometrics data not found, skipping rankings merge")
         
-        return df
+        available_columns = institutions.collect_schema().names()
+        institutions = institutions.select([col for col in FINAL_COLUMNS if col in available_columns])
+        
+        institutions_file = output_dir / 'institutions.parquet'
+        chunk_size = streaming_chunk_size(memory_limit) if memory_limit else None
+        self.stdout.write(
+            f"Streaming institutions to {institutions_file}"
+            + (f" ({chunk_size} rows per chunk)" if chunk_size else "")
+        )
+        # Row groups of one chunk let the index builds read the file a chunk at a time
+        with pl.Config(streaming_chunk_size=chunk_size):
+            institutions.sink_parquet(institutions_file, row_group_size=chunk_size, engine='streaming')
+        
+        # Statistics come from the written file rather than an in-memory frame
+        curated = pl.scan_parquet(institutions_file)
+        counts = curated.select(
+            pl.len().alias('total'),
+            (pl.col('webometrics_rank').is_not_null().sum() if 'webometrics_rank' in available_columns
+             else pl.lit(0)).alias('ranked'),
+        ).collect().row(0, named=True)
+        
+        self.stdout.write(f"Streamed {counts['total']} institutions to Parquet")
+        
+        run.set_stat('total_institutions', counts['total'])
+        run.set_stat('ranked_institutions', counts['ranked'])
+        run.set_stat('output_file_size', institutions_file.stat().st_size)
+        if chunk_size:
+            run.set_stat('streaming_chunk_size', chunk_size)
+        run.save()
+    
+    def _clean_institutions(self, df):
+        """Clean and normalize institutions data."""
+        return clean_institutions(df)
     
-    def _merge_rankings(self, institutions_df, webometrics_df):
-        """Merge institutions with Webometrics rankings."""
+    def _merge_rankings(self, institutions_df, webometrics_df, run=None, workers=None, claimed=None):
+        """
+        Merge institutions with Webometrics rankings.
+        
+        Rankings are matched on normalized names, homepage domains and fuzzy
+        name similarity (see ``apps.dataset.matching``). Only the matching
+        columns are collected, so a lazy ``institutions_df`` stays lazy.
+        Each match carries the ``ranking_hash`` digest of its ranking record;
+        rankings whose digest is in ``claimed`` are already held by other
+        institutions and only match exactly. The match statistics of such a
+        run only cover ``institutions_df``, so they are recorded as
+        ``incremental_*``.
+        """
+        
+        lazy = isinstance(institutions_df, pl.LazyFrame)
+        institutions_df = institutions_df.with_row_index('_match_row')
         
         # Normalize names in webometrics data for matching
         webometrics_df = webometrics_df.with_columns([
-            pl.col('name').map_elements(self._normalize_name).alias('normalized_name')
+            normalized_name(pl.col('name')).alias('normalized_name')
         ])
         
-        # Perform fuzzy matching join
-        # For now, use exact match on normalized names
+        institution_keys = institutions_df.select(
+            [col for col in ('normalized_name', 'country_code', 'homepage_url')
+             if col in institutions_df.collect_schema().names()]
+        )
+        if lazy:
+            institution_keys, webometrics_df = pl.collect_all([institution_keys, webometrics_df.lazy()])
+        
+        ranking_hashes = record_hashes(webometrics_df.drop('normalized_name'))
+        claimed_rows = ranking_hashes.is_in(claimed.implode()).arg_true() if claimed is not None else None
+        
+        matches, stats = match_rankings(institution_keys, webometrics_df, workers=workers, claimed=claimed_rows)
+        self.stdout.write(
+            f"Matched {stats['ranking_match_rate']:.1%} of rankings "
+            f"({', '.join(f'{count} {method}' for method, count in stats['ranking_matches'].items())}) "
+            f"from {stats['ranking_candidate_pairs']} candidate pairs"
+        )
+        if run is not None:
+            prefix = 'incremental_' if claimed is not None else ''
+            for name, value in stats.items():
+                run.set_stat(f'{prefix}{name}', value)
+        
+        matches = matches.select([
+            pl.col('row').alias('_match_row'),
+            pl.col('rank').alias('webometrics_rank'),
+            pl.col('country').alias('country_webometrics'),
+            ranking_hashes.gather(matches['ranking']).alias('ranking_hash'),
+        ])
         merged_df = institutions_df.join(
-            webometrics_df.select(['normalized_name', 'rank', 'country']),
-            on='normalized_name',
+            matches.lazy() if lazy else matches,
+            on='_match_row',
             how='left',
-            suffix='_webometrics'
+            maintain_order='left'
         )
         
-        # Rename webometrics rank column
-        merged_df = merged_df.rename({'rank': 'webometrics_rank'})
-        
         # Update country code if missing from OpenAlex but available in Webometrics
         merged_df = merged_df.with_columns([
             pl.when(pl.col('country_code').is_null() & pl.col('country_webometrics').is_not_null())
@@ -243,32 +618,10 @@ class Command(BaseCommand):
         ])
         
         # Drop temporary columns
-        merged_df = merged_df.drop(['country_webometrics'])
+        merged_df = merged_df.drop(['_match_row', 'country_webometrics'])
         
         return merged_df
     
-    def _normalize_name(self, name):
-        """Normalize institution name for matching."""
-        if not name:
-            return ''
-        
-        import re
-        
-        # Convert to lowercase
-        normalized = name.lower()
-        
-        # Remove common prefixes and suffixes
-        normalized = re.sub(r'^(the |university of |)', '', normalized)
-        normalized = re.sub(r'( university| college| institute| school| tech| technological)$', '', normalized)
-        
-        # Remove special characters
-        normalized = re.sub(r'[^\w\s]', '', normalized)
-        
-        # Normalize whitespace
-        normalized = re.sub(r'\s+', ' ', normalized.strip())
-        
-        return normalized
-    
     def _save_parquet(self, df, output_dir, run):
         """Save the curated data as Parquet files."""
         
@@ -295,6 +648,131 @@ class Command(BaseCommand):
         run.set_stat('output_file_size', institutions_file.stat().st_size)
         run.save()
     
+    def _save_record_hashes(self, df, output_dir, run):
+        """
+        Save what ``--incremental`` needs to reuse each record: its digest,
+        normalized name, source country and the digest of its ranking.
+        """
+        
+        hashes_file = output_dir / 'record_hashes.parquet'
+        ranking_hash = pl.col('ranking_hash') if 'ranking_hash' in df.columns else pl.lit(None, dtype=pl.Utf8).alias('ranking_hash')
+        df.select(['id', 'record_hash', 'normalized_name', 'source_country_code', ranking_hash]).write_parquet(
+            hashes_file, metadata={'rankings_digest': run.get_stat('rankings_digest') or ''}
+        )
+        
+        self.stdout.write(f"Saved {len(df)} record hashes to {hashes_file}")
+    
+    def _save_duckdb(self, output_dir, run, memory_limit=None):
+        """
+        Save the institutions table as a read-only DuckDB database.
+        
+        Rows are sorted by country and rank so zone maps prune most row groups
+        for the common filters, and ART indexes back point lookups. API workers
+        attach the file read-only and share its pages through the OS cache.
+        With ``memory_limit`` (bytes), the sort spills to disk beyond it.
+        """
+        
+        institutions_file = output_dir / 'institutions.parquet'
+        database_file = output_dir / 'institutions.duckdb'
+        temp_file = output_dir / f'.institutions.{os.getpid()}.duckdb'
+        
+        self.stdout.write(f"Building DuckDB database at {database_file}")
+        
+        available_columns = pl.read_parquet_schema(institutions_file).keys()
+        columns = [
+            (name, sql_type) for name, sql_type in INSTITUTION_COLUMN_TYPES.items()
+            if name in available_columns
+        ]
+        column_ddl = ',\n'.join(
+            f"{name} {sql_type}{' PRIMARY KEY' if name == 'id' else ''}"
+            for name, sql_type in columns
+        )
+        column_list = ', '.join(name for name, _ in columns)
+        sort_keys = [key for key in ('country_code', 'webometrics_rank', 'display_name', 'id')
+                     if key in available_columns]
+        
+        if temp_file.exists():
+            temp_file.unlink()
+        
+        spill_dir = output_dir / f'.duckdb_tmp.{os.getpid()}'
+        connection = duckdb.connect(str(temp_file))
+        try:
+            if memory_limit:
+                connection.execute(f"SET memory_limit='{memory_limit}B'")
+                connection.execute(f"SET temp_directory='{spill_dir}'")
+            connection.execute(f"CREATE TABLE institutions (\n{column_ddl}\n)")
+            connection.execute(f"""
+                INSERT INTO institutions ({column_list})
+                SELECT {column_list}
+                FROM read_parquet('{institutions_file}')
+                ORDER BY {', '.join(f'{key} NULLS LAST' for key in sort_keys)}
+            """)
+            if 'country_code' in available_columns:
+                connection.execute("CREATE INDEX idx_institutions_country_code ON institutions (country_code)")
+            if 'webometrics_rank' in available_columns:
+                connection.execute("CREATE INDEX idx_institutions_webometrics_rank ON institutions (webometrics_rank)")
+            connection.execute("CHECKPOINT")
+        except Exception:
+            connection.close()
+            temp_file.unlink(missing_ok=True)
+            shutil.rmtree(spill_dir, ignore_errors=True)
+            raise
+        connection.close()
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        
+        # Replace atomically so a worker never attaches a half-written file
+        os.replace(temp_file, database_file)
+        
+        self.stdout.write(f"Saved DuckDB database ({database_file.stat().st_size} bytes)")
+        
+        run.set_stat('database_file_size', database_file.stat().st_size)
+        run.save()
+    
+    def _create_suggest_index(self, df, output_dir, run):
+        """Create the trigram index used for typo-tolerant autocomplete."""
+        
+        self.stdout.write(f"Creating suggest index in {output_dir}")
+        
+        counts = write_suggest_index(df, output_dir)
+        
+        self.stdout.write(f"Created suggest index with {counts['terms']} terms and {counts['trigrams']} trigrams")
+        
+        run.set_stat('suggest_terms', counts['terms'])
+        run.save()
+    
+    def _create_suggest_index_batched(self, institutions_file, output_dir, run, memory_limit=None):
+        """
+        Create the suggest index from ``institutions_file`` in bounded memory.
+        
+        Terms are created a chunk of rows at a time and sorted by DuckDB,
+        which spills to disk. The memory the term batches free is not handed
+        back before DuckDB sorts, so each gets half of ``memory_limit`` bytes.
+        """
+        
+        memory_limit = memory_limit // 2 if memory_limit else None
+        batch_size = streaming_chunk_size(memory_limit) if memory_limit else MAX_STREAMING_CHUNK_SIZE
+        
+        self.stdout.write(f"Creating suggest index in {output_dir} ({batch_size} rows per batch)")
+        
+        counts = write_suggest_index_batched(institutions_file, output_dir, batch_size, memory_limit)
+        
+        self.stdout.write(f"Created suggest index with {counts['terms']} terms and {counts['trigrams']} trigrams")
+        
+        run.set_stat('suggest_terms', counts['terms'])
+        run.save()
+    
+    def _create_feature_matrix(self, df, output_dir, run):
+        """Create the float32 feature matrix used for recommendation scoring."""
+        
+        self.stdout.write(f"Creating feature matrix in {output_dir}")
+        
+        counts = write_feature_matrix(df, output_dir)
+        
+        self.stdout.write(f"Created feature matrix for {counts['institutions']} institutions ({counts['bytes']} bytes)")
+        
+        run.set_stat('feature_matrix_size', counts['bytes'])
+        run.save()
+    
     def _create_search_index(self, df, output_dir, run):
         """Create a search index for faster text queries."""
         
@@ -302,39 +780,33 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Creating search index at {search_index_file}")
         
-        # Create search tokens from institution names
-        search_df = df.select([
-            'id',
-            'display_name',
-            'canonical_name',
-            'country_code',
-        ]).with_columns([
-            # Create searchable tokens
-            pl.col('display_name').map_elements(self._create_search_tokens).alias('search_tokens')
-        ])
-        
+        # Create search tokens from institution names, unless shards already did
+        search_df = search_index_frame(df)
         search_df.write_parquet(search_index_file)
         
         self.stdout.write(f"Created search index with {len(search_df)} entries")
     
-    def _create_search_tokens(self, name):
-        """Create search tokens from institution name."""
-        if not name:
-            return []
+    def _create_search_index_batched(self, institutions_file, output_dir, run, batch_size):
+        """Create the search index from ``institutions_file``, ``batch_size`` rows at a time."""
         
-        import re
-        
-        # Split into words and create variants
-        tokens = []
-        
-        # Original words
-        words = re.findall(r'\b\w+\b', name.lower())
-        tokens.extend(words)
+        search_index_file = output_dir / 'search_index.parquet'
         
-        # Acronyms (first letters)
-        if len(words) > 1:
-            acronym = ''.join(word[0] for word in words)
-            tokens.append(acronym)
+        self.stdout.write(f"Creating search index at {search_index_file} ({batch_size} rows per batch)")
         
-        # Remove duplicates
-        return list(set(tokens))
+        entries = 0
+        writer = None
+        try:
+            for batch in pq.ParquetFile(institutions_file).iter_batches(batch_size=batch_size, columns=SEARCH_COLUMNS):
+                table = search_index_frame(pl.from_arrow(batch)).to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(search_index_file, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                entries += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # No rows, so no batches: write the empty index with its schema
+            search_index_frame(pl.read_parquet(institutions_file, columns=SEARCH_COLUMNS)).write_parquet(search_index_file)
+        
+        self.stdout.write(f"Created search index with {entries} entries")
@@ -11,13 +11,14 @@ import json
 import zipfile
 import pandas as pd
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.conf import settings
 from django.utils import timezone
 from apps.dataset.models import IngestionRun
+from apps.dataset.management.base import DatasetCommand
 
 
-class Command(BaseCommand):
+class Command(DatasetCommand):
     help = 'Download university data from Kaggle dataset'
     
     def add_arguments(self, parser):
@@ -8,13 +8,14 @@ Example usage:
 import csv
 import json
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.conf import settings
 from django.utils import timezone
 from apps.dataset.models import IngestionRun
+from apps.dataset.management.base import DatasetCommand
 
 
-class Command(BaseCommand):
+class Command(DatasetCommand):
     help = 'Load Webometrics ranking data from CSV file'
     
     def add_arguments(self, parser):
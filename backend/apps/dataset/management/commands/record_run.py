@@ -9,12 +9,13 @@ Example usage:
 """
 
 import json
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.utils import timezone
 from apps.dataset.models import IngestionRun
+from apps.dataset.management.base import DatasetCommand
 
 
-class Command(BaseCommand):
+class Command(DatasetCommand):
     help = 'Record an ingestion run in the database'
     
     def add_arguments(self, parser):
@@ -9,12 +9,13 @@ Example usage:
 
 import json
 from pathlib import Path
-from django.core.management.base import BaseCommand, CommandError
+from django.core.management.base import CommandError
 from django.conf import settings
 from apps.dataset.services import DatasetService
+from apps.dataset.management.base import DatasetCommand
 
 
-class Command(BaseCommand):
+class Command(DatasetCommand):
     help = 'Validate a dataset version'
     
     def add_arguments(self, parser):
@@ -0,0 +1,394 @@
+"""
+Entity resolution between OpenAlex institutions and Webometrics rankings.
+
+``match_rankings`` links each ranking to an institution in three stages:
+
+1. **Exact** - equal normalized names, as curation always did.
+2. **Domain** - the same registered homepage domain, when the names are at
+   least ``DOMAIN_MIN_SIMILARITY`` similar or the domain's first label
+   contains one of their words (``utoronto.ca`` for "University of Toronto",
+   ``mit.edu`` for "MIT"). Domains of more than
+   ``MAX_DOMAIN_INSTITUTIONS`` institutions are hosting services
+   (``sites.google.com``), not institutions, and never match.
+3. **Fuzzy** - trigram Jaccard similarity of the normalized names.
+
+Comparing every institution with every ranking is O(N x M), so stages 2 and
+3 only score candidate pairs from blocks: a ranking is compared with the
+institutions of its country (or without one) that share one of its
+``BLOCK_KEYS`` rarest name tokens (the second only while the block stays
+under ``MAX_BLOCK_SIZE`` names), or its homepage domain. Similarities are
+computed with Polars list set operations, ``PAIR_BATCH_SIZE`` pairs at a
+time.
+
+Blocks are grouped into shards by ranking country and scored in a process
+pool. Each institution and each ranking ends up in at most one domain or
+fuzzy match: a pair is kept when each side is the other's best candidate
+and the confidence reaches ``MIN_CONFIDENCE``.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from .curation import process_pool
+
+# Lowest confidence accepted for a domain or fuzzy match
+MIN_CONFIDENCE = 0.7
+
+# Confidence of a domain match with no name overlap; name similarity fills the rest
+DOMAIN_CONFIDENCE = 0.8
+
+# Lowest name similarity of a domain match whose domain label has no name word
+DOMAIN_MIN_SIMILARITY = 0.15
+
+# Institutions sharing a homepage domain beyond which it is not matched on
+MAX_DOMAIN_INSTITUTIONS = 3
+
+# Rarest name tokens of each ranking used as its blocking keys
+BLOCK_KEYS = 2
+
+# Names in a ranking's country sharing its blocking tokens, beyond which only
+# its rarest token blocks
+MAX_BLOCK_SIZE = 200
+
+# Candidate pairs scored at once, bounding the memory of the trigram lists
+PAIR_BATCH_SIZE = 50000
+
+# Names split into trigrams at once
+NAME_BATCH_SIZE = 50000
+
+# Shorter tokens ("of", "de") never block
+MIN_TOKEN_LENGTH = 3
+
+# Rankings per shard below which automatic sharding stays in-process
+MIN_SHARD_RANKINGS = 5000
+
+# Generic second-level labels under country domains (ox.ac.uk, unsw.edu.au)
+SECOND_LEVEL_LABELS = ['ac', 'co', 'com', 'edu', 'gov', 'net', 'org']
+
+# Columns of the pairs score_shard returns
+SCORED_SCHEMA = {'_i': pl.UInt32, '_w': pl.UInt32, 'confidence': pl.Float64, 'method': pl.Utf8}
+
+# Lower bounds of the confidence buckets reported by match_rankings
+CONFIDENCE_BUCKETS = (0.7, 0.8, 0.9, 1.0)
+
+
+def homepage_domain(url):
+    """
+    Return the registered domain of a homepage URL as a Polars expression.
+
+    Drops the scheme, port, path and subdomains, so ``http://web.mit.edu/``
+    and ``https://mit.edu`` both give ``mit.edu``. Hosts under a generic
+    second level of a country (``ox.ac.uk``) keep three labels. URLs without
+    a dotted host become null.
+    """
+    host = (
+        url.str.to_lowercase()
+        .str.strip_chars()
+        .str.replace(r'^[a-z][a-z0-9+.-]*://', '')
+        .str.replace(r'[/:?#].*$', '')
+        .str.strip_chars('.')
+    )
+    labels = host.str.split('.')
+    kept = (
+        pl.when(
+            (labels.list.len() >= 3)
+            & labels.list.get(-2, null_on_oob=True).is_in(SECOND_LEVEL_LABELS)
+            & (labels.list.last().str.len_chars() == 2)
+        )
+        .then(3)
+        .otherwise(2)
+    )
+    return pl.when(labels.list.len() >= 2).then(labels.list.tail(kept).list.join('.')).otherwise(None)
+
+
+def _tokens(df, row):
+    """Return ``(row, token)`` for the distinct blocking tokens of each name."""
+    return (
+        df.select([row, pl.col('normalized_name').str.split(' ').alias('token')])
+        .explode('token')
+        .filter(pl.col('token').str.len_chars() >= MIN_TOKEN_LENGTH)
+        .unique()
+    )
+
+
+def _trigrams(df, row):
+    """Return ``(row, trigrams)`` with the distinct trigrams of each padded name."""
+    names = df.select([row, pl.concat_str([pl.lit('  '), pl.col('normalized_name'), pl.lit(' ')]).alias('_padded')])
+    # One name per trigram while splitting, so split a slice of names at a time
+    return pl.concat([
+        batch.with_columns(pl.int_ranges(0, pl.col('_padded').str.len_chars() - 2).alias('_offset'))
+        .explode('_offset')
+        .group_by(row)
+        .agg(pl.col('_padded').str.slice(pl.col('_offset'), 3).unique().alias('trigrams'))
+        for batch in names.iter_slices(NAME_BATCH_SIZE)
+    ])
+
+
+def _label_named(df, row):
+    """Return ``(row, label_named)``: whether the first label of each domain contains a word of the name."""
+    return (
+        df.filter(pl.col('domain').is_not_null())
+        .select([
+            row,
+            pl.col('domain').str.split('.').list.first().alias('_label'),
+            pl.col('normalized_name').str.split(' ').alias('_word'),
+        ])
+        .explode('_word')
+        .filter(pl.col('_word').str.len_chars() >= MIN_TOKEN_LENGTH)
+        .group_by(row)
+        .agg(pl.col('_label').str.contains(pl.col('_word'), literal=True).any().alias('label_named'))
+    )
+
+
+def score_shard(institutions: pl.DataFrame, rankings: pl.DataFrame, min_confidence: float) -> Tuple[pl.DataFrame, int]:
+    """
+    Score the candidate pairs of one shard.
+
+    ``institutions`` has ``_i``, ``normalized_name``, ``country_code`` and
+    ``domain``; ``rankings`` has ``_w``, ``normalized_name``, ``country``,
+    ``domain`` and ``block_tokens``. Returns the pairs reaching
+    ``min_confidence`` as ``_i``, ``_w``, ``confidence`` and ``method``, and
+    how many pairs were scored.
+    """
+    institution_tokens = _tokens(institutions, '_i').join(
+        institutions.select(['_i', 'country_code']), on='_i'
+    )
+    ranking_tokens = rankings.select(['_w', 'country', pl.col('block_tokens').alias('token')]).explode('token')
+
+    countryless = pl.col('country_code').is_null()
+    pairs = [
+        institution_tokens.filter(~countryless).join(
+            ranking_tokens.filter(pl.col('country').is_not_null()),
+            left_on=['country_code', 'token'], right_on=['country', 'token']
+        ),
+        institution_tokens.filter(countryless).join(ranking_tokens, on='token'),
+        institution_tokens.filter(~countryless).join(
+            ranking_tokens.filter(pl.col('country').is_null()), on='token'
+        ),
+        institutions.filter(pl.col('domain').is_not_null()).join(
+            rankings.filter(pl.col('domain').is_not_null()), on='domain'
+        ).filter(
+            pl.col('country_code').is_null() | pl.col('country').is_null()
+            | (pl.col('country_code') == pl.col('country'))
+        ),
+    ]
+    pairs = pl.concat([pair.select(['_i', '_w']) for pair in pairs]).unique()
+    if pairs.is_empty():
+        return pl.DataFrame(schema=SCORED_SCHEMA), 0
+
+    # Trigrams and domain labels only for the names that are actually compared
+    compared_institutions = institutions.join(pairs.select('_i').unique(), on='_i')
+    compared_rankings = rankings.join(pairs.select('_w').unique(), on='_w')
+    institution_grams = _trigrams(compared_institutions, '_i')
+    ranking_grams = _trigrams(compared_rankings, '_w')
+    institution_labels = _label_named(compared_institutions, '_i')
+    ranking_labels = _label_named(compared_rankings, '_w')
+
+    batches = []
+    for batch in pairs.iter_slices(PAIR_BATCH_SIZE):
+        batches.append(
+            batch
+            .join(institution_grams, on='_i')
+            .join(ranking_grams, on='_w', suffix='_ranking')
+            .join(institutions.select(['_i', 'domain']), on='_i')
+            .join(rankings.select(['_w', 'domain']), on='_w', suffix='_ranking')
+            .join(institution_labels, on='_i', how='left')
+            .join(ranking_labels, on='_w', how='left', suffix='_ranking')
+            .with_columns(
+                (
+                    pl.col('trigrams').list.set_intersection('trigrams_ranking').list.len()
+                    / pl.col('trigrams').list.set_union('trigrams_ranking').list.len()
+                ).alias('similarity')
+            )
+            .with_columns(
+                (
+                    (pl.col('domain') == pl.col('domain_ranking'))
+                    & (
+                        (pl.col('similarity') >= DOMAIN_MIN_SIMILARITY)
+                        | pl.col('label_named').fill_null(False)
+                        | pl.col('label_named_ranking').fill_null(False)
+                    )
+                ).fill_null(False).alias('domain_match')
+            )
+            .with_columns([
+                pl.when(pl.col('domain_match'))
+                .then(DOMAIN_CONFIDENCE + (1 - DOMAIN_CONFIDENCE) * pl.col('similarity'))
+                .otherwise(pl.col('similarity'))
+                .alias('confidence'),
+                pl.when(pl.col('domain_match')).then(pl.lit('domain')).otherwise(pl.lit('fuzzy')).alias('method'),
+            ])
+            .filter(pl.col('confidence') >= min_confidence)
+            .select(['_i', '_w', 'confidence', 'method'])
+        )
+    scored = pl.concat(batches)
+    return scored, pairs.height
+
+
+def _shard_countries(rankings: pl.DataFrame, shards: int) -> List[List[Optional[str]]]:
+    """Split ranking countries into ``shards`` groups of similar ranking counts."""
+    sizes = rankings.group_by('country').len().sort(['len', 'country'], descending=[True, False], nulls_last=True)
+    groups = [[] for _ in range(shards)]
+    loads = [0] * shards
+    for country, size in sizes.iter_rows():
+        smallest = loads.index(min(loads))
+        groups[smallest].append(country)
+        loads[smallest] += size
+    return [group for group in groups if group]
+
+
+def _shard(institutions: pl.DataFrame, rankings: pl.DataFrame, countries) -> Tuple[pl.DataFrame, pl.DataFrame]:
+    """Return the institutions and rankings a shard of ranking ``countries`` compares."""
+    named = [country for country in countries if country is not None]
+    in_countries = pl.col('country').is_in(named)
+    if None in countries:
+        # Countryless rankings may match an institution in any country
+        return institutions, rankings.filter(in_countries | pl.col('country').is_null())
+    return (
+        institutions.filter(pl.col('country_code').is_in(named) | pl.col('country_code').is_null()),
+        rankings.filter(in_countries),
+    )
+
+
+def _score_shards(institutions, rankings, workers, min_confidence) -> Tuple[pl.DataFrame, int]:
+    """Score every shard, in a process pool when there is more than one."""
+    if workers is None:
+        workers = min(os.cpu_count() or 1, rankings.height // MIN_SHARD_RANKINGS)
+    shards = [
+        _shard(institutions, rankings, countries)
+        for countries in _shard_countries(rankings, max(1, workers))
+    ]
+
+    if len(shards) <= 1:
+        results = [score_shard(*shard, min_confidence) for shard in shards]
+    else:
+        with process_pool(len(shards)) as executor:
+            futures = [executor.submit(score_shard, *shard, min_confidence) for shard in shards]
+            results = [future.result() for future in futures]
+
+    scored = pl.concat([result[0] for result in results]) if results else pl.DataFrame(schema=SCORED_SCHEMA)
+    return scored, sum(result[1] for result in results)
+
+
+def _mutual_best(scored: pl.DataFrame) -> pl.DataFrame:
+    """Keep the pairs where each side is the other's best candidate."""
+    ordered = scored.sort(['confidence', '_i', '_w'], descending=[True, False, False])
+    best_ranking = ordered.unique(subset=['_i'], keep='first', maintain_order=True)
+    best_institution = ordered.unique(subset=['_w'], keep='first', maintain_order=True)
+    return best_ranking.join(best_institution.select(['_i', '_w']), on=['_i', '_w'], how='semi')
+
+
+def confidence_distribution(confidences: pl.Series) -> Dict[str, int]:
+    """Count matches per ``CONFIDENCE_BUCKETS`` bucket (e.g. ``0.8-0.9``, ``1.0``)."""
+    distribution = {}
+    for index, lower in enumerate(CONFIDENCE_BUCKETS):
+        if index == len(CONFIDENCE_BUCKETS) - 1:
+            label, in_bucket = f"{lower}", confidences >= lower
+        else:
+            upper = CONFIDENCE_BUCKETS[index + 1]
+            label, in_bucket = f"{lower}-{upper}", (confidences >= lower) & (confidences < upper)
+        distribution[label] = int(in_bucket.sum())
+    return distribution
+
+
+def match_rankings(
+    institutions: pl.DataFrame,
+    rankings: pl.DataFrame,
+    workers: Optional[int] = None,
+    min_confidence: float = MIN_CONFIDENCE,
+    claimed: Optional[pl.Series] = None,
+) -> Tuple[pl.DataFrame, Dict[str, Any]]:
+    """
+    Match Webometrics ``rankings`` to ``institutions``.
+
+    Args:
+        institutions: ``normalized_name``, ``country_code`` and optionally
+            ``homepage_url``, one row per institution
+        rankings: ``normalized_name``, ``rank``, ``country`` and optionally
+            ``homepage_url``
+        workers: Processes scoring shards (defaults to the CPU count for
+            large inputs; 1 scores in-process)
+        min_confidence: Lowest confidence accepted for a non-exact match
+        claimed: Positions in ``rankings`` already matched elsewhere (e.g.
+            to institutions kept from an earlier version), left out of the
+            domain and fuzzy stages
+
+    Returns:
+        The matches as ``row`` and ``ranking`` (positions in
+        ``institutions`` and ``rankings``), ``rank``, ``country``,
+        ``confidence`` and ``method``, one row per matched institution, and
+        match statistics.
+    """
+    def with_domain(df):
+        url = pl.col('homepage_url') if 'homepage_url' in df.columns else pl.lit(None, dtype=pl.Utf8)
+        return homepage_domain(url.cast(pl.Utf8)).alias('domain')
+
+    institutions = institutions.with_row_index('_i').select(['_i', 'normalized_name', 'country_code', with_domain(institutions)])
+    rankings = rankings.with_row_index('_w').select(['_w', 'normalized_name', 'rank', 'country', with_domain(rankings)])
+    shared_domains = (
+        institutions.group_by('domain').len()
+        .filter(pl.col('domain').is_not_null() & (pl.col('len') > MAX_DOMAIN_INSTITUTIONS))['domain']
+    )
+    if not shared_domains.is_empty():
+        unshared = pl.when(~pl.col('domain').is_in(shared_domains.implode())).then(pl.col('domain')).alias('domain')
+        institutions = institutions.with_columns(unshared)
+        rankings = rankings.with_columns(unshared)
+    named_rankings = rankings.filter(pl.col('normalized_name') != '')
+
+    # Stage 1: equal names, keeping the best rank per name
+    exact = institutions.join(
+        named_rankings.sort('rank', nulls_last=True, maintain_order=True)
+        .unique(subset=['normalized_name'], keep='first', maintain_order=True)
+        .select(['normalized_name', '_w']),
+        on='normalized_name'
+    ).select(['_i', '_w', pl.lit(1.0).alias('confidence'), pl.lit('exact').alias('method')])
+
+    # Stages 2 and 3 on what is left, blocked by each ranking's rarest tokens
+    remaining_institutions = institutions.join(exact.select('_i'), on='_i', how='anti')
+    remaining_rankings = named_rankings.join(exact.select('_w'), on='_w', how='anti')
+    if claimed is not None:
+        remaining_rankings = remaining_rankings.filter(~pl.col('_w').is_in(claimed.cast(pl.UInt32).implode()))
+
+    def country_tokens(df, row, country):
+        return _tokens(df, row).join(df.select([row, pl.col(country).fill_null('').alias('_country')]), on=row)
+
+    token_counts = pl.concat([
+        country_tokens(remaining_institutions, '_i', 'country_code').select(['_country', 'token']),
+        country_tokens(remaining_rankings, '_w', 'country').select(['_country', 'token']),
+    ]).group_by(['_country', 'token']).len()
+    block_tokens = (
+        country_tokens(remaining_rankings, '_w', 'country')
+        .join(token_counts, on=['_country', 'token'])
+        .sort(['_w', 'len', 'token'])
+        .with_columns(pl.col('len').cum_sum().over('_w').alias('_block_size'))
+        # The rarest token always blocks; more only while the block stays small
+        .filter((pl.col('_block_size') == pl.col('len')) | (pl.col('_block_size') <= MAX_BLOCK_SIZE))
+        .group_by('_w', maintain_order=True)
+        .agg(pl.col('token').head(BLOCK_KEYS).alias('block_tokens'))
+    )
+    remaining_rankings = remaining_rankings.join(block_tokens, on='_w', how='left').with_columns(
+        pl.col('block_tokens').fill_null(pl.lit([], dtype=pl.List(pl.Utf8)))
+    )
+
+    candidate_pairs = 0
+    stage_matches = [exact]
+    if not remaining_institutions.is_empty() and not remaining_rankings.is_empty():
+        scored, candidate_pairs = _score_shards(remaining_institutions, remaining_rankings, workers, min_confidence)
+        stage_matches.append(_mutual_best(scored))
+
+    matches = (
+        pl.concat(stage_matches)
+        .join(rankings.select(['_w', 'rank', 'country']), on='_w')
+        .sort('_i')
+        .select([pl.col('_i').alias('row'), pl.col('_w').alias('ranking'), 'rank', 'country', 'confidence', 'method'])
+    )
+
+    methods = dict(matches.group_by('method').len().iter_rows())
+    stats = {
+        'ranking_match_rate': round(matches['ranking'].n_unique() / named_rankings.height, 4) if named_rankings.height else 0.0,
+        'ranking_matches': {method: methods.get(method, 0) for method in ('exact', 'domain', 'fuzzy')},
+        'ranking_match_confidence': confidence_distribution(matches['confidence']),
+        'ranking_candidate_pairs': candidate_pairs,
+    }
+    return matches, stats
@@ -0,0 +1,79 @@
+"""
+Whole-response cache for the public university endpoints.
+
+Popular searches (top ranked, by country) are identical for every user, so
+``cache_response`` stores the rendered JSON bytes of successful responses
+keyed by the active dataset version and the normalized query (see
+``conditional.request_digest``). A hit returns the bytes as they are,
+skipping the service, ``UniversitySerializer`` and the camelCase renderer.
+
+Each worker keeps an LRU bounded by ``DATASET_RESPONSE_CACHE_BYTES``. With
+``DATASET_RESPONSE_CACHE_SHARED`` enabled, entries are also written to the
+shared Django cache so workers fill each other's misses. Entries for an old
+dataset version are never read again once a new version is active, and age
+out of the LRU.
+"""
+
+import functools
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from apps.core.cache import TwoTierCache
+
+from .conditional import request_digest
+
+
+class ResponseCache(TwoTierCache):
+    """Rendered responses as ``(content_type, content)``, bounded by total bytes."""
+
+    @property
+    def maxsize(self) -> int:
+        return getattr(settings, 'DATASET_RESPONSE_CACHE_BYTES', 32 * 1024 * 1024)
+
+    @property
+    def use_shared(self) -> bool:
+        return getattr(settings, 'DATASET_RESPONSE_CACHE_SHARED', False)
+
+    def weigh(self, value: Tuple[str, bytes]) -> int:
+        return len(value[1])
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats['local_bytes'] = self._weight
+        return stats
+
+
+response_cache = ResponseCache(
+    'dataset-response',
+    timeout=getattr(settings, 'DATASET_RESPONSE_CACHE_TIMEOUT', 3600)
+)
+
+
+def cache_response(view):
+    """
+    Serve repeated GETs of a public view from ``response_cache``.
+
+    Goes above ``@api_view``; only 200 responses are stored.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        key = f"dataset:response:{request_digest(request)}"
+        entry = response_cache.get(key)
+        if entry is not None:
+            content_type, content = entry
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and request.method == 'GET':
+            if hasattr(response, 'render'):
+                response.render()
+            response_cache.set(key, (response['Content-Type'], response.content))
+        return response
+
+    return wrapper
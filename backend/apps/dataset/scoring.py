@@ -0,0 +1,107 @@
+"""
+Rule-based recommendation scoring over the precomputed feature matrix.
+
+The score used to be computed per candidate in Python
+(``LLMService._fallback_score`` then ``RecommendationService._apply_user_weights``)
+after the candidates had been fetched in rank order. ``compile_score`` turns
+the student's weights and country preferences into a weight vector over the
+percentile features of ``features``, so ranking every institution is one
+matrix-vector product and only the top ``k`` rows are read from DuckDB.
+
+* ``score`` - the weighted research activity, citation impact and rank
+  percentiles, plus placeholder scores for the weighted factors the dataset
+  has no data for and a boost for institutions in a preferred country,
+  clamped to [0, 1].
+* ``rule_score`` - the same features with every score feature weighted
+  equally, plus the country boost, capped at 1.0. It stands in for the LLM
+  score when the LLM is unavailable, so it is scaled by the mean of the
+  weights like an LLM score would be.
+
+The curated dataset has no tuition data, so budget preferences do not
+affect the score.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .features import SCORE_WEIGHTS
+
+BASE_SCORE = 0.5
+
+# Weights applied when the request leaves a factor out
+DEFAULT_WEIGHTS = {
+    'academics': 0.3,
+    'interests': 0.2,
+    'career': 0.2,
+    'location': 0.1,
+    'budget': 0.1,
+    'ranking': 0.05,
+    'research_activity': 0.05,
+    'citation_impact': 0.0,
+}
+
+# Fixed scores for weighted factors that have no feature yet
+PLACEHOLDER_SCORES = {'academics': 0.7, 'location': 0.5}
+
+# Boost for institutions in one of the student's preferred countries
+LOCATION_BOOST = 0.1
+
+# Every score feature counts equally in ``rule_score``
+RULE_WEIGHTS = np.full(len(SCORE_WEIGHTS), 1.0 / len(SCORE_WEIGHTS), dtype=np.float32)
+
+COUNTRY_CODE_PATTERN = re.compile(r'^[A-Za-z]{2}$')
+
+
+def weight_factor(weights: Optional[Dict[str, float]]) -> float:
+    """Return the multiplier applied to base scores for ``weights``."""
+    return sum(weights.values()) / len(weights) if weights else 1.0
+
+
+def preferred_countries(profile: Optional[Dict[str, Any]]) -> List[str]:
+    """Return the ISO country codes a student prefers, from profile or filters."""
+    profile = profile or {}
+    filters = profile.get('filters') or {}
+    values = []
+    for source in (profile.get('locations'), filters.get('countries'), filters.get('country')):
+        if isinstance(source, str):
+            source = [source]
+        values.extend(source or [])
+
+    countries = []
+    for value in values:
+        if isinstance(value, str) and COUNTRY_CODE_PATTERN.match(value.strip()):
+            code = value.strip().upper()
+            if code not in countries:
+                countries.append(code)
+    return countries
+
+
+def compile_score(
+    weights: Optional[Dict[str, float]],
+    profile: Optional[Dict[str, Any]]
+) -> Tuple[np.ndarray, float, List[str]]:
+    """
+    Compile weights and profile into a score over the percentile features.
+
+    The score of institution ``i`` is ``vector @ features[:, i] + offset``,
+    plus ``LOCATION_BOOST`` if its country is in the returned list (see
+    ``FeatureMatrix.top``).
+
+    Args:
+        weights: Recommendation weights (missing factors use ``DEFAULT_WEIGHTS``)
+        profile: Student profile as built by ``RecommendationService``
+
+    Returns:
+        Tuple of (float32 weight vector in ``SCORE_WEIGHTS`` order, offset,
+        preferred country codes)
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    vector = np.array([float(weights.get(weight, 0.0)) for weight in SCORE_WEIGHTS.values()], dtype=np.float32)
+
+    offset = sum(float(weights.get(factor, 0.0)) * score for factor, score in PLACEHOLDER_SCORES.items())
+    if offset == 0 and not vector.any():
+        offset = BASE_SCORE
+
+    return vector, offset, preferred_countries(profile)
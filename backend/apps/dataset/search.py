@@ -0,0 +1,229 @@
+"""
+In-memory full-text search over institution names.
+
+The index is built from ``search_index.parquet`` when a dataset version is
+loaded. Each token maps to a posting list of document numbers together with
+a precomputed BM25 weight, so answering a query is a handful of NumPy
+gathers rather than a scan over every name.
+"""
+
+import logging
+import re
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Names matching this need Python's accent folding (see ``with_words``)
+NON_ASCII_PATTERN = r'[^\x00-\x7F]'
+
+# Words skipped when forming acronyms ("Massachusetts Institute of Technology" -> "mit")
+ACRONYM_STOPWORDS = frozenset([
+    'of', 'the', 'and', 'at', 'in', 'for', 'de', 'del', 'des', 'du', 'la', 'le',
+    'di', 'da', 'do', 'der', 'fur', 'y', 'e', 'et', 'und',
+])
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weight of a token reached through prefix expansion relative to an exact hit
+PREFIX_MATCH_WEIGHT = 0.6
+
+
+def fold(text: str) -> str:
+    """Lowercase ``text`` and strip accents ("Montréal" -> "montreal")."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into folded word tokens."""
+    if not text:
+        return []
+    return WORD_PATTERN.findall(fold(text))
+
+
+def create_acronyms(words: List[str]) -> List[str]:
+    """Return the acronyms of a tokenized name, with and without stopwords."""
+    acronyms = []
+
+    if len(words) > 1:
+        acronyms.append(''.join(word[0] for word in words))
+        significant = [word for word in words if word not in ACRONYM_STOPWORDS]
+        if len(significant) > 1:
+            acronyms.append(''.join(word[0] for word in significant))
+
+    return acronyms
+
+
+def create_search_tokens(name: Optional[str]) -> List[str]:
+    """
+    Create the index tokens for an institution name.
+
+    Tokens are the folded words of the name plus its acronyms, both with and
+    without stopwords, so "MIT" and "UCLA" find their institutions.
+    """
+    words = tokenize(name)
+    return sorted(set(words) | set(create_acronyms(words)))
+
+
+def with_words(df: pl.DataFrame, column: str, alias: str) -> pl.DataFrame:
+    """
+    Add ``alias``, the ``tokenize`` words of ``column``, to ``df``.
+
+    ASCII names are split with native Polars string expressions. Polars
+    cannot fold accents the way ``fold`` does, so the few names with other
+    characters are tokenized in Python, keeping index tokens identical to
+    the query-time tokens.
+    """
+    names = pl.col(column)
+    df = df.with_columns(names.str.to_lowercase().str.extract_all(r'\w+').alias(alias))
+
+    non_ascii = names.str.contains(NON_ASCII_PATTERN).fill_null(False)
+    if df.select(non_ascii.any()).item():
+        folded = (
+            df.with_row_index('_words_row')
+            .filter(non_ascii)
+            .select('_words_row', names.map_elements(tokenize, return_dtype=pl.List(pl.Utf8)).alias('_folded'))
+        )
+        df = (
+            df.with_row_index('_words_row')
+            .join(folded, on='_words_row', how='left', maintain_order='left')
+            .with_columns(pl.coalesce('_folded', alias).alias(alias))
+            .drop(['_words_row', '_folded'])
+        )
+
+    return df.with_columns(pl.col(alias).fill_null(pl.lit([], dtype=pl.List(pl.Utf8))))
+
+
+def acronym_exprs(words: pl.Expr) -> Tuple[pl.Expr, pl.Expr]:
+    """Vectorized ``create_acronyms``: (all initials, initials without stopwords), null if absent."""
+    def initials(expr: pl.Expr) -> pl.Expr:
+        return expr.list.eval(pl.element().str.slice(0, 1)).list.join('')
+
+    significant = words.list.eval(pl.element().filter(~pl.element().is_in(list(ACRONYM_STOPWORDS))))
+    return (
+        pl.when(words.list.len() > 1).then(initials(words)),
+        pl.when(significant.list.len() > 1).then(initials(significant)),
+    )
+
+
+def search_tokens_expr(words: pl.Expr) -> pl.Expr:
+    """Vectorized ``create_search_tokens`` over a ``with_words`` column."""
+    return (
+        pl.concat_list([words, *acronym_exprs(words)])
+        .list.drop_nulls()
+        .list.unique()
+        .list.sort()
+    )
+
+
+class SearchIndex:
+    """Token -> posting list index with BM25 ranking and prefix matching."""
+
+    def __init__(self, ids: List[str], token_lists: List[List[str]]):
+        self.ids = pa.array(ids, type=pa.string())
+        self.size = len(ids)
+
+        postings = {}
+        doc_lengths = np.zeros(self.size, dtype=np.float32)
+        for doc, tokens in enumerate(token_lists):
+            tokens = set(tokens or ())
+            doc_lengths[doc] = len(tokens)
+            for token in tokens:
+                postings.setdefault(token, []).append(doc)
+
+        average_length = float(doc_lengths.mean()) if self.size else 0.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(average_length, 1.0))
+
+        self.vocabulary = sorted(postings)
+        self._postings = {}
+        self._weights = {}
+        for token, docs in postings.items():
+            docs = np.asarray(docs, dtype=np.int32)
+            idf = np.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Names contain each token at most once, so tf is always 1
+            self._postings[token] = docs
+            self._weights[token] = (idf * (BM25_K1 + 1) / (1 + length_norm[docs])).astype(np.float32)
+
+    @classmethod
+    def from_parquet(cls, path: Path) -> 'SearchIndex':
+        """Build the index from a curated ``search_index.parquet`` file."""
+        df = pl.read_parquet(path, columns=['id', 'canonical_name', 'search_tokens'])
+
+        token_lists = []
+        for tokens, canonical_name in zip(df['search_tokens'].to_list(), df['canonical_name'].to_list()):
+            token_lists.append(list(tokens or ()) + tokenize(canonical_name))
+
+        index = cls(df['id'].to_list(), token_lists)
+        logger.info(f"Built search index over {index.size} institutions ({len(index.vocabulary)} tokens)")
+        return index
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Return vocabulary tokens matching ``term`` exactly or by prefix."""
+        matches = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_left(self.vocabulary, term + '￿', start)
+        for token in self.vocabulary[start:end]:
+            if token != term:
+                matches.append((token, PREFIX_MATCH_WEIGHT))
+
+        return matches
+
+    def match(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return ``(docs, scores)`` for every document matching all query terms.
+
+        Each term matches tokens it equals or is a prefix of; a document's
+        score is the sum over terms of its best BM25 weight for that term.
+        """
+        terms = tokenize(query)
+        if not terms or not self.size:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        total = None
+        for term in dict.fromkeys(terms):
+            term_scores = np.zeros(self.size, dtype=np.float32)
+            for token, factor in self._expand(term):
+                docs = self._postings[token]
+                term_scores[docs] = np.maximum(term_scores[docs], self._weights[token] * factor)
+
+            if total is None:
+                total = term_scores
+            else:
+                total = np.where(term_scores > 0, total + term_scores, 0).astype(np.float32)
+
+        docs = np.flatnonzero(total).astype(np.int32)
+        return docs, total[docs]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return ``(id, score)`` pairs ordered by descending relevance."""
+        docs, scores = self.match(query)
+
+        if limit is not None and len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+
+        order = np.lexsort((docs, -scores))
+        ids = self.ids.take(pa.array(docs[order])).to_pylist()
+        return list(zip(ids, scores[order].tolist()))
+
+    def hits_table(self, query: str) -> pa.Table:
+        """Return matching documents as an Arrow table of ``(id, relevance)``."""
+        docs, scores = self.match(query)
+        return pa.table({
+            'id': self.ids.take(pa.array(docs)),
+            'relevance': pa.array(scores, type=pa.float32()),
+        })
@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from .cursors import decode_cursor
 from .models import IngestionRun
 
+# Deepest page reachable with ``offset``; use ``cursor`` to page further
+MAX_SEARCH_OFFSET = 10000
+
 
 class IngestionRunSerializer(serializers.ModelSerializer):
     """Serializer for ingestion runs."""
@@ -48,14 +52,112 @@ class UniversitySearchSerializer(serializers.Serializer):
     offset = serializers.IntegerField(
         default=0,
         min_value=0,
-        help_text="Offset for pagination"
+        max_value=MAX_SEARCH_OFFSET,
+        help_text="Offset for pagination (prefer cursor for deep pages)"
+    )
+    
+    facets = serializers.BooleanField(
+        default=False,
+        help_text="Include match counts by country, ranked/unranked and works_count bucket in meta.facets"
+    )
+    
+    cursor = serializers.CharField(
+        required=False,
+        help_text="Opaque cursor from a previous page's meta.next_cursor"
+    )
+    
+    lat = serializers.FloatField(
+        required=False,
+        min_value=-90,
+        max_value=90,
+        help_text="Latitude to measure distances from"
+    )
+    
+    lon = serializers.FloatField(
+        required=False,
+        min_value=-180,
+        max_value=180,
+        help_text="Longitude to measure distances from"
+    )
+    
+    radius_km = serializers.FloatField(
+        required=False,
+        min_value=0,
+        max_value=20040,
+        help_text="Only universities within this many km of lat/lon"
+    )
+    
+    bbox = serializers.CharField(
+        required=False,
+        help_text="Bounding box as south,west,north,east in degrees (west > east crosses the antimeridian)"
     )
     
     ordering = serializers.ChoiceField(
-        choices=['display_name', 'country', 'rank', 'works_count'],
-        default='display_name',
-        help_text="Field to order by"
+        choices=['relevance', 'display_name', 'country', 'rank', 'works_count', 'distance'],
+        required=False,
+        help_text="Field to order by (defaults to relevance when q is given, distance when lat/lon are, otherwise display_name)"
     )
+    
+    def validate_bbox(self, value):
+        try:
+            south, west, north, east = (float(part) for part in value.split(','))
+        except ValueError:
+            raise serializers.ValidationError("Expected four numbers: south,west,north,east")
+        if not (-90 <= south <= north <= 90) or not (-180 <= west <= 180 and -180 <= east <= 180):
+            raise serializers.ValidationError("Coordinates out of range or south > north")
+        return [south, west, north, east]
+    
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+    
+    def validate(self, attrs):
+        if 'cursor' in attrs:
+            ordering, attrs['after'] = attrs.pop('cursor')
+            if attrs.get('ordering', ordering) != ordering:
+                raise serializers.ValidationError({'cursor': "Cursor was issued for a different ordering"})
+            if attrs.get('offset'):
+                raise serializers.ValidationError({'cursor': "Cannot be combined with offset"})
+            attrs['ordering'] = ordering
+        if attrs.get('ordering') == 'relevance' and not attrs.get('q'):
+            raise serializers.ValidationError({'ordering': "Relevance ordering requires q"})
+        if ('lat' in attrs) != ('lon' in attrs):
+            raise serializers.ValidationError("lat and lon must be given together")
+        if 'lat' not in attrs:
+            if 'radius_km' in attrs:
+                raise serializers.ValidationError({'radius_km': "Requires lat and lon"})
+            if attrs.get('ordering') == 'distance':
+                raise serializers.ValidationError({'ordering': "Distance ordering requires lat and lon"})
+        return attrs
+
+
+class UniversitySuggestSerializer(serializers.Serializer):
+    """Serializer for autocomplete parameters."""
+    
+    q = serializers.CharField(
+        max_length=100,
+        help_text="Partially typed university name"
+    )
+    
+    limit = serializers.IntegerField(
+        default=10,
+        min_value=1,
+        max_value=20,
+        help_text="Maximum number of suggestions"
+    )
+
+
+class UniversitySuggestionSerializer(serializers.Serializer):
+    """Serializer for autocomplete suggestions."""
+    
+    id = serializers.CharField()
+    display_name = serializers.CharField()
+    country_code = serializers.CharField(allow_null=True)
+    webometrics_rank = serializers.IntegerField(allow_null=True)
+    matched = serializers.CharField()
+    distance = serializers.IntegerField(allow_null=True)
 
 
 class UniversitySerializer(serializers.Serializer):
@@ -71,6 +173,7 @@ class UniversitySerializer(serializers.Serializer):
     cited_by_count = serializers.IntegerField(allow_null=True)
     geo_latitude = serializers.FloatField(allow_null=True)
     geo_longitude = serializers.FloatField(allow_null=True)
+    distance_km = serializers.FloatField(required=False, allow_null=True)
     has_rank = serializers.BooleanField()
 
 
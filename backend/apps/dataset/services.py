@@ -1,107 +1,193 @@
 import os
 import json
 import logging
-import duckdb
+import functools
 import polars as pl
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from django.conf import settings
+from django.core.cache import cache
+from .cursors import keyset_condition, order_by_clause
+from .engine import get_base_path, get_engine, read_current_version
+from .facets import facet_cache_key, facet_ctes, parse_facets
+from .scoring import LOCATION_BOOST, RULE_WEIGHTS, compile_score
 
 logger = logging.getLogger(__name__)
 
 
+def uses_engine(method):
+    """
+    Hold a lease on the service's engine while ``method`` runs.
+
+    If the engine was retired by a version swap after the service was
+    created, the service moves to the currently active engine first.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        engine = self.engine
+        while not engine.acquire():
+            engine = self.engine = get_engine()
+            self.current_version = engine.version
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            engine.release()
+    return wrapper
+
+
 class DatasetService:
     """Service for accessing file-backed university dataset."""
     
     def __init__(self):
-        self.base_path = Path(getattr(settings, 'DATASET_BASE_PATH', '/data'))
-        self.current_version = self._get_current_version()
-        self._connection = None
+        self.base_path = get_base_path()
+        self.engine = get_engine()
+        self.current_version = self.engine.version
     
     def _get_current_version(self) -> str:
         """Get the current active dataset version."""
-        current_file = self.base_path / 'current'
-        
-        if current_file.is_file():
-            try:
-                with open(current_file, 'r') as f:
-                    return f.read().strip()
-            except Exception as e:
-                logger.warning(f"Error reading current version file: {e}")
-        
-        # Fallback to environment variable
-        return getattr(settings, 'DATASET_CURRENT_VERSION', '2025.09')
+        return read_current_version(self.base_path)
     
     @property
     def connection(self):
-        """Get or create DuckDB connection."""
-        if self._connection is None:
-            try:
-                self._connection = duckdb.connect(":memory:")
-                # Configure DuckDB settings
-                memory_limit = getattr(settings, 'DUCKDB_MEMORY_LIMIT', '2GB')
-                threads = getattr(settings, 'DUCKDB_THREADS', 4)
-                
-                self._connection.execute(f"SET memory_limit='{memory_limit}'")
-                self._connection.execute(f"SET threads={threads}")
-                
-            except Exception as e:
-                logger.error(f"Error creating DuckDB connection: {e}")
-                raise
-        
-        return self._connection
+        """Get this thread's cursor on the shared DuckDB engine."""
+        return self.engine.cursor()
     
     def get_dataset_path(self, filename: str) -> Path:
         """Get path to a dataset file."""
-        return self.base_path / 'curated' / self.current_version / filename
+        return self.engine.dataset_path / filename
     
     def _load_institutions_table(self):
-        """Load institutions parquet file into DuckDB."""
-        institutions_path = self.get_dataset_path('institutions.parquet')
-        
-        if not institutions_path.exists():
-            raise FileNotFoundError(f"Institutions dataset not found: {institutions_path}")
-        
+        """Make sure the shared engine has loaded the institutions table."""
         try:
-            self.connection.execute(f"""
-                CREATE OR REPLACE TABLE institutions AS 
-                SELECT * FROM read_parquet('{institutions_path}')
-            """)
-            logger.info(f"Loaded institutions table from {institutions_path}")
+            self.engine.load()
         except Exception as e:
             logger.error(f"Error loading institutions table: {e}")
             raise
     
+    @uses_engine
     def search_universities(
         self,
         filters: Dict[str, Any] = None,
         limit: int = 20,
         offset: int = 0,
-        ordering: str = 'display_name'
+        ordering: str = 'display_name',
+        after: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search universities with filters.
         
+        For keyset pagination pass ``after``, the sort key values of the
+        last row of the previous page (see ``cursors``), instead of an
+        offset; every page then costs the same however deep it is.
+        
+        Geographic filters are answered by the engine's spatial index (see
+        ``geo``): ``lat``/``lon`` with ``radius_km`` keeps universities within
+        that distance, ``bbox`` (south, west, north, east) keeps those inside
+        the box, and ``lat``/``lon`` alone with ``ordering='distance'``
+        returns the nearest ones. Whenever ``lat``/``lon`` are given, results
+        carry ``distance_km``.
+        
         Args:
             filters: Dictionary of filters to apply
             limit: Maximum number of results
             offset: Offset for pagination
             ordering: Field to order by
+            after: Sort key values to continue after (keyset pagination)
             
         Returns:
             List of university dictionaries
+            
+        Raises:
+            ValueError: If ``after`` continues an ordering the search cannot
+                use (see ``search_ordering``)
+        """
+        universities, _ = self._search(filters, limit, offset, ordering, after)
+        return universities
+    
+    @uses_engine
+    def search_ordering(self, filters: Optional[Dict[str, Any]], ordering: str) -> str:
         """
+        Return the ordering a search with ``filters`` is sorted by.
+        
+        ``relevance`` needs ``q`` and a search index, ``distance`` needs
+        ``lat``/``lon``; when the search cannot sort by ``ordering`` it
+        falls back to ``display_name``.
+        """
+        self._load_institutions_table()
+        filters = filters or {}
+        text_search = bool(filters.get('q')) and self.engine.search_index is not None
+        return ordering if ordering in self._valid_orderings(filters, text_search) else 'display_name'
+    
+    @staticmethod
+    def _valid_orderings(filters: Dict[str, Any], text_search: bool) -> set:
+        """Return the orderings a search with ``filters`` supports (see ``cursors``)."""
+        valid_orderings = {'display_name', 'country', 'rank', 'works_count'}
+        if text_search:
+            valid_orderings.add('relevance')
+        if filters.get('lat') is not None and filters.get('lon') is not None:
+            valid_orderings.add('distance')
+        return valid_orderings
+    
+    @uses_engine
+    def search_universities_with_facets(
+        self,
+        filters: Dict[str, Any] = None,
+        limit: int = 20,
+        offset: int = 0,
+        ordering: str = 'display_name',
+        after: Optional[List[Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, List[Dict[str, Any]]]]]:
+        """
+        Search universities and count every match by facet (see ``facets``).
+        
+        Facet counts cover all universities matching ``filters``, not just
+        the page, and come from the same DuckDB statement as the page. They
+        are cached per dataset version and filters. Nearest-N searches
+        (``lat``/``lon`` without ``radius_km`` or ``bbox``) have no fixed
+        set of matches, so their facets are None.
+        
+        Returns:
+            Tuple of (university dictionaries, facets)
+        """
+        filters = filters or {}
+        if filters.get('lat') is not None and filters.get('radius_km') is None and not filters.get('bbox'):
+            universities, _ = self._search(filters, limit, offset, ordering, after)
+            return universities, None
+        
+        cache_key = facet_cache_key(self.engine.version, filters)
+        facets = cache.get(cache_key)
+        universities, counted = self._search(filters, limit, offset, ordering, after, with_facets=facets is None)
+        if facets is None:
+            facets = counted
+            cache.set(cache_key, facets, getattr(settings, 'DATASET_FACET_CACHE_TIMEOUT', 3600))
+        return universities, facets
+    
+    def _search(
+        self,
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        offset: int,
+        ordering: str,
+        after: Optional[List[Any]],
+        with_facets: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, List[Dict[str, Any]]]]]:
+        """Run a search, optionally counting facets over all matches in the same statement."""
         try:
             self._load_institutions_table()
             
             # Build WHERE clause from filters
             where_conditions = []
             params = {}
+            search_hits = None
+            filters = filters or {}
             
             if filters:
                 if 'q' in filters and filters['q']:
-                    where_conditions.append("display_name ILIKE ?")
-                    params['q'] = f"%{filters['q']}%"
+                    if self.engine.search_index is not None:
+                        search_hits = self.engine.search_index.hits_table(filters['q'])
+                    else:
+                        where_conditions.append("display_name ILIKE ?")
+                        params['q'] = f"%{filters['q']}%"
                 
                 if 'country' in filters and filters['country']:
                     where_conditions.append("country_code = ?")
@@ -110,21 +196,41 @@ class DatasetService:
                 if 'has_rank' in filters and filters['has_rank']:
                     where_conditions.append("webometrics_rank IS NOT NULL")
             
+            # Text matches are joined from the in-memory search index
+            from_clause = "institutions"
+            extra_columns = ""
+            if search_hits is not None:
+                from_clause = "institutions JOIN search_hits USING (id)"
+                extra_columns += ",\n                    relevance"
+            
+            # Geographic matches are joined from the spatial index
+            has_origin = filters.get('lat') is not None and filters.get('lon') is not None
+            geo_search = has_origin or bool(filters.get('bbox'))
+            if geo_search:
+                from_clause += " JOIN geo_hits USING (id)"
+                extra_columns += ",\n                    distance_km"
+            
+            # Build ORDER BY clause (every ordering ends with id, see cursors)
+            if ordering not in self._valid_orderings(filters, search_hits is not None):
+                if after is not None:
+                    # Paging on from a cursor of another ordering would restart at page 1
+                    raise ValueError(f"Cannot continue a {ordering!r} search from a cursor on this dataset")
+                ordering = 'display_name'
+            order_clause = order_by_clause(ordering)
+            
             where_clause = ""
             if where_conditions:
                 where_clause = "WHERE " + " AND ".join(where_conditions)
             
-            # Build ORDER BY clause
-            valid_orderings = {
-                'display_name': 'display_name ASC',
-                'country': 'country_code ASC',
-                'rank': 'webometrics_rank ASC NULLS LAST',
-                'works_count': 'works_count DESC NULLS LAST'
-            }
-            
-            order_clause = valid_orderings.get(ordering, 'display_name ASC')
+            # Keyset pagination: only rows sorting after the previous page
+            page_clause = ""
+            if after is not None:
+                condition, condition_params = keyset_condition(ordering, after)
+                page_clause = f"WHERE {condition}"
+                for i, value in enumerate(condition_params):
+                    params[f'after_{i}'] = value
             
-            query = f"""
+            matched_query = f"""
                 SELECT 
                     id,
                     display_name,
@@ -135,21 +241,61 @@ class DatasetService:
                     works_count,
                     cited_by_count,
                     geo_latitude,
-                    geo_longitude
-                FROM institutions
+                    geo_longitude{extra_columns}
+                FROM {from_clause}
                 {where_clause}
-                ORDER BY {order_clause}
-                LIMIT ? OFFSET ?
             """
             
+            if not with_facets:
+                query = f"""
+                    WITH matched AS ({matched_query})
+                    SELECT * FROM matched
+                    {page_clause}
+                    ORDER BY {order_clause}
+                    LIMIT ? OFFSET ?
+                """
+            else:
+                # One statement: the matches are materialized once, then
+                # both aggregated into facets and paged. The facet row is
+                # outer joined so it comes back even for an empty page.
+                query = f"""
+                    WITH matched AS MATERIALIZED ({matched_query}),
+                    {facet_ctes('matched')},
+                    page AS (
+                        SELECT * FROM matched
+                        {page_clause}
+                        ORDER BY {order_clause}
+                        LIMIT ? OFFSET ?
+                    )
+                    SELECT page.*, facet_list.facets
+                    FROM facet_list LEFT JOIN page ON TRUE
+                    ORDER BY {order_clause}
+                """
+            
             # Add limit and offset parameters
             params['limit'] = limit
             params['offset'] = offset
             
-            result = self.connection.execute(query, list(params.values())).fetchall()
+            cursor = self.connection
+            if search_hits is not None:
+                cursor.register('search_hits', search_hits)
+            try:
+                if not geo_search:
+                    result = cursor.execute(query, list(params.values())).fetchall()
+                else:
+                    result = self._execute_geo_query(cursor, query, list(params.values()), filters, limit, offset)
+            finally:
+                if search_hits is not None:
+                    cursor.unregister('search_hits')
             
             # Convert to list of dictionaries
-            columns = [desc[0] for desc in self.connection.description]
+            columns = [desc[0] for desc in cursor.description]
+            facets = None
+            if with_facets:
+                columns = columns[:-1]
+                facets = parse_facets(result[0][-1] if result else [])
+                result = [row[:-1] for row in result if row[0] is not None]
+            
             universities = []
             
             for row in result:
@@ -158,12 +304,86 @@ class DatasetService:
                 university['has_rank'] = university['webometrics_rank'] is not None
                 universities.append(university)
             
-            return universities
+            return universities, facets
             
         except Exception as e:
             logger.error(f"Error searching universities: {e}")
             raise
     
+    def _execute_geo_query(
+        self, cursor, query: str, params: List[Any], filters: Dict[str, Any], limit: int, offset: int
+    ):
+        """
+        Run ``query`` joined with the spatial index matches for ``filters``.
+        
+        A nearest-N search (no radius or box) starts with the ``limit +
+        offset`` nearest universities and widens while the other filters
+        leave too few of them.
+        """
+        geo_index = self.engine.geo()
+        lat, lon = filters.get('lat'), filters.get('lon')
+        origin = (lat, lon) if lat is not None and lon is not None else None
+        bounded = filters.get('radius_km') is not None or bool(filters.get('bbox'))
+        count = limit + offset
+        
+        while True:
+            if filters.get('bbox'):
+                hit_columns, distances = geo_index.within_bbox(*filters['bbox'], origin=origin)
+                if filters.get('radius_km') is not None:
+                    inside = distances <= filters['radius_km']
+                    hit_columns, distances = hit_columns[inside], distances[inside]
+            elif filters.get('radius_km') is not None:
+                hit_columns, distances = geo_index.within_radius(lat, lon, filters['radius_km'])
+            else:
+                hit_columns, distances = geo_index.nearest(lat, lon, count)
+            
+            cursor.register('geo_hits', geo_index.hits_table(hit_columns, distances))
+            try:
+                result = cursor.execute(query, params).fetchall()
+            finally:
+                cursor.unregister('geo_hits')
+            
+            if bounded or len(result) >= limit or len(hit_columns) < count:
+                return result
+            count *= 4
+    
+    @uses_engine
+    def suggest_universities(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest universities whose names complete a partially typed query.
+        
+        Args:
+            q: Text typed so far (typos are tolerated)
+            limit: Maximum number of suggestions
+            
+        Returns:
+            List of suggestion dictionaries, best first
+        """
+        try:
+            self._load_institutions_table()
+            
+            if self.engine.suggest_index is not None:
+                return self.engine.suggest_index.suggest(q, limit=limit)
+            
+            # Versions curated before the suggest index existed
+            universities = self.search_universities(filters={'q': q}, limit=limit, ordering='relevance')
+            return [
+                {
+                    'id': university['id'],
+                    'display_name': university['display_name'],
+                    'country_code': university['country_code'],
+                    'webometrics_rank': university['webometrics_rank'],
+                    'matched': university['display_name'],
+                    'distance': None,
+                }
+                for university in universities
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error suggesting universities: {e}")
+            raise
+    
+    @uses_engine
     def get_university(self, university_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a specific university by ID.
@@ -198,145 +418,29 @@ class DatasetService:
             logger.error(f"Error getting university {university_id}: {e}")
             raise
     
-    def recommend(
-        self,
-        filters: Dict[str, Any] = None,
-        weights: Dict[str, float] = None,
-        limit: int = 20
-    ) -> List[Dict[str, Any]]:
-        """
-        Generate university recommendations based on filters and weights.
-        
-        Args:
-            filters: Filters to apply
-            weights: Weights for different scoring factors
-            limit: Maximum number of recommendations
-            
-        Returns:
-            List of recommendation dictionaries with scores
-        """
-        try:
-            self._load_institutions_table()
-            
-            # Default weights
-            default_weights = {
-                'academics': 0.3,
-                'interests': 0.2,
-                'career': 0.2,
-                'location': 0.1,
-                'budget': 0.1,
-                'ranking': 0.05,
-                'research_activity': 0.05
-            }
-            
-            if weights:
-                default_weights.update(weights)
-            
-            # Build scoring query
-            score_components = []
-            
-            # Research activity score (normalized works_count)
-            if default_weights['research_activity'] > 0:
-                score_components.append(f"""
-                    {default_weights['research_activity']} * 
-                    COALESCE(
-                        LEAST(works_count / 100000.0, 1.0), 
-                        0.0
-                    )
-                """)
-            
-            # Ranking score (inverse normalized webometrics_rank)
-            if default_weights['ranking'] > 0:
-                score_components.append(f"""
-                    {default_weights['ranking']} * 
-                    COALESCE(
-                        1.0 - (webometrics_rank / 10000.0),
-                        0.0
-                    )
-                """)
-            
-            # Default academic score (placeholder)
-            if default_weights['academics'] > 0:
-                score_components.append(f"{default_weights['academics']} * 0.7")
-            
-            # Base location score (can be enhanced with user preferences)
-            if default_weights['location'] > 0:
-                score_components.append(f"{default_weights['location']} * 0.5")
-            
-            if not score_components:
-                score_components = ["0.5"]  # Default score
-            
-            score_expression = " + ".join(score_components)
-            
-            # Build WHERE clause from filters
-            where_conditions = []
-            params = {}
-            
-            if filters:
-                if 'country' in filters and filters['country']:
-                    where_conditions.append("country_code = ?")
-                    params['country'] = filters['country'].upper()
-                
-                if 'min_rank' in filters and filters['min_rank']:
-                    where_conditions.append("webometrics_rank <= ?")
-                    params['min_rank'] = filters['min_rank']
-                
-                if 'has_research' in filters and filters['has_research']:
-                    where_conditions.append("works_count > 1000")
-            
-            where_clause = ""
-            if where_conditions:
-                where_clause = "WHERE " + " AND ".join(where_conditions)
-            
-            query = f"""
-                SELECT 
-                    id,
-                    display_name,
-                    canonical_name,
-                    country_code,
-                    homepage_url,
-                    webometrics_rank,
-                    works_count,
-                    cited_by_count,
-                    ({score_expression}) as score
-                FROM institutions
-                {where_clause}
-                ORDER BY score DESC
-                LIMIT ?
-            """
-            
-            params['limit'] = limit
-            result = self.connection.execute(query, list(params.values())).fetchall()
-            
-            # Convert to list of dictionaries
-            columns = [desc[0] for desc in self.connection.description]
-            recommendations = []
-            
-            for row in result:
-                rec = dict(zip(columns, row))
-                # Normalize score to [0, 1] range
-                rec['score'] = min(1.0, max(0.0, rec['score']))
-                rec['name'] = rec['display_name']  # Alias for compatibility
-                recommendations.append(rec)
-            
-            return recommendations
-            
-        except Exception as e:
-            logger.error(f"Error generating recommendations: {e}")
-            raise
-    
+    @uses_engine
     def get_matching_universities(
         self,
         filters: Dict[str, Any] = None,
-        limit: int = 50
+        limit: int = 50,
+        weights: Optional[Dict[str, float]] = None,
+        profile: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get universities matching basic filters (no complex scoring).
-        LLM will handle the intelligent ranking.
+        Get universities matching basic filters.
+        
+        Without weights, universities come back in rank order with a
+        placeholder score and the LLM handles the intelligent ranking. With
+        weights, every matching university is scored with the engine's
+        feature matrix (see ``scoring.compile_score``) and only the top
+        ``limit`` are read from DuckDB and returned, best first, with
+        ``rule_score`` and ``score`` filled in.
         
         Args:
             filters: Basic filters to apply
             limit: Maximum number of universities to return
+            weights: Recommendation weights to score with
+            profile: Student profile (country preferences)
             
         Returns:
             List of university dictionaries
@@ -346,6 +450,7 @@ class DatasetService:
             
             # Build basic filter query
             where_conditions = []
+            search_hits = None
             
             if filters:
                 # Country filter
@@ -355,11 +460,15 @@ class DatasetService:
                 
                 # Search term filter
                 if 'search' in filters and filters['search']:
-                    search_term = filters['search'].replace("'", "''")  # Escape quotes
-                    where_conditions.append(f"""
-                        (LOWER(display_name) LIKE LOWER('%{search_term}%') 
-                         OR LOWER(canonical_name) LIKE LOWER('%{search_term}%'))
-                    """)
+                    if self.engine.search_index is not None:
+                        search_hits = self.engine.search_index.hits_table(filters['search'])
+                        where_conditions.append("id IN (SELECT id FROM search_hits)")
+                    else:
+                        search_term = filters['search'].replace("'", "''")  # Escape quotes
+                        where_conditions.append(f"""
+                            (LOWER(display_name) LIKE LOWER('%{search_term}%') 
+                             OR LOWER(canonical_name) LIKE LOWER('%{search_term}%'))
+                        """)
                 
                 # Minimum ranking filter
                 if 'max_rank' in filters and filters['max_rank']:
@@ -368,8 +477,7 @@ class DatasetService:
             # Build complete query
             where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
             
-            query = f"""
-                SELECT 
+            columns = """
                     id,
                     display_name,
                     canonical_name,
@@ -380,16 +488,28 @@ class DatasetService:
                     cited_by_count,
                     geo_latitude,
                     geo_longitude
-                FROM institutions 
-                {where_clause}
-                ORDER BY 
-                    COALESCE(webometrics_rank, 99999),
-                    works_count DESC
-                LIMIT {limit}
             """
             
             # Execute query and return results
-            results = self.conn.execute(query).fetchall()
+            cursor = self.connection
+            if search_hits is not None:
+                cursor.register('search_hits', search_hits)
+            try:
+                if weights is None:
+                    results = cursor.execute(f"""
+                        SELECT {columns}, NULL AS rule_score, 0.5 AS score
+                        FROM institutions 
+                        {where_clause}
+                        ORDER BY 
+                            COALESCE(webometrics_rank, 99999),
+                            works_count DESC
+                        LIMIT {int(limit)}
+                    """).fetchall()
+                else:
+                    results = self._score_matching(cursor, columns, where_clause, limit, weights, profile)
+            finally:
+                if search_hits is not None:
+                    cursor.unregister('search_hits')
             
             universities = []
             for row in results:
@@ -404,7 +524,8 @@ class DatasetService:
                     'cited_by_count': row[7],
                     'geo_latitude': row[8],
                     'geo_longitude': row[9],
-                    'score': 0.5  # Placeholder - LLM will provide real scoring
+                    'rule_score': row[10],
+                    'score': row[11]  # Placeholder unless weights were given
                 })
             
             logger.info(f"Retrieved {len(universities)} matching universities")
@@ -414,6 +535,50 @@ class DatasetService:
             logger.error(f"Error getting matching universities: {e}")
             return []
     
+    def _score_matching(
+        self,
+        cursor,
+        columns: str,
+        where_clause: str,
+        limit: int,
+        weights: Dict[str, float],
+        profile: Optional[Dict[str, Any]]
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Score the universities matching ``where_clause`` and fetch the best.
+        
+        Every institution (or only the filtered ones) is scored with one
+        matrix-vector product over the feature matrix; DuckDB only answers
+        the filters and reads the ``limit`` winning rows.
+        
+        Returns:
+            Rows of ``columns`` followed by rule_score and score, best first
+        """
+        features = self.engine.features()
+        vector, offset, countries = compile_score(weights, profile)
+        
+        candidates = None
+        if where_clause:
+            matching = cursor.execute(f"SELECT id FROM institutions {where_clause}").fetchall()
+            candidates = features.columns_for(row[0] for row in matching)
+        
+        top = features.top(vector, limit, offset, candidates, countries, LOCATION_BOOST)
+        if not top:
+            return []
+        
+        top_ids = [university_id for university_id, _ in top]
+        rule_scores = features.scores(RULE_WEIGHTS, 0.0, features.columns_for(top_ids), countries, LOCATION_BOOST)
+        placeholders = ', '.join('?' * len(top_ids))
+        rows = {
+            row[0]: row
+            for row in cursor.execute(f"SELECT {columns} FROM institutions WHERE id IN ({placeholders})", top_ids).fetchall()
+        }
+        return [
+            rows[university_id] + (min(1.0, float(rule_score)), min(1.0, max(0.0, score)))
+            for (university_id, score), rule_score in zip(top, rule_scores)
+        ]
+    
+    @uses_engine
     def validate_dataset(self) -> Dict[str, Any]:
         """
         Validate the current dataset.
@@ -454,6 +619,7 @@ class DatasetService:
                 'valid': True,
                 'version': self.current_version,
                 'dataset_path': str(institutions_path),
+                'storage': self.engine.storage,
                 'stats': stats
             }
             
@@ -466,7 +632,5 @@ class DatasetService:
             }
     
     def close(self):
-        """Close DuckDB connection."""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        """Release this service's reference to the shared engine."""
+        self.engine = None
@@ -0,0 +1,482 @@
+"""
+Typo-tolerant autocomplete over institution names.
+
+``curate`` writes two files next to the curated dataset:
+
+* ``suggest_terms.parquet`` - one row per suggestable term (the folded
+  display name, the canonical name, the name starting at each later word,
+  and its acronyms), ordered so that better ranked institutions come first,
+  plus the permutation that sorts the terms alphabetically.
+* ``suggest_trigrams.parquet`` - for every trigram of a term's first
+  ``PREFIX_CHARS`` characters, the sorted list of term numbers containing it.
+
+Exact completions are a binary search over the sorted term prefixes. Only
+when they cannot fill the requested number of suggestions does a lookup
+count shared trigrams to pick a small candidate set, then compute the edit
+distance between the query and the best matching prefix of each candidate,
+vectorized over all candidates with NumPy.
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import duckdb
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .search import ACRONYM_STOPWORDS, acronym_exprs, create_acronyms, tokenize, with_words
+
+logger = logging.getLogger(__name__)
+
+TERMS_FILE = 'suggest_terms.parquet'
+TRIGRAMS_FILE = 'suggest_trigrams.parquet'
+
+# Only the start of a term is indexed; suggestions complete what was typed
+PREFIX_CHARS = 16
+
+# Bytes of each term kept in the sorted prefix array
+PREFIX_BYTES = 24
+
+# Trigram-overlap candidates that get an exact edit distance computed
+MAX_CANDIDATES = 256
+
+# Institution columns the index is built from
+SUGGEST_COLUMNS = ['id', 'display_name', 'canonical_name', 'country_code', 'webometrics_rank', 'works_count']
+
+
+def create_suggest_terms(display_name: Optional[str], canonical_name: Optional[str] = None) -> List[str]:
+    """
+    Create the terms a name can be completed from.
+
+    "University of Toronto" yields "university of toronto", "toronto",
+    "uot" and "ut", so typing any of them suggests the institution.
+    """
+    words = tokenize(display_name)
+    terms = [' '.join(words)]
+
+    canonical_words = tokenize(canonical_name)
+    if canonical_words:
+        terms.append(' '.join(canonical_words))
+
+    for position, word in enumerate(words[1:], start=1):
+        if word not in ACRONYM_STOPWORDS and len(word) >= 3:
+            terms.append(' '.join(words[position:]))
+
+    terms.extend(create_acronyms(words))
+    return [term for term in dict.fromkeys(terms) if term]
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Fold a typed query the same way terms are folded."""
+    return ' '.join(tokenize(query))[:PREFIX_CHARS]
+
+
+def query_trigrams(text: str) -> List[str]:
+    """Return the padded trigrams of a (normalized) term prefix."""
+    padded = '  ' + text[:PREFIX_CHARS]
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def max_edits(length: int) -> int:
+    """Number of typos tolerated for a query of ``length`` characters."""
+    if length <= 2:
+        return 0
+    if length <= 5:
+        return 1
+    return 2
+
+
+def suggest_terms_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Vectorized ``create_suggest_terms``: one row per distinct term of each row of ``df``.
+
+    Adds ``term`` and ``_row`` (the row's position in ``df``) to the columns of ``df``.
+    """
+    names = df.select(['display_name', 'canonical_name']).with_row_index('_row')
+    names = with_words(names, 'display_name', '_words')
+    names = with_words(names, 'canonical_name', '_canonical_words').select(['_row', '_words', '_canonical_words'])
+
+    words = pl.col('_words')
+    position = pl.col('_position')
+    word = words.list.get(position)
+    suffixes = (
+        names.select(['_row', '_words', pl.int_ranges(1, words.list.len()).alias('_position')])
+        .explode('_position')
+        .filter(position.is_not_null())
+        .filter(~word.is_in(list(ACRONYM_STOPWORDS)) & (word.str.len_chars() >= 3))
+        .select(['_row', words.list.slice(position).list.join(' ').alias('term')])
+    )
+    acronym, significant_acronym = acronym_exprs(words)
+
+    terms = (
+        pl.concat([
+            names.select(['_row', words.list.join(' ').alias('term')]),
+            names.select(['_row', pl.col('_canonical_words').list.join(' ').alias('term')]),
+            suffixes,
+            names.select(['_row', acronym.alias('term')]),
+            names.select(['_row', significant_acronym.alias('term')]),
+        ])
+        .filter(pl.col('term').is_not_null() & (pl.col('term') != ''))
+        .unique(['_row', 'term'])
+    )
+    return df.with_row_index('_row').join(terms, on='_row')
+
+
+def build_suggest_index(df: pl.DataFrame) -> tuple:
+    """
+    Build the ``(terms, trigrams)`` tables for curated institutions.
+
+    ``df`` needs id, display_name, canonical_name, country_code,
+    webometrics_rank and works_count columns.
+    """
+    terms = (
+        suggest_terms_frame(df.select(SUGGEST_COLUMNS))
+        .sort(
+            ['webometrics_rank', 'works_count', 'display_name', 'id', 'term', '_row'],
+            descending=[False, True, False, False, False, False],
+            nulls_last=True
+        )
+        .select(['term', 'id', 'display_name', 'country_code', 'webometrics_rank'])
+    )
+    terms = terms.with_columns(
+        pl.int_range(pl.len(), dtype=pl.Int32).sort_by('term', maintain_order=True).alias('prefix_order')
+    )
+
+    # Many terms share a prefix, so trigrams are split out once per distinct prefix
+    prefixes = terms.select([
+        pl.int_range(pl.len(), dtype=pl.Int32).alias('term_index'),
+        pl.col('term').str.slice(0, PREFIX_CHARS).alias('prefix'),
+    ])
+    padded = pl.concat_str([pl.lit('  '), pl.col('prefix')])
+    prefix_trigrams = prefixes.select('prefix').unique().with_columns(
+        pl.concat_list([padded.str.slice(i, 3) for i in range(PREFIX_CHARS)])
+        .list.eval(pl.element().filter(pl.element().str.len_chars() == 3))
+        .list.unique()
+        .alias('trigram')
+    )
+    trigrams = (
+        prefixes.join(prefix_trigrams, on='prefix')
+        .select(['term_index', 'trigram'])
+        .explode('trigram')
+        .group_by('trigram')
+        .agg(pl.col('term_index').sort())
+        .sort('trigram')
+    )
+
+    return terms, trigrams
+
+
+def write_suggest_index(df: pl.DataFrame, output_dir: Path) -> Dict[str, int]:
+    """Build the suggest index for ``df`` and write it to ``output_dir``."""
+    terms, trigrams = build_suggest_index(df)
+    terms.write_parquet(Path(output_dir) / TERMS_FILE)
+    trigrams.write_parquet(Path(output_dir) / TRIGRAMS_FILE)
+    return {'terms': len(terms), 'trigrams': len(trigrams)}
+
+
+def write_suggest_index_batched(
+    institutions_file: Path,
+    output_dir: Path,
+    batch_size: int,
+    memory_limit: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Build the suggest index from a Parquet file without loading it into memory.
+
+    Terms are created ``batch_size`` rows at a time and written to scratch
+    Parquet files. DuckDB then sorts the terms, their alphabetical order and
+    their ``(trigram, term)`` pairs, spilling to disk beyond ``memory_limit``
+    bytes, and the sorted files are zipped and grouped a batch at a time. The
+    files written are the same as ``write_suggest_index`` writes for the
+    whole frame.
+    """
+    output_dir = Path(output_dir)
+    scratch_dir = output_dir / f'.suggest_tmp.{os.getpid()}'
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir()
+    try:
+        offset = 0
+        term_count = 0
+        batches = pq.ParquetFile(institutions_file).iter_batches(batch_size=batch_size, columns=SUGGEST_COLUMNS)
+        for number, batch in enumerate(batches):
+            terms = suggest_terms_frame(pl.from_arrow(batch)).with_columns(pl.col('_row').cast(pl.Int64) + offset)
+            terms.write_parquet(scratch_dir / f'terms-{number:06d}.parquet')
+            offset += batch.num_rows
+            term_count += terms.height
+        if not term_count:
+            return write_suggest_index(pl.read_parquet(institutions_file, columns=SUGGEST_COLUMNS), output_dir)
+
+        sorted_file = scratch_dir / 'sorted.parquet'
+        order_file = scratch_dir / 'order.parquet'
+        pairs_file = scratch_dir / 'pairs.parquet'
+        sorted_terms = f"read_parquet('{sorted_file}', file_row_number = true)"
+        padded = f"'  ' || substring(term, 1, {PREFIX_CHARS})"
+        connection = duckdb.connect()
+        try:
+            if memory_limit:
+                connection.execute(f"SET memory_limit='{memory_limit}B'")
+            connection.execute(f"SET temp_directory='{scratch_dir / 'spill'}'")
+            connection.execute(f"""
+                COPY (
+                    SELECT term, id, display_name, country_code, webometrics_rank
+                    FROM read_parquet('{scratch_dir}/terms-*.parquet')
+                    ORDER BY webometrics_rank NULLS LAST, works_count DESC NULLS LAST,
+                             display_name NULLS LAST, id NULLS LAST, term, _row
+                ) TO '{sorted_file}' (FORMAT parquet)
+            """)
+            # Term numbers in alphabetical order, equal terms in index order
+            connection.execute(f"""
+                COPY (
+                    SELECT file_row_number::INTEGER AS prefix_order
+                    FROM {sorted_terms}
+                    ORDER BY term, file_row_number
+                ) TO '{order_file}' (FORMAT parquet)
+            """)
+            connection.execute(f"""
+                COPY (
+                    SELECT trigram, term_index
+                    FROM (
+                        SELECT file_row_number::INTEGER AS term_index, unnest(list_distinct(list_filter(
+                            [substring({padded}, position, 3) FOR position IN range(1, {PREFIX_CHARS + 1})],
+                            lambda trigram: length(trigram) = 3
+                        ))) AS trigram
+                        FROM {sorted_terms}
+                    )
+                    ORDER BY trigram, term_index
+                ) TO '{pairs_file}' (FORMAT parquet)
+            """)
+        finally:
+            connection.close()
+
+        _write_tables(_zip_prefix_order(sorted_file, order_file, batch_size), output_dir / TERMS_FILE)
+        trigram_count = _write_tables(_group_trigrams(pairs_file, batch_size), output_dir / TRIGRAMS_FILE)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {'terms': term_count, 'trigrams': trigram_count}
+
+
+def _zip_prefix_order(sorted_file: Path, order_file: Path, batch_size: int) -> Iterator[pa.Table]:
+    """Yield the sorted terms with their ``prefix_order`` column, a batch at a time."""
+    orders = pq.ParquetFile(order_file).iter_batches(batch_size=batch_size)
+    pending = pa.array([], type=pa.int32())
+    for batch in pq.ParquetFile(sorted_file).iter_batches(batch_size=batch_size):
+        while len(pending) < batch.num_rows:
+            pending = pa.concat_arrays([pending, next(orders).column(0)])
+        yield pa.Table.from_batches([batch]).append_column('prefix_order', pending[:batch.num_rows])
+        pending = pending[batch.num_rows:]
+
+
+def _group_trigrams(pairs_file: Path, batch_size: int) -> Iterator[pa.Table]:
+    """Yield one sorted list of term numbers per trigram from pairs sorted by trigram."""
+    carry = None
+    for batch in pq.ParquetFile(pairs_file).iter_batches(batch_size=batch_size):
+        pairs = pl.from_arrow(batch)
+        if carry is not None:
+            pairs = pl.concat([carry, pairs])
+        # The last trigram of a batch may continue in the next one
+        complete = pl.col('trigram') != pairs['trigram'][-1]
+        carry = pairs.filter(~complete)
+        yield pairs.filter(complete).group_by('trigram', maintain_order=True).agg('term_index').to_arrow()
+    if carry is not None:
+        yield carry.group_by('trigram', maintain_order=True).agg('term_index').to_arrow()
+
+
+def _write_tables(tables: Iterable[pa.Table], path: Path) -> int:
+    """Write Arrow tables of one schema to a Parquet file and return the row count."""
+    rows = 0
+    writer = None
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def prefix_bytes(terms: pa.Array) -> np.ndarray:
+    """Return the first ``PREFIX_BYTES`` UTF-8 bytes of each term as ``S`` strings."""
+    terms = terms.cast(pa.large_string())
+    offsets = np.frombuffer(terms.buffers()[1], dtype=np.int64)[terms.offset:terms.offset + len(terms) + 1]
+    data = np.frombuffer(terms.buffers()[2], dtype=np.uint8) if len(terms) else np.zeros(1, dtype=np.uint8)
+
+    starts, ends = offsets[:-1], offsets[1:]
+    raw = np.zeros((len(terms), PREFIX_BYTES), dtype=np.uint8)
+    for k in range(PREFIX_BYTES):
+        positions = starts + k
+        raw[:, k] = np.where(positions < ends, data[np.minimum(positions, len(data) - 1)], 0)
+
+    return raw.view(f'S{PREFIX_BYTES}').ravel()
+
+
+def prefix_distances(query: str, candidates: List[str]) -> np.ndarray:
+    """
+    Return the edit distance from ``query`` to the closest prefix of each
+    candidate (optimal string alignment, so a swap of neighbours is one edit).
+    """
+    length = len(query)
+    width = length + max_edits(length)
+
+    padded = ''.join(candidate[:width].ljust(width, '\0') for candidate in candidates)
+    codes = np.frombuffer(padded.encode('utf-32-le'), dtype=np.uint32).reshape(len(candidates), width)
+    query_codes = [ord(ch) for ch in query]
+
+    columns = np.arange(width + 1, dtype=np.int16)
+    previous = np.broadcast_to(columns, (len(candidates), width + 1)).copy()
+    before_previous = None
+
+    for i in range(1, length + 1):
+        char = query_codes[i - 1]
+        # Substitution (or match) and deletion from the row above
+        best = np.minimum(previous[:, :-1] + (codes != char), previous[:, 1:] + 1, dtype=np.int16)
+        if i > 1:
+            swapped = (codes[:, :-1] == char) & (codes[:, 1:] == query_codes[i - 2])
+            best[:, 1:] = np.where(swapped, np.minimum(best[:, 1:], before_previous[:, :-2] + 1), best[:, 1:])
+
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        current[:, 1:] = best
+        # Insertions run left to right: d[j] = min(d[j], d[j-1] + 1)
+        current = np.minimum.accumulate(current - columns, axis=1) + columns
+
+        before_previous, previous = previous, current
+
+    return previous.min(axis=1)
+
+
+class SuggestIndex:
+    """Trigram candidate index with prefix edit-distance ranking."""
+
+    def __init__(self, terms: pa.Table, trigrams: pa.Table):
+        # A single chunk keeps ``take`` on the hot path cheap
+        self.terms = terms.combine_chunks()
+        self.size = terms.num_rows
+
+        # Term prefixes in alphabetical order, for exact completions
+        self._prefix_order = self.terms.column('prefix_order').to_numpy()
+        term_column = self.terms.column('term')
+        term_column = term_column.chunk(0) if term_column.num_chunks else pa.array([], type=pa.large_string())
+        self._prefixes = prefix_bytes(term_column)[self._prefix_order]
+
+        postings = trigrams.column('term_index').combine_chunks()
+        self._trigram_numbers = {
+            trigram: number for number, trigram in enumerate(trigrams.column('trigram').to_pylist())
+        }
+        self._offsets = postings.offsets.to_numpy()
+        self._postings = postings.values.to_numpy()
+
+    @classmethod
+    def from_parquet(cls, dataset_path: Path) -> 'SuggestIndex':
+        """Load the index written by ``write_suggest_index``."""
+        terms = pl.read_parquet(Path(dataset_path) / TERMS_FILE).to_arrow()
+        trigrams = pl.read_parquet(Path(dataset_path) / TRIGRAMS_FILE).to_arrow()
+
+        index = cls(terms, trigrams)
+        logger.info(f"Loaded suggest index with {index.size} terms ({len(index._trigram_numbers)} trigrams)")
+        return index
+
+    def _completions(self, query: str) -> np.ndarray:
+        """Return the best ranked terms starting with ``query``, best first."""
+        prefix = query.encode('utf-8')[:PREFIX_BYTES]
+        start = np.searchsorted(self._prefixes, prefix, side='left')
+        if len(prefix) < PREFIX_BYTES:
+            # UTF-8 never contains 0xff, so this sorts after every completion
+            end = np.searchsorted(self._prefixes, prefix + b'\xff', side='left')
+        else:
+            end = np.searchsorted(self._prefixes, prefix, side='right')
+
+        matches = self._prefix_order[start:end]
+        if len(matches) > MAX_CANDIDATES:
+            matches = np.partition(matches, MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+        return np.sort(matches).astype(np.int64)
+
+    def _candidates(self, query: str, edits: int) -> np.ndarray:
+        """Return term numbers sharing enough trigrams with ``query``."""
+        trigrams = query_trigrams(query)
+        posting_lists = []
+        for trigram in trigrams:
+            number = self._trigram_numbers.get(trigram)
+            if number is not None:
+                posting_lists.append(self._postings[self._offsets[number]:self._offsets[number + 1]])
+        if not posting_lists:
+            return np.empty(0, dtype=np.int64)
+
+        # Each edit destroys at most three trigrams
+        required = max(1, len(trigrams) - 3 * edits)
+        counts = np.bincount(np.concatenate(posting_lists), minlength=self.size)
+        candidates = np.flatnonzero(counts >= required)
+
+        if len(candidates) > MAX_CANDIDATES:
+            # Most shared trigrams first, then the better ranked term
+            keys = counts[candidates] * self.size - candidates
+            top = np.argpartition(-keys, MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+            candidates = np.sort(candidates[top])
+
+        return candidates
+
+    def _first_per_institution(self, ordered: np.ndarray, limit: int) -> List[int]:
+        """Return positions in ``ordered`` of each institution's best term."""
+        ids = self.terms.column('id').take(pa.array(ordered)).to_pylist()
+        picked = []
+        seen = set()
+        for position, institution_id in enumerate(ids):
+            if institution_id not in seen:
+                seen.add(institution_id)
+                picked.append(position)
+                if len(picked) >= limit:
+                    break
+        return picked
+
+    def _suggestions(self, term_numbers: np.ndarray, distances: List[int]) -> List[Dict[str, Any]]:
+        """Format suggestion rows for the given terms."""
+        rows = self.terms.take(pa.array(term_numbers)).to_pylist()
+        return [
+            {
+                'id': row['id'],
+                'display_name': row['display_name'],
+                'country_code': row['country_code'],
+                'webometrics_rank': row['webometrics_rank'],
+                'matched': row['term'],
+                'distance': distance,
+            }
+            for row, distance in zip(rows, distances)
+        ]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` institutions whose names complete ``query``."""
+        query = normalize_query(query)
+        if not query or not self.size:
+            return []
+
+        # Exact completions always rank first, so they are enough on their own
+        # whenever they cover ``limit`` institutions
+        completions = self._completions(query)
+        if len(query.encode('utf-8')) < PREFIX_BYTES:
+            picked = self._first_per_institution(completions, limit)
+            if len(picked) >= limit:
+                return self._suggestions(completions[picked], [0] * len(picked))
+
+        edits = max_edits(len(query))
+        candidates = np.union1d(completions, self._candidates(query, edits))
+        if not len(candidates):
+            return []
+
+        candidate_terms = self.terms.column('term').take(pa.array(candidates)).to_pylist()
+        distances = prefix_distances(query, candidate_terms)
+
+        keep = distances <= edits
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.lexsort((candidates, distances))
+        ordered = candidates[order]
+
+        picked = self._first_per_institution(ordered, limit)
+        return self._suggestions(ordered[picked], distances[order][picked].tolist())
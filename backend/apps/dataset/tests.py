@@ -1,9 +1,35 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+import duckdb
+import numpy as np
+import polars as pl
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+from . import health
 from .models import IngestionRun
+from .conditional import dataset_etag
+from .cursors import encode_cursor
+from .response_cache import response_cache
+from .engine import registry, reset_engine
+from .features import FEATURE_NAMES
+from .geo import GeoIndex, haversine_km
+from .matching import homepage_domain, match_rankings
+from .curation import normalized_name
+from .management.commands.curate import INSTITUTION_COLUMN_TYPES, STREAMING_ROW_BYTES
+from .search import SearchIndex, create_search_tokens
+from .suggest import (
+    TERMS_FILE, TRIGRAMS_FILE, create_suggest_terms, suggest_terms_frame, write_suggest_index,
+    write_suggest_index_batched
+)
 from .services import DatasetService
 
 User = get_user_model()
@@ -37,49 +63,768 @@ class IngestionRunModelTest(TestCase):
         self.assertTrue(run.is_completed)
 
 
+def write_curated_dataset(base_path, version, institutions):
+    """Write a minimal curated dataset version and point ``current`` at it."""
+    import polars as pl
+    
+    version_path = Path(base_path) / 'curated' / version
+    version_path.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame(institutions).write_parquet(version_path / 'institutions.parquet')
+    pl.DataFrame({
+        'id': [i['id'] for i in institutions],
+        'canonical_name': [i['canonical_name'] for i in institutions],
+        'search_tokens': [create_search_tokens(i['display_name']) for i in institutions],
+    }).write_parquet(version_path / 'search_index.parquet')
+    write_suggest_index(pl.DataFrame(institutions), version_path)
+    (Path(base_path) / 'current').write_text(version)
+    return version_path
+
+
+SAMPLE_INSTITUTIONS = [
+    {
+        'id': 'openalex_1', 'display_name': 'Stanford University',
+        'canonical_name': 'stanford-university', 'country_code': 'US',
+        'homepage_url': 'https://stanford.edu', 'webometrics_rank': 5,
+        'works_count': 50000, 'cited_by_count': 100000,
+        'geo_latitude': 37.4275, 'geo_longitude': -122.1697,
+    },
+    {
+        'id': 'openalex_2', 'display_name': 'University of Toronto',
+        'canonical_name': 'university-of-toronto', 'country_code': 'CA',
+        'homepage_url': 'https://utoronto.ca', 'webometrics_rank': 20,
+        'works_count': 40000, 'cited_by_count': 80000,
+        'geo_latitude': 43.6629, 'geo_longitude': -79.3957,
+    },
+    {
+        'id': 'openalex_3', 'display_name': 'Springfield College',
+        'canonical_name': 'springfield-college', 'country_code': 'US',
+        'homepage_url': None, 'webometrics_rank': None,
+        'works_count': 100, 'cited_by_count': 50,
+        'geo_latitude': None, 'geo_longitude': None,
+    },
+]
+
+
 class DatasetServiceTest(TestCase):
     def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        write_curated_dataset(self.temp_dir, '2025.09', SAMPLE_INSTITUTIONS)
+        
+        settings_override = override_settings(DATASET_BASE_PATH=self.temp_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        reset_engine()
+        self.addCleanup(reset_engine)
         self.service = DatasetService()
     
-    @patch('apps.dataset.services.Path.exists')
-    @patch('apps.dataset.services.duckdb.connect')
-    def test_search_universities(self, mock_connect, mock_exists):
+    def test_search_universities(self):
         """Test university search functionality."""
-        # Mock file existence
-        mock_exists.return_value = True
-        
-        # Mock DuckDB connection and results
-        mock_conn = MagicMock()
-        mock_connect.return_value = mock_conn
-        mock_conn.execute.return_value.fetchall.return_value = [
-            ('openalex_1', 'Stanford University', 'stanford-university', 'US', 
-             'https://stanford.edu', 5, 50000, 100000, 37.4275, -122.1697)
-        ]
-        mock_conn.description = [
-            ('id',), ('display_name',), ('canonical_name',), ('country_code',),
-            ('homepage_url',), ('webometrics_rank',), ('works_count',), 
-            ('cited_by_count',), ('geo_latitude',), ('geo_longitude',)
-        ]
-        
-        # Test search
         results = self.service.search_universities(
             filters={'country': 'US'},
             limit=10
         )
         
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['display_name'], 'Springfield College')
+        self.assertFalse(results[0]['has_rank'])
+        self.assertEqual(results[1]['display_name'], 'Stanford University')
+        self.assertTrue(results[1]['has_rank'])
+    
+    def test_get_matching_universities(self):
+        """Test candidate retrieval ordered by rank."""
+        results = self.service.get_matching_universities(
+            filters={'countries': ['US', 'CA']},
+            limit=10
+        )
+        
+        self.assertEqual([r['id'] for r in results], ['openalex_1', 'openalex_2', 'openalex_3'])
+    
+    def test_get_matching_universities_scored(self):
+        """Test candidates are ranked by weighted percentile features and prefer the student's countries."""
+        weights = {'academics': 0.0, 'location': 0.0, 'ranking': 0.0, 'research_activity': 0.0, 'citation_impact': 0.4}
+        results = self.service.get_matching_universities(limit=2, weights=weights, profile={'locations': ['ca']})
+        
+        # Equal citation impact, so the location boost decides
+        self.assertEqual([r['id'] for r in results], ['openalex_2', 'openalex_1'])
+        self.assertAlmostEqual(results[0]['score'], 0.4 * 0.5 + 0.1)
+        self.assertAlmostEqual(results[1]['score'], 0.4 * 0.5)
+        self.assertAlmostEqual(results[0]['rule_score'], 0.5 + 0.1, places=6)
+        self.assertAlmostEqual(results[1]['rule_score'], (1.0 + 0.5 + 1.0) / 3, places=6)
+        
+        results = self.service.get_matching_universities(
+            filters={'countries': ['US']}, weights={'ranking': 0.0, 'research_activity': 1.0}
+        )
+        self.assertEqual([r['id'] for r in results], ['openalex_1', 'openalex_3'])
+        self.assertAlmostEqual(results[0]['score'], 1.0)  # clamped
+        self.assertAlmostEqual(results[1]['score'], 0.3 * 0.7 + 0.1 * 0.5)  # default placeholders
+        self.assertEqual(results[1]['display_name'], 'Springfield College')
+    
+    def test_search_universities_near(self):
+        """Test radius, bounding box and nearest-N geographic searches."""
+        palo_alto = {'lat': 37.4419, 'lon': -122.1430}
+        results = self.service.search_universities(filters={**palo_alto, 'radius_km': 50}, ordering='distance')
+        self.assertEqual([r['id'] for r in results], ['openalex_1'])
+        self.assertLess(results[0]['distance_km'], 5)
+        
+        new_york = {'lat': 40.7128, 'lon': -74.0060}
+        results = self.service.search_universities(filters=new_york, limit=1, ordering='distance')
+        self.assertEqual([r['id'] for r in results], ['openalex_2'])
+        self.assertAlmostEqual(results[0]['distance_km'], 551, delta=5)
+        
+        # Other filters widen the nearest search until enough match
+        results = self.service.search_universities(filters={**new_york, 'country': 'US'}, limit=1, ordering='distance')
+        self.assertEqual([r['id'] for r in results], ['openalex_1'])
+        
+        results = self.service.search_universities(filters={'bbox': [30, -130, 50, -100]})
+        self.assertEqual([r['id'] for r in results], ['openalex_1'])
+        self.assertIsNone(results[0]['distance_km'])
+    
+    def test_readiness_checks_cached_and_time_boxed(self):
+        """Test dataset stats are computed once per version and slow checks time out."""
+        health.reset()
+        client = APIClient()
+        with patch.object(DatasetService, 'validate_dataset', autospec=True,
+                          side_effect=DatasetService.validate_dataset) as validate:
+            response = client.get('/api/readyz/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['data']['dataset_stats']['total_institutions'], 3)
+            self.assertTrue(response.data['data']['checks']['database']['ok'])
+            
+            response = client.get('/api/healthz/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(validate.call_count, 1)
+        
+        def slow_database():
+            time.sleep(0.5)
+            return {}
+        
+        with patch('apps.dataset.health._check_database', side_effect=slow_database), \
+                override_settings(HEALTH_CHECK_TIMEOUT=0.05):
+            started = time.perf_counter()
+            response = client.get('/api/readyz/')
+            self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertTrue(response.data['data']['duckdb_ok'])
+        self.assertIn('Timed out', response.data['data']['checks']['database']['error'])
+    
+    def test_cursor_pagination_matches_full_ordering(self):
+        """Test following next cursors visits every row once, in order, for each ordering."""
+        client = APIClient()
+        cases = [
+            ('display_name', ''), ('country', ''), ('rank', ''), ('works_count', ''),
+            ('relevance', '&q=university'), ('distance', '&lat=40.7&lon=-74.0'),
+        ]
+        for ordering, extra in cases:
+            full = client.get(f'/api/universities/?ordering={ordering}&limit=100{extra}').data
+            expected = [u['id'] for u in full['data']]
+            self.assertIsNone(full['meta']['next_cursor'])
+            
+            seen = []
+            url = f'/api/universities/?ordering={ordering}&limit=1{extra}'
+            response = client.get(url)
+            while True:
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen.extend(u['id'] for u in response.data['data'])
+                next_cursor = response.data['meta']['next_cursor']
+                if next_cursor is None:
+                    break
+                response = client.get(f'/api/universities/?cursor={next_cursor}&limit=1{extra}')
+            
+            self.assertEqual(seen, expected, ordering)
+            self.assertGreater(len(expected), 1, ordering)
+        
+        # Served from the response cache this time, as rendered (camelCased) JSON
+        first = client.get('/api/universities/?ordering=rank&limit=1').json()['meta']['nextCursor']
+        response = client.get(f'/api/universities/?cursor={first}&ordering=display_name')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = client.get('/api/universities/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_text_search_pages_without_search_index(self):
+        """Test q searches of a dataset without a search index page by name, and relevance cursors are rejected."""
+        version_path = write_curated_dataset(self.temp_dir, '2025.10', SAMPLE_INSTITUTIONS)
+        (version_path / 'search_index.parquet').unlink()
+        reset_engine()
+        client = APIClient()
+
+        response = client.get('/api/universities/?q=Uni&limit=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['meta']['ordering'], 'display_name')
+        self.assertEqual([u['id'] for u in response.data['data']], ['openalex_1'])
+
+        response = client.get(f"/api/universities/?q=Uni&limit=1&cursor={response.data['meta']['next_cursor']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u['id'] for u in response.data['data']], ['openalex_2'])
+        self.assertIsNone(response.data['meta']['next_cursor'])
+
+        relevance_cursor = encode_cursor('relevance', {'relevance': 1.0, 'display_name': 'Stanford University', 'id': 'openalex_1'})
+        response = client.get(f'/api/universities/?q=Uni&cursor={relevance_cursor}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', response.data['error']['details'])
+        with self.assertRaises(ValueError):
+            DatasetService().search_universities(filters={'q': 'Uni'}, ordering='relevance', after=[1.0, 'Stanford University', 'openalex_1'])
+
+    def test_search_facets_counted_with_page_and_cached(self):
+        """Test facet counts cover every match, even past the last page, and are cached."""
+        cache.clear()
+        
+        universities, facets = self.service.search_universities_with_facets(filters={'q': 'university'}, offset=5)
+        self.assertEqual(universities, [])
+        self.assertEqual(facets['country'], [{'value': 'CA', 'count': 1}, {'value': 'US', 'count': 1}])
+        self.assertEqual(facets['has_rank'], [{'value': True, 'count': 2}])
+        self.assertEqual(
+            [(f['value'], f['count']) for f in facets['works_count']],
+            [('0-999', 0), ('1000-9999', 0), ('10000-49999', 1), ('50000-99999', 1), ('100000+', 0)]
+        )
+        
+        # Later pages only read the page
+        with patch('apps.dataset.services.facet_ctes', side_effect=AssertionError('facets recounted')):
+            universities, cached = self.service.search_universities_with_facets(filters={'q': 'university'}, limit=1)
+        self.assertEqual(len(universities), 1)
+        self.assertEqual(cached, facets)
+        
+        _, facets = self.service.search_universities_with_facets(filters={'country': 'US'})
+        self.assertEqual(facets['country'], [{'value': 'US', 'count': 2}])
+        self.assertEqual(facets['has_rank'], [{'value': False, 'count': 1}, {'value': True, 'count': 1}])
+    
+    def test_search_universities_by_name(self):
+        """Test name search matches prefixes and acronyms, ordered by relevance."""
+        results = self.service.search_universities(filters={'q': 'stan'}, ordering='relevance')
+        self.assertEqual([r['id'] for r in results], ['openalex_1'])
+        
+        results = self.service.search_universities(filters={'q': 'ut'}, ordering='relevance')
+        self.assertEqual([r['id'] for r in results], ['openalex_2'])
+        
+        results = self.service.search_universities(filters={'q': 'university toronto'}, ordering='relevance')
+        self.assertEqual([r['id'] for r in results], ['openalex_2'])
+        
+        results = self.service.search_universities(filters={'q': 'univ'}, ordering='display_name')
+        self.assertEqual([r['id'] for r in results], ['openalex_1', 'openalex_2'])
+    
+    def test_get_matching_universities_by_name(self):
+        """Test the search filter uses the name index for candidates."""
+        results = self.service.get_matching_universities(
+            filters={'search': 'college', 'countries': ['US']},
+            limit=10
+        )
+        
+        self.assertEqual([r['id'] for r in results], ['openalex_3'])
+    
+    def test_suggest_universities(self):
+        """Test autocomplete completes prefixes and tolerates typos."""
+        suggestions = self.service.suggest_universities('stnaford uni')
+        self.assertEqual([s['id'] for s in suggestions], ['openalex_1'])
+        self.assertEqual(suggestions[0]['distance'], 1)
+        
+        suggestions = self.service.suggest_universities('toront')
+        self.assertEqual([s['id'] for s in suggestions], ['openalex_2'])
+        self.assertEqual(suggestions[0]['matched'], 'toronto')
+        
+        suggestions = self.service.suggest_universities('univ', limit=1)
+        self.assertEqual([s['id'] for s in suggestions], ['openalex_1'])
+    
+    def test_engine_shared_across_services(self):
+        """Test the institutions table is loaded once per process."""
+        self.service.search_universities(limit=1)
+        
+        with patch('apps.dataset.engine.duckdb.connect') as mock_connect:
+            other_service = DatasetService()
+            university = other_service.get_university('openalex_2')
+        
+        mock_connect.assert_not_called()
+        self.assertIs(other_service.engine, self.service.engine)
+        self.assertEqual(university['display_name'], 'University of Toronto')
+    
+    def test_engine_swaps_in_background_when_version_changes(self):
+        """Test a new version is built while the old one keeps serving."""
+        self.service.search_universities(limit=1)
+        old_engine = self.service.engine
+        
+        write_curated_dataset(self.temp_dir, '2025.10', SAMPLE_INSTITUTIONS[:1])
+        
+        # The request that notices the new pointer is still served by the old version
+        self.assertIs(DatasetService().engine, old_engine)
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        
+        new_service = DatasetService()
+        self.assertIsNot(new_service.engine, old_engine)
+        self.assertEqual(new_service.current_version, '2025.10')
+        self.assertEqual(new_service.validate_dataset()['stats']['total_institutions'], 1)
+        self.assertTrue(old_engine.is_retired)
+        self.assertFalse(old_engine.is_loaded)
+        
+        status = registry.status()
+        self.assertEqual(status['active_version'], '2025.10')
+        self.assertIsNone(status['pending_version'])
+        self.assertEqual(status['last_swap']['from_version'], '2025.09')
+        self.assertIsNotNone(status['swap_latency_ms'])
+    
+    def test_retired_engine_drains_in_flight_queries(self):
+        """Test the old engine is only closed once its leases are released."""
+        self.service.search_universities(limit=1)
+        old_engine = self.service.engine
+        self.assertTrue(old_engine.acquire())
+        
+        write_curated_dataset(self.temp_dir, '2025.10', SAMPLE_INSTITUTIONS[:1])
+        DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        
+        self.assertTrue(old_engine.is_retired)
+        self.assertTrue(old_engine.is_loaded)
+        
+        # A service created before the swap moves to the new engine
+        results = self.service.search_universities(limit=10)
         self.assertEqual(len(results), 1)
-        self.assertEqual(results[0]['display_name'], 'Stanford University')
-        self.assertTrue(results[0]['has_rank'])
+        self.assertEqual(self.service.current_version, '2025.10')
+        
+        old_engine.release()
+        self.assertFalse(old_engine.is_loaded)
+    
+    def test_failed_build_keeps_serving_old_version(self):
+        """Test a version that fails to load does not replace the active one."""
+        self.service.search_universities(limit=1)
+        (Path(self.temp_dir) / 'current').write_text('missing')
+        
+        DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        
+        status = registry.status()
+        self.assertEqual(status['active_version'], '2025.09')
+        self.assertIn('not found', status['last_error'])
+        self.assertEqual(len(DatasetService().search_universities(limit=10)), 3)
+    
+    def test_failed_build_is_retried(self):
+        """Test a failed version is built again after the backoff or once the pointer is rewritten."""
+        self.service.search_universities(limit=1)
+        (Path(self.temp_dir) / 'current').write_text('2025.10')
+        DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        
+        # The files appear later; the pointer is unchanged, so only the backoff retries
+        staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, staging_dir, ignore_errors=True)
+        version_path = write_curated_dataset(staging_dir, '2025.10', SAMPLE_INSTITUTIONS[:1])
+        shutil.copytree(version_path, Path(self.temp_dir) / 'curated' / '2025.10')
+        self.assertEqual(DatasetService().current_version, '2025.09')
+        self.assertIsNone(registry.status()['pending_version'])
+        
+        with override_settings(DATASET_ENGINE_RETRY_SECONDS=0):
+            DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        self.assertEqual(DatasetService().current_version, '2025.10')
+        
+        # Rewriting the pointer retries at once
+        (Path(self.temp_dir) / 'current').write_text('2025.11')
+        DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        write_curated_dataset(self.temp_dir, '2025.11', SAMPLE_INSTITUTIONS[:2])
+        DatasetService()
+        self.assertTrue(registry.wait_until_idle(timeout=10))
+        self.assertEqual(DatasetService().current_version, '2025.11')
+        self.assertIsNone(registry.status()['last_error'])
     
     def test_validate_dataset_file_not_found(self):
         """Test dataset validation when file doesn't exist."""
-        # This will fail because we don't have actual dataset files
-        result = self.service.validate_dataset()
+        (Path(self.temp_dir) / 'current').write_text('missing')
+        result = DatasetService().validate_dataset()
         
         self.assertFalse(result['valid'])
         self.assertIn('not found', result['error'])
 
 
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        names = ['Massachusetts Institute of Technology', 'Université de Montréal', 'Mitchell College']
+        self.index = SearchIndex(
+            ['mit', 'udem', 'mitchell'],
+            [create_search_tokens(name) for name in names]
+        )
+    
+    def test_acronyms_and_accents(self):
+        """Test acronyms with and without stopwords and accent folding."""
+        self.assertEqual(self.index.search('MIT')[0][0], 'mit')
+        self.assertEqual([i for i, _ in self.index.search('miot')], ['mit'])
+        self.assertEqual([i for i, _ in self.index.search('montreal')], ['udem'])
+    
+    def test_exact_match_outranks_prefix_match(self):
+        """Test a full-word hit scores above a prefix-only hit."""
+        results = self.index.search('mit')
+        
+        self.assertEqual([i for i, _ in results], ['mit', 'mitchell'])
+        self.assertGreater(results[0][1], results[1][1])
+        self.assertEqual(self.index.search('mit', limit=1), results[:1])
+
+
+class GeoIndexTest(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.latitudes = rng.uniform(-85, 85, 2000)
+        self.longitudes = rng.uniform(-180, 180, 2000)
+        self.latitudes[:2], self.longitudes[:2] = [10.0, 10.0], [179.9, -179.9]
+        self.ids = [f'I{i}' for i in range(2000)]
+        self.index = GeoIndex(self.ids, self.latitudes, self.longitudes)
+    
+    def test_radius_matches_brute_force(self):
+        """Test radius and nearest queries agree with a full haversine scan."""
+        for lat, lon, radius in [(48.85, 2.35, 1500), (10.0, 179.95, 50), (-80, 0, 3000)]:
+            distances = haversine_km(lat, lon, self.latitudes, self.longitudes)
+            expected = sorted(np.flatnonzero(distances <= radius).tolist(), key=lambda i: distances[i])
+            
+            columns, found = self.index.within_radius(lat, lon, radius)
+            self.assertEqual(columns.tolist(), expected)
+            np.testing.assert_allclose(found, distances[expected])
+            
+            nearest, _ = self.index.nearest(lat, lon, 5)
+            self.assertEqual(nearest.tolist(), np.argsort(distances, kind='stable')[:5].tolist())
+        
+        # Both sides of the antimeridian
+        self.assertEqual(sorted(self.index.within_radius(10.0, 179.95, 50)[0].tolist()), [0, 1])
+    
+    def test_bbox_crossing_antimeridian(self):
+        """Test a box with west > east wraps around the antimeridian."""
+        columns, distances = self.index.within_bbox(5, 179, 15, -179)
+        
+        inside = (self.latitudes >= 5) & (self.latitudes <= 15) & (np.abs(self.longitudes) >= 179)
+        self.assertEqual(columns.tolist(), np.flatnonzero(inside).tolist())
+        self.assertIsNone(distances)
+
+
+class MatchRankingsTest(TestCase):
+    def setUp(self):
+        self.institutions = pl.DataFrame({
+            'display_name': [
+                'Stanford University', 'Massachusetts Institute of Technology',
+                'Toronto Metropolitan University', 'Ludwig Maximilian University of Munich',
+                'Metropolitan University of Toronto', 'Springfield Community Institute',
+            ],
+            'country_code': ['US', 'US', 'CA', 'DE', 'US', 'US'],
+            'homepage_url': [
+                'https://stanford.edu', 'https://mit.edu', None, 'http://www.lmu.de', None,
+                'https://sites.google.com/view/springfield-ci',
+            ],
+        }).with_columns(normalized_name(pl.col('display_name')).alias('normalized_name'))
+        self.rankings = pl.DataFrame({
+            'name': ['Stanford University', 'MIT', 'Toronto Metropolitan Univ', 'LMU Munich', 'Harvard University'],
+            'rank': [2, 5, 300, 40, 1],
+            'country': ['US', 'US', 'CA', 'DE', 'US'],
+            'homepage_url': [None, 'http://web.mit.edu/', None, 'https://www.lmu.de/en/', 'https://sites.google.com/harvard'],
+        }).with_columns(normalized_name(pl.col('name')).alias('normalized_name'))
+    
+    def test_homepage_domain(self):
+        """Test homepage URLs reduce to their registered domain."""
+        urls = pl.Series(['http://web.mit.edu/about', 'https://www.cs.ox.ac.uk', 'HTTPS://LMU.DE:443', 'localhost', None])
+        
+        domains = pl.select(homepage_domain(pl.lit(urls))).to_series().to_list()
+        
+        self.assertEqual(domains, ['mit.edu', 'ox.ac.uk', 'lmu.de', None, None])
+    
+    def test_match_rankings_exact_domain_and_fuzzy(self):
+        """Test rankings match by name, then domain, then similarity within the country."""
+        matches, stats = match_rankings(self.institutions, self.rankings, workers=1)
+        
+        # A shared hosting domain alone does not match unrelated names (Harvard stays unmatched)
+        self.assertEqual(
+            matches.select(['row', 'rank', 'method']).rows(),
+            [(0, 2, 'exact'), (1, 5, 'domain'), (2, 300, 'fuzzy'), (3, 40, 'domain')]
+        )
+        self.assertTrue(all(0.7 <= confidence <= 1.0 for confidence in matches['confidence']))
+        self.assertEqual(stats['ranking_match_rate'], 0.8)
+        self.assertEqual(stats['ranking_matches'], {'exact': 1, 'domain': 2, 'fuzzy': 1})
+        self.assertEqual(sum(stats['ranking_match_confidence'].values()), 4)
+        self.assertEqual(stats['ranking_match_confidence']['1.0'], 1)
+    
+    def test_match_rankings_same_across_workers(self):
+        """Test sharding the blocks over a process pool does not change the matches."""
+        serial, serial_stats = match_rankings(self.institutions, self.rankings, workers=1)
+        pooled, pooled_stats = match_rankings(self.institutions, self.rankings, workers=2)
+        
+        self.assertTrue(pooled.equals(serial))
+        self.assertEqual(pooled_stats, serial_stats)
+    
+    def test_match_rankings_skips_hosting_domains(self):
+        """Test a domain shared by many institutions never matches on its own."""
+        institutions = pl.DataFrame({
+            'normalized_name': ['harvard', 'yale', 'brown', 'cornell'],
+            'country_code': ['US'] * 4,
+            'homepage_url': [f'https://sites.google.com/{name}' for name in ('harvard', 'yale', 'brown', 'cornell')],
+        })
+        rankings = pl.DataFrame({
+            'normalized_name': ['google'], 'rank': [1], 'country': ['US'], 'homepage_url': ['https://sites.google.com'],
+        })
+        
+        matches, _ = match_rankings(institutions, rankings, workers=1)
+        
+        self.assertTrue(matches.is_empty())
+
+
+class CurateCommandTest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        
+        raw_path = Path(self.temp_dir) / 'raw'
+        kaggle_path = raw_path / 'kaggle' / '2025.09'
+        kaggle_path.mkdir(parents=True)
+        (kaggle_path / 'institutions.csv').write_text(
+            "id,display_name,canonical_name,country_code,homepage_url,image_url,"
+            "works_count,cited_by_count,geo,type\n"
+            "I1,Stanford University,stanford-university,US,https://stanford.edu,,50000,100000,,education\n"
+            "I2,University of Toronto,university-of-toronto,CA,https://utoronto.ca,,40000,80000,,education\n"
+            "I3,Massachusetts Institute of Technology,mit,US,https://mit.edu,,60000,120000,,education\n"
+        )
+        webometrics_path = raw_path / 'webometrics' / '2025.09'
+        webometrics_path.mkdir(parents=True)
+        (webometrics_path / 'webometrics.jsonl').write_text(
+            '{"name": "Stanford University", "rank": 2, "country": "US"}\n'
+            '{"name": "University of Toronto", "rank": 20, "country": "CA"}\n'
+        )
+        
+        settings_override = override_settings(DATASET_BASE_PATH=self.temp_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        reset_engine()
+        self.addCleanup(reset_engine)
+    
+    def curate(self):
+        call_command('curate', version='2025.09', stdout=StringIO())
+        (Path(self.temp_dir) / 'current').write_text('2025.09')
+        return Path(self.temp_dir) / 'curated' / '2025.09'
+    
+    def test_curate_writes_duckdb_database(self):
+        """Test curate emits a sorted, typed and indexed DuckDB database."""
+        output_dir = self.curate()
+        database_file = output_dir / 'institutions.duckdb'
+        self.assertTrue(database_file.exists())
+        
+        connection = duckdb.connect(str(database_file), read_only=True)
+        self.addCleanup(connection.close)
+        
+        rows = connection.execute(
+            "SELECT id, country_code, webometrics_rank FROM institutions"
+        ).fetchall()
+        self.assertEqual(rows, [('I2', 'CA', 20), ('I1', 'US', 2), ('I3', 'US', None)])
+        
+        constraints = connection.execute(
+            "SELECT constraint_type FROM duckdb_constraints() WHERE table_name = 'institutions'"
+        ).fetchall()
+        self.assertIn(('PRIMARY KEY',), constraints)
+        
+        indexes = {row[0] for row in connection.execute(
+            "SELECT index_name FROM duckdb_indexes() WHERE table_name = 'institutions'"
+        ).fetchall()}
+        self.assertEqual(indexes, {'idx_institutions_country_code', 'idx_institutions_webometrics_rank'})
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.09')
+        self.assertEqual(run.status, 'SUCCESS')
+        self.assertEqual(run.get_stat('ranked_institutions'), 2)
+    
+    def test_service_attaches_curated_database(self):
+        """Test the dataset service reads from the curated DuckDB file."""
+        self.curate()
+        service = DatasetService()
+        
+        results = service.search_universities(filters={'country': 'us'}, ordering='rank')
+        
+        self.assertEqual(service.engine.storage, 'duckdb')
+        self.assertEqual([r['id'] for r in results], ['I1', 'I3'])
+        self.assertEqual(service.validate_dataset()['storage'], 'duckdb')
+    
+    def test_curate_writes_feature_matrix(self):
+        """Test curate writes percentile features that the engine memory-maps."""
+        self.curate()
+        features = DatasetService().engine.features()
+        
+        self.assertIsInstance(features.matrix, np.memmap)
+        self.assertEqual(features.matrix.dtype, np.float32)
+        self.assertEqual(features.matrix.shape, (len(FEATURE_NAMES), 3))
+        
+        research = dict(zip(features.ids, features.feature('research_activity').tolist()))
+        self.assertEqual(research, {'I1': 0.5, 'I2': 0.0, 'I3': 1.0})
+        rank = dict(zip(features.ids, features.feature('rank_percentile').tolist()))
+        self.assertEqual(rank, {'I1': 1.0, 'I2': 0.5, 'I3': 0.0})
+        us = dict(zip(features.ids, features.country_mask(['us']).tolist()))
+        self.assertEqual(us, {'I1': True, 'I2': False, 'I3': True})
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.09')
+        self.assertGreater(run.get_stat('feature_matrix_size'), 0)
+    
+    def test_curate_native_expressions_match_python_helpers(self):
+        """Test vectorized curation matches the row-wise name and token helpers."""
+        kaggle_file = Path(self.temp_dir) / 'raw' / 'kaggle' / '2025.09' / 'institutions.csv'
+        kaggle_file.write_text(
+            "id,display_name,canonical_name,country_code,homepage_url,image_url,"
+            "works_count,cited_by_count,geo,type\n"
+            'I1,Stanford University,stanford-university,US,,,50000,100000,'
+            '"{""latitude"": 37.4275, ""longitude"": -122.1697}",education\n'
+            "I2,Université de Montréal,universite-de-montreal,CA,,,40000,80000,,education\n"
+            "I3,Massachusetts Institute of Technology,mit,US,,,60000,120000,,education\n"
+        )
+        output_dir = self.curate()
+        
+        institutions = pl.read_parquet(output_dir / 'institutions.parquet').sort('id')
+        self.assertEqual(institutions['geo_latitude'].to_list(), [37.4275, None, None])
+        self.assertEqual(institutions['geo_longitude'].to_list(), [-122.1697, None, None])
+        
+        search_index = pl.read_parquet(output_dir / 'search_index.parquet').sort('id')
+        for name, tokens in zip(search_index['display_name'], search_index['search_tokens']):
+            self.assertEqual(tokens.to_list(), create_search_tokens(name))
+        
+        terms = suggest_terms_frame(institutions.select(['display_name', 'canonical_name']))
+        for row, (name, canonical) in enumerate(institutions.select(['display_name', 'canonical_name']).rows()):
+            expected = set(create_suggest_terms(name, canonical))
+            self.assertEqual(set(terms.filter(pl.col('_row') == row)['term']), expected)
+        
+        names = pl.DataFrame({'name': ['The University of Toronto', 'Georgia Tech', ' A&M  College ', None]})
+        self.assertEqual(
+            names.select(normalized_name(pl.col('name')))['name'].to_list(),
+            ['university of toronto', 'georgia', 'am college', '']
+        )
+    
+    def test_streaming_curate_matches_eager(self):
+        """Test --streaming writes the same dataset as the in-memory pipeline."""
+        eager = pl.read_parquet(self.curate() / 'institutions.parquet')
+        
+        raw_path = Path(self.temp_dir) / 'raw'
+        for source in ('kaggle', 'webometrics'):
+            shutil.copytree(raw_path / source / '2025.09', raw_path / source / '2025.10')
+        call_command('curate', version='2025.10', memory_limit='64MB', stdout=StringIO())
+        (Path(self.temp_dir) / 'current').write_text('2025.10')
+        streamed = pl.read_parquet(Path(self.temp_dir) / 'curated' / '2025.10' / 'institutions.parquet')
+        
+        self.assertTrue(streamed.equals(eager))
+        self.assertEqual(streamed.columns, [c for c in INSTITUTION_COLUMN_TYPES if c in streamed.columns])
+        
+        # The indexes built a batch at a time from the written file match too
+        eager_dir = Path(self.temp_dir) / 'curated' / '2025.09'
+        streamed_dir = Path(self.temp_dir) / 'curated' / '2025.10'
+        for name in ('search_index.parquet', TERMS_FILE, TRIGRAMS_FILE, 'features_ids.parquet'):
+            self.assertTrue(pl.read_parquet(streamed_dir / name).equals(pl.read_parquet(eager_dir / name)), name)
+        np.testing.assert_array_equal(np.load(streamed_dir / 'features.npy'), np.load(eager_dir / 'features.npy'))
+        self.assertEqual(DatasetService().suggest_universities('toronto')[0]['id'], 'I2')
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.10')
+        self.assertEqual(run.status, 'SUCCESS')
+        self.assertEqual(run.get_stat('total_institutions'), 3)
+        self.assertEqual(run.get_stat('ranked_institutions'), 2)
+        self.assertEqual(run.get_stat('streaming_chunk_size'), 64 * 1000 ** 2 // STREAMING_ROW_BYTES)
+        
+        with self.assertRaises(CommandError):
+            call_command('curate', version='2025.11', memory_limit='lots', stdout=StringIO())
+    
+    def test_curate_matches_rankings_by_domain_and_similarity(self):
+        """Test rankings without an exact name match still attach to institutions."""
+        webometrics_file = Path(self.temp_dir) / 'raw' / 'webometrics' / '2025.09' / 'webometrics.jsonl'
+        webometrics_file.write_text(
+            '{"name": "Stanford University", "rank": 2, "country": "US"}\n'
+            '{"name": "U of T", "rank": 20, "country": "CA", "homepage_url": "https://www.utoronto.ca/en"}\n'
+            '{"name": "Massachusetts Inst. of Technology", "rank": 5, "country": "US"}\n'
+        )
+        output_dir = self.curate()
+        
+        institutions = pl.read_parquet(output_dir / 'institutions.parquet').sort('id')
+        self.assertEqual(institutions['webometrics_rank'].to_list(), [2, 20, 5])
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.09')
+        self.assertEqual(run.get_stat('ranked_institutions'), 3)
+        self.assertEqual(run.get_stat('ranking_match_rate'), 1.0)
+        self.assertEqual(run.get_stat('ranking_matches'), {'exact': 1, 'domain': 1, 'fuzzy': 1})
+        self.assertEqual(sum(run.get_stat('ranking_match_confidence').values()), 3)
+    
+    def test_parallel_curate_matches_serial(self):
+        """Test --workers writes the same files as one process and times each shard."""
+        serial_dir = self.curate()
+        
+        raw_path = Path(self.temp_dir) / 'raw'
+        for source in ('kaggle', 'webometrics'):
+            shutil.copytree(raw_path / source / '2025.09', raw_path / source / '2025.10')
+        call_command('curate', version='2025.10', workers=2, stdout=StringIO())
+        parallel_dir = Path(self.temp_dir) / 'curated' / '2025.10'
+        
+        for name in ('institutions.parquet', 'search_index.parquet'):
+            self.assertTrue(pl.read_parquet(parallel_dir / name).equals(pl.read_parquet(serial_dir / name)))
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.10')
+        self.assertEqual(run.get_stat('workers'), 2)
+        self.assertEqual([timing['rows'] for timing in run.get_stat('shard_timings')], [2, 1])
+        
+        with self.assertRaises(CommandError):
+            call_command('curate', version='2025.11', workers=2, streaming=True, stdout=StringIO())
+    
+    def test_incremental_curate_matches_full_curate(self):
+        """Test --incremental only re-curates changed records and lists them in changes.json."""
+        self.curate()
+        
+        raw_path = Path(self.temp_dir) / 'raw'
+        for version in ('2025.10', '2025.11'):
+            kaggle_path = raw_path / 'kaggle' / version
+            kaggle_path.mkdir(parents=True)
+            (kaggle_path / 'institutions.csv').write_text(
+                "id,display_name,canonical_name,country_code,homepage_url,image_url,"
+                "works_count,cited_by_count,geo,type\n"
+                "I4,McGill University,mcgill-university,CA,https://mcgill.ca,,30000,60000,,education\n"
+                "I1,Stanford University,stanford-university,US,https://stanford.edu,,50000,100000,,education\n"
+                "I2,University of Toronto,university-of-toronto,CA,https://utoronto.ca,,45000,90000,,education\n"
+            )
+            shutil.copytree(raw_path / 'webometrics' / '2025.09', raw_path / 'webometrics' / version)
+        
+        call_command('curate', version='2025.10', incremental=True, base_version='2025.09', stdout=StringIO())
+        call_command('curate', version='2025.11', stdout=StringIO())
+        incremental_dir = Path(self.temp_dir) / 'curated' / '2025.10'
+        full_dir = Path(self.temp_dir) / 'curated' / '2025.11'
+        
+        for name in ('institutions.parquet', 'search_index.parquet', 'record_hashes.parquet'):
+            self.assertTrue(pl.read_parquet(incremental_dir / name).equals(pl.read_parquet(full_dir / name)))
+        
+        with open(incremental_dir / 'changes.json') as f:
+            changes = json.load(f)
+        self.assertEqual(changes['added'], ['I4'])
+        self.assertEqual(changes['removed'], ['I3'])
+        self.assertEqual(changes['modified'], ['I2'])
+        self.assertEqual(changes['unchanged'], 1)
+        self.assertFalse(changes['rankings_changed'])
+        
+        run = IngestionRun.objects.get(source='curation', version='2025.10')
+        self.assertEqual(run.status, 'SUCCESS')
+        self.assertEqual(run.get_stat('shard_timings')[0]['rows'], 2)
+        self.assertEqual(run.get_stat('ranked_institutions'), 2)
+        # Stanford kept its ranking from 2025.09; only Toronto was matched again
+        self.assertEqual(run.get_stat('ranking_match_rate'), 1.0)
+        self.assertEqual(run.get_stat('incremental_ranking_matches'), {'exact': 1, 'domain': 0, 'fuzzy': 0})
+        self.assertIsNone(run.get_stat('ranking_matches'))
+        
+        with self.assertRaises(CommandError):
+            call_command('curate', version='2025.12', incremental=True, base_version='2024.01', stdout=StringIO())
+    
+    def test_batched_suggest_index_matches_in_memory(self):
+        """Test the suggest index built one row at a time through DuckDB equals the in-memory one."""
+        institutions_file = self.curate() / 'institutions.parquet'
+        in_memory_dir = Path(self.temp_dir) / 'in-memory'
+        batched_dir = Path(self.temp_dir) / 'batched'
+        in_memory_dir.mkdir()
+        batched_dir.mkdir()
+        
+        expected = write_suggest_index(pl.read_parquet(institutions_file), in_memory_dir)
+        counts = write_suggest_index_batched(institutions_file, batched_dir, batch_size=1, memory_limit=64 * 1000 ** 2)
+        
+        self.assertEqual(counts, expected)
+        for name in (TERMS_FILE, TRIGRAMS_FILE):
+            self.assertTrue(pl.read_parquet(batched_dir / name).equals(pl.read_parquet(in_memory_dir / name)), name)
+        self.assertEqual(sorted(path.name for path in batched_dir.iterdir()), sorted([TERMS_FILE, TRIGRAMS_FILE]))
+    
+    def test_curate_builds_suggest_index(self):
+        """Test curate writes the autocomplete index with the dataset."""
+        self.curate()
+        
+        suggestions = DatasetService().suggest_universities('masachusetts')
+        
+        self.assertEqual([s['id'] for s in suggestions], ['I3'])
+        run = IngestionRun.objects.get(source='curation', version='2025.09')
+        self.assertGreater(run.get_stat('suggest_terms'), 3)
+
+
 class DatasetAPITest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -91,6 +836,17 @@ class DatasetAPITest(TestCase):
         )
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
+        response_cache.clear_local()
+        response_cache.reset_stats()
+    
+    def test_search_universities_geo_validation(self):
+        """Test geographic parameters are validated before searching."""
+        response = self.client.get('/api/universities/?radius_km=50')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.get('/api/universities/?bbox=50,0,40,10')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('bbox', response.data['error']['details'])
     
     def test_list_ingestion_runs(self):
         """Test listing ingestion runs."""
@@ -110,6 +866,7 @@ class DatasetAPITest(TestCase):
     def test_search_universities(self, mock_service):
         """Test university search endpoint."""
         # Mock service response
+        mock_service.return_value.search_ordering.side_effect = lambda filters, ordering: ordering
         mock_service.return_value.search_universities.return_value = [
             {
                 'id': 'openalex_1',
@@ -133,6 +890,147 @@ class DatasetAPITest(TestCase):
         self.assertIsNone(response.data['error'])
         self.assertIn('meta', response.data)
     
+    @patch('apps.dataset.views.DatasetService')
+    def test_get_university_conditional_request(self, mock_service):
+        """Test unchanged universities are revalidated with a 304 before querying."""
+        mock_service.return_value.get_university.return_value = {
+            'id': 'openalex_1',
+            'display_name': 'Stanford University',
+            'canonical_name': 'stanford-university',
+            'country_code': 'US',
+            'homepage_url': 'https://stanford.edu',
+            'webometrics_rank': 5,
+            'works_count': 50000,
+            'cited_by_count': 100000,
+            'geo_latitude': 37.4275,
+            'geo_longitude': -122.1697,
+            'has_rank': True
+        }
+        
+        response = self.client.get('/api/universities/openalex_1/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=300', response['Cache-Control'])
+        
+        response = self.client.get('/api/universities/openalex_1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        mock_service.return_value.get_university.assert_called_once_with('openalex_1')
+        
+        # Another university, or another dataset version, has another ETag
+        response = self.client.get('/api/universities/openalex_2/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with patch('apps.dataset.conditional.get_engine') as mock_engine:
+            mock_engine.return_value.version = '2099.01'
+            mock_engine.return_value.modified_at = None
+            response = self.client.get('/api/universities/openalex_1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # Errors are never cached
+        mock_service.return_value.get_university.return_value = None
+        response = self.client.get('/api/universities/missing/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-store', response['Cache-Control'])
+    
+    @patch('apps.dataset.views.DatasetService')
+    def test_search_response_cache(self, mock_service):
+        """Test repeated searches are served from the rendered response cache."""
+        mock_service.return_value.search_ordering.side_effect = lambda filters, ordering: ordering
+        mock_service.return_value.search_universities.return_value = [
+            {
+                'id': 'openalex_1',
+                'display_name': 'Stanford University',
+                'canonical_name': 'stanford-university',
+                'country_code': 'US',
+                'homepage_url': 'https://stanford.edu',
+                'webometrics_rank': 5,
+                'works_count': 50000,
+                'cited_by_count': 100000,
+                'geo_latitude': 37.4275,
+                'geo_longitude': -122.1697,
+                'has_rank': True
+            }
+        ]
+        
+        first = self.client.get('/api/universities/?country=US&ordering=rank')
+        second = self.client.get('/api/universities/?ordering=rank&country=US')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertIn(b'"webometricsRank":5', second.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(mock_service.return_value.search_universities.call_count, 1)
+        self.assertEqual(response_cache.stats()['local_hits'], 1)
+        
+        # Failed searches are not stored
+        self.client.get('/api/universities/?radius_km=50')
+        self.client.get('/api/universities/?radius_km=50')
+        self.assertEqual(response_cache.stats()['local_hits'], 1)
+        
+        # The local tier is bounded by bytes; the shared tier is optional
+        with override_settings(DATASET_RESPONSE_CACHE_BYTES=len(first.content)):
+            self.client.get('/api/universities/?country=GB&ordering=rank')
+            self.assertEqual(response_cache.stats()['local_size'], 1)
+            self.assertLessEqual(response_cache.stats()['local_bytes'], len(first.content))
+        with override_settings(DATASET_RESPONSE_CACHE_SHARED=True):
+            self.client.get('/api/universities/?country=FR')
+            response_cache.clear_local()
+            self.client.get('/api/universities/?country=FR')
+            self.assertEqual(response_cache.stats()['shared_hits'], 1)
+        self.assertEqual(mock_service.return_value.search_universities.call_count, 3)
+    
+    def test_search_etag_ignores_parameter_order(self):
+        """Test equivalent search query strings share an ETag."""
+        response = self.client.get('/api/universities/?radius_km=50')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.has_header('ETag'))
+        
+        request_factory = RequestFactory()
+        self.assertEqual(
+            dataset_etag(request_factory.get('/api/universities/?q=mit&country=US')),
+            dataset_etag(request_factory.get('/api/universities/?country=US&has_rank=&q=mit'))
+        )
+        self.assertNotEqual(
+            dataset_etag(request_factory.get('/api/universities/?q=mit')),
+            dataset_etag(request_factory.get('/api/universities/?q=mit&offset=20'))
+        )
+    
+    @patch('apps.dataset.views.DatasetService')
+    def test_suggest_universities(self, mock_service):
+        """Test university autocomplete endpoint."""
+        mock_service.return_value.suggest_universities.return_value = [
+            {
+                'id': 'openalex_1',
+                'display_name': 'Stanford University',
+                'country_code': 'US',
+                'webometrics_rank': 5,
+                'matched': 'stanford university',
+                'distance': 1
+            }
+        ]
+        
+        response = self.client.get('/api/universities/suggest/?q=stnaford&limit=5')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'][0]['id'], 'openalex_1')
+        self.assertEqual(response.data['meta']['limit'], 5)
+        mock_service.return_value.suggest_universities.assert_called_once_with('stnaford', limit=5)
+        
+        response = self.client.get('/api/universities/suggest/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @patch('apps.dataset.health.DatasetService')
+    def test_liveness_skips_dependencies(self, mock_service):
+        """Test the liveness probe does not touch the dataset or database."""
+        response = self.client.get('/api/livez/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'alive')
+        mock_service.assert_not_called()
+    
     def test_health_check(self):
         """Test health check endpoint."""
         # This will likely fail due to missing dataset files, but tests the endpoint
@@ -141,3 +1039,6 @@ class DatasetAPITest(TestCase):
         # Should return a response (either 200 or 503)
         self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_503_SERVICE_UNAVAILABLE])
         self.assertIn('status', response.data)
+        self.assertIn('active_version', response.data['data'])
+        self.assertIn('pending_version', response.data['data'])
+        self.assertIn('swap_latency_ms', response.data['data'])
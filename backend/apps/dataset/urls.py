@@ -1,11 +1,14 @@
 from django.urls import path
-from .views import IngestionRunListView, search_universities, get_university, healthz
+from .views import IngestionRunListView, search_universities, suggest_universities, get_university, healthz, livez, readyz
 
 app_name = 'dataset'
 
 urlpatterns = [
     path('universities/', search_universities, name='university-search'),
+    path('universities/suggest/', suggest_universities, name='university-suggest'),
     path('universities/<str:university_id>/', get_university, name='university-detail'),
     path('ingestion/runs/', IngestionRunListView.as_view(), name='ingestion-runs'),
     path('healthz/', healthz, name='health-check'),
+    path('livez/', livez, name='liveness'),
+    path('readyz/', readyz, name='readiness'),
 ]
@@ -3,11 +3,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from . import health
 from .models import IngestionRun
+from .conditional import cache_by_dataset_version
+from .cursors import encode_cursor
+from .engine import registry
+from .response_cache import cache_response, response_cache
 from .services import DatasetService
 from .serializers import (
     IngestionRunSerializer, UniversitySearchSerializer, 
-    UniversitySerializer, DatasetValidationSerializer
+    UniversitySerializer, DatasetValidationSerializer,
+    UniversitySuggestSerializer, UniversitySuggestionSerializer
 )
 
 
@@ -53,6 +59,8 @@ class IngestionRunListView(generics.ListAPIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@cache_by_dataset_version
+@cache_response
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_universities(request):
@@ -80,19 +88,53 @@ def search_universities(request):
             filters['country'] = validated_data['country']
         if validated_data.get('has_rank'):
             filters['has_rank'] = validated_data['has_rank']
+        for name in ('lat', 'lon', 'radius_km', 'bbox'):
+            if validated_data.get(name) is not None:
+                filters[name] = validated_data[name]
         
         limit = validated_data.get('limit', 20)
         offset = validated_data.get('offset', 0)
-        ordering = validated_data.get('ordering', 'display_name')
+        ordering = validated_data.get('ordering')
+        if not ordering:
+            if filters.get('q'):
+                ordering = 'relevance'
+            elif 'lat' in filters:
+                ordering = 'distance'
+            else:
+                ordering = 'display_name'
         
-        # Search using dataset service
+        # The ordering actually used (e.g. no relevance without a search index) names the cursor
         dataset_service = DatasetService()
-        universities = dataset_service.search_universities(
+        requested_ordering = ordering
+        ordering = dataset_service.search_ordering(filters, ordering)
+        if validated_data.get('after') is not None and ordering != requested_ordering:
+            return Response({
+                'data': None,
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'Invalid search parameters',
+                    'details': {'cursor': [f"Ordering {requested_ordering!r} is not available for this dataset"]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Search using dataset service (one extra row tells whether a next page exists)
+        search = dict(
             filters=filters,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
-            ordering=ordering
+            ordering=ordering,
+            after=validated_data.get('after')
         )
+        facets = None
+        if validated_data.get('facets'):
+            universities, facets = dataset_service.search_universities_with_facets(**search)
+        else:
+            universities = dataset_service.search_universities(**search)
+        
+        next_cursor = None
+        if len(universities) > limit:
+            universities = universities[:limit]
+            next_cursor = encode_cursor(ordering, universities[-1])
         
         # Serialize results
         university_serializer = UniversitySerializer(universities, many=True)
@@ -105,7 +147,9 @@ def search_universities(request):
                 'limit': limit,
                 'offset': offset,
                 'filters': filters,
-                'ordering': ordering
+                'ordering': ordering,
+                'next_cursor': next_cursor,
+                'facets': facets
             }
         })
         
@@ -120,6 +164,53 @@ def search_universities(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@cache_by_dataset_version
+@cache_response
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def suggest_universities(request):
+    """Autocomplete university names as the user types."""
+    try:
+        serializer = UniversitySuggestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({
+                'data': None,
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'Invalid suggest parameters',
+                    'details': serializer.errors
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        q = serializer.validated_data['q']
+        limit = serializer.validated_data['limit']
+        
+        dataset_service = DatasetService()
+        suggestions = dataset_service.suggest_universities(q, limit=limit)
+        
+        return Response({
+            'data': UniversitySuggestionSerializer(suggestions, many=True).data,
+            'error': None,
+            'meta': {
+                'count': len(suggestions),
+                'limit': limit,
+                'q': q
+            }
+        })
+        
+    except Exception as e:
+        return Response({
+            'data': None,
+            'error': {
+                'code': 'SUGGEST_ERROR',
+                'message': 'Error suggesting universities',
+                'details': str(e)
+            }
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@cache_by_dataset_version
+@cache_response
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_university(request, university_id):
@@ -159,27 +250,38 @@ def get_university(request, university_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def healthz(request):
-    """Health check endpoint."""
+def livez(request):
+    """Liveness probe: answers without touching the dataset or database."""
+    return Response({
+        'data': {'alive': True},
+        'error': None,
+        'status': 'alive'
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def readyz(request):
+    """Readiness probe: dataset and database checks, run concurrently and time-boxed."""
     try:
-        # Check dataset service
-        dataset_service = DatasetService()
-        validation_result = dataset_service.validate_dataset()
-        
-        # Check database connection
-        from django.db import connection
-        db_ok = True
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-        except Exception:
-            db_ok = False
+        checks = health.readiness()
+        dataset = checks['duckdb']['result'] or {}
         
+        engine_status = registry.status()
         health_data = {
-            'dataset_version': validation_result.get('version'),
-            'duckdb_ok': validation_result.get('valid', False),
-            'database_ok': db_ok,
-            'dataset_stats': validation_result.get('stats', {})
+            'dataset_version': dataset.get('version'),
+            'duckdb_ok': checks['duckdb']['ok'],
+            'database_ok': checks['database']['ok'],
+            'dataset_stats': dataset.get('stats', {}),
+            'checks': {
+                name: {'ok': check['ok'], 'latency_ms': check['latency_ms'], 'error': check['error']}
+                for name, check in checks.items()
+            },
+            'active_version': engine_status['active_version'],
+            'pending_version': engine_status['pending_version'],
+            'swap_latency_ms': engine_status['swap_latency_ms'],
+            'last_swap': engine_status['last_swap'],
+            'response_cache': response_cache.stats()
         }
         
         # Determine overall health
@@ -201,3 +303,7 @@ def healthz(request):
             },
             'status': 'unhealthy'
         }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+# Kept for existing load balancer and container configuration
+healthz = readyz
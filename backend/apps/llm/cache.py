@@ -0,0 +1,36 @@
+"""
+Content-addressed caching for LLM responses.
+
+Cache keys are a sha256 digest of the canonical JSON of only the inputs that
+affect the response, plus the prompt template version, so every worker
+process computes the same key for the same question and two students with
+identical academic profiles share entries.
+
+Responses are kept in a ``TwoTierCache`` (see ``apps.core.cache``): a
+per-process LRU of ``LLM_CACHE_LOCAL_SIZE`` entries in front of the shared
+Django cache.
+"""
+
+import hashlib
+from typing import Any, Dict
+
+from django.conf import settings
+
+from apps.core.cache import TwoTierCache, canonical_json
+
+
+def make_cache_key(kind: str, version: int, payload: Dict[str, Any]) -> str:
+    """Return a stable cache key for an LLM request of ``kind``."""
+    digest = hashlib.sha256(canonical_json(payload).encode('utf-8')).hexdigest()
+    return f"llm:{kind}:v{version}:{digest}"
+
+
+class LLMCache(TwoTierCache):
+    """LLM responses, with the local tier sized by ``LLM_CACHE_LOCAL_SIZE``."""
+
+    @property
+    def maxsize(self) -> int:
+        return getattr(settings, 'LLM_CACHE_LOCAL_SIZE', 1024)
+
+
+rationale_cache = LLMCache('rationale')
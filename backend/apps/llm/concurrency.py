@@ -0,0 +1,134 @@
+"""
+Bounded-concurrency execution for LLM calls.
+
+Calls run on a thread pool with at most ``max_in_flight`` requests
+outstanding. Each call gets ``call_timeout`` seconds from the moment it
+starts, and anything still unfinished at ``deadline`` (a ``time.monotonic()``
+value) is abandoned. Abandoned and failed items get their fallback value, so
+callers always receive exactly one result per item: in input order from
+``run_bounded``, or as each finishes from ``iter_bounded``.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def run_bounded(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    fallback: Callable[[Any], Any],
+    max_in_flight: int,
+    call_timeout: float,
+    deadline: Optional[float] = None
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Apply ``func`` to every item concurrently.
+
+    Args:
+        func: Called once per item on a worker thread
+        items: Inputs, results are returned in the same order
+        fallback: Called on the caller's thread for items that failed,
+            timed out or never started before the deadline
+        max_in_flight: Maximum number of concurrent calls
+        call_timeout: Seconds a single call may run
+        deadline: ``time.monotonic()`` value after which nothing is awaited
+
+    Returns:
+        Tuple of (results, stats) where stats counts completed, failed,
+        timed out and skipped calls
+    """
+    results = [None] * len(items)
+    stats = {}
+    for index, result in iter_bounded(func, items, fallback, max_in_flight, call_timeout, deadline, stats):
+        results[index] = result
+    return results, stats
+
+
+def iter_bounded(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    fallback: Callable[[Any], Any],
+    max_in_flight: int,
+    call_timeout: float,
+    deadline: Optional[float] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Like ``run_bounded``, but yield ``(index, result)`` as each item finishes.
+
+    ``stats`` is filled in once the iterator is exhausted. Closing the
+    iterator early abandons the calls still running.
+    """
+    started_at = time.monotonic()
+    stats = stats if stats is not None else {}
+    stats.update({'calls': len(items), 'completed': 0, 'failed': 0, 'timed_out': 0, 'skipped': 0})
+    if not items:
+        stats['elapsed_ms'] = 0.0
+        return
+
+    call_started = {}
+
+    def call(index):
+        call_started[index] = time.monotonic()
+        return func(items[index])
+
+    def give_up(future, reason):
+        index = futures[future]
+        future.cancel()
+        stats[reason] += 1
+        return index, fallback(items[index])
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix='llm-call')
+    futures = {executor.submit(call, index): index for index in range(len(items))}
+    pending = set(futures)
+
+    try:
+        while pending:
+            now = time.monotonic()
+
+            # Calls that have run past their timeout keep their worker busy
+            # until the HTTP timeout fires, but their result is ignored
+            for future in list(pending):
+                index = futures[future]
+                if index in call_started and now - call_started[index] >= call_timeout:
+                    pending.discard(future)
+                    yield give_up(future, 'timed_out')
+
+            if not pending or (deadline is not None and now >= deadline):
+                break
+
+            # Wake up for the next completion, call expiry or the deadline
+            wake_at = [
+                call_started[futures[future]] + call_timeout
+                for future in pending if futures[future] in call_started
+            ]
+            if deadline is not None:
+                wake_at.append(deadline)
+            timeout = min([call_timeout] + [max(0.0, at - now) for at in wake_at])
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                try:
+                    result = future.result()
+                    stats['completed'] += 1
+                except Exception as e:
+                    logger.warning(f"LLM call failed, using fallback: {e}")
+                    result = fallback(items[index])
+                    stats['failed'] += 1
+                yield index, result
+
+        # Past the deadline: started calls count as timed out, the rest never ran
+        for future in sorted(pending, key=futures.get):
+            yield give_up(future, 'timed_out' if futures[future] in call_started else 'skipped')
+        pending = set()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    stats['elapsed_ms'] = round((time.monotonic() - started_at) * 1000, 2)
@@ -1,22 +1,204 @@
 """
-LLM Service for UniQuest - Placeholder for External LLM API Integration
+LLM Service for UniQuest - External LLM API Integration
 
-This service contains placeholders where external LLM API calls should be made.
-All the complex LLM integration logic is replaced with simple API call TODOs.
+Scoring and rationale calls are sent to ``EXTERNAL_LLM_API_URL`` when it is
+configured, otherwise simple rule-based fallbacks are used. Batches of calls
+made while generating recommendations run with bounded concurrency (see
+``apps.llm.concurrency``).
 """
 
+import json
 import logging
-from typing import Dict, Any
-from django.core.cache import cache
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.core.cache import select_fields
+from .cache import make_cache_key, rationale_cache
+from .concurrency import iter_bounded, run_bounded
 
 logger = logging.getLogger(__name__)
 
+SCORING_CRITERIA = """## EVALUATION CRITERIA
+Rate this university match on a scale of 0.0 to 1.0 based on:
+
+1. **Academic Fit (30% weight)**: How well does the student's academic profile align with the university's standards and programs?
+2. **Interest Alignment (20% weight)**: How well do the university's programs match the student's academic interests?
+3. **Career Preparation (20% weight)**: How well does the university prepare students for their career goals?
+4. **Location Suitability (10% weight)**: How well does the location match the student's preferences?
+5. **Financial Feasibility (10% weight)**: How realistic is the financial fit?
+6. **Prestige & Ranking (5% weight)**: How does the university's reputation align with student expectations?
+7. **Research Opportunities (5% weight)**: How well does the university support research in the student's field?
+
+## ADMISSION LIKELIHOOD ASSESSMENT
+Consider the following factors for admission probability:
+- Student's academic competitiveness relative to university standards
+- Typical admission requirements for the university
+- Student's test scores vs. university averages
+- Geographic diversity considerations
+- Program-specific admission rates
+
+"""
+
+# Bump when the rationale prompt changes so cached rationales are not reused
+RATIONALE_PROMPT_VERSION = 1
+
+# Inputs that affect LLM output; everything else (user id, email, filters) is
+# left out of API payloads and cache keys
+UNIVERSITY_PROMPT_FIELDS = (
+    'id', 'display_name', 'country_code', 'webometrics_rank',
+    'works_count', 'cited_by_count', 'homepage_url',
+)
+PROFILE_PROMPT_FIELDS = (
+    'gpa', 'gpa_scale', 'current_level', 'graduation_year', 'test_scores_json',
+    'disciplines', 'career_goals', 'locations', 'budget_min', 'budget_max',
+)
+
+# Rough prompt size in tokens, about four characters per token for English text
+CHARS_PER_TOKEN = 4
+
+# requests sessions are not shared between worker threads
+_local = threading.local()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in ``text``."""
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
 
 class LLMService:
     """Service for integrating with external LLM APIs."""
     
     def __init__(self):
-        pass
+        self.api_url = getattr(settings, 'EXTERNAL_LLM_API_URL', None)
+        self.api_key = getattr(settings, 'EXTERNAL_LLM_API_KEY', None)
+        self.max_in_flight = getattr(settings, 'LLM_MAX_IN_FLIGHT', 8)
+        self.call_timeout = getattr(settings, 'LLM_CALL_TIMEOUT', 10.0)
+        self.batch_scoring = getattr(settings, 'LLM_BATCH_SCORING', True)
+        self.batch_token_budget = getattr(settings, 'LLM_BATCH_TOKEN_BUDGET', 4000)
+    
+    def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSON payload to the external LLM API and return the JSON response."""
+        session = getattr(_local, 'session', None)
+        if session is None:
+            session = _local.session = requests.Session()
+        
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        
+        response = session.post(
+            f"{self.api_url.rstrip('/')}/{endpoint}",
+            data=json.dumps(payload, cls=DjangoJSONEncoder),
+            headers=headers,
+            timeout=self.call_timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def score_universities(
+        self,
+        universities: List[Dict[str, Any]],
+        user_profile: Dict[str, Any],
+        deadline: Optional[float] = None
+    ) -> List[float]:
+        """
+        Score many universities, calling the LLM API concurrently.
+        
+        Args:
+            universities: University information from dataset
+            user_profile: Student profile and preferences
+            deadline: ``time.monotonic()`` value after which fallback scores are used
+            
+        Returns:
+            Match scores in the same order as ``universities``
+        """
+        if not self.api_url:
+            return [self._fallback_score(university, user_profile) for university in universities]
+        
+        if self.batch_scoring:
+            batches = self.plan_scoring_batches(universities, user_profile)
+            batch_scores, stats = run_bounded(
+                lambda batch: self.score_university_batch(batch, user_profile),
+                batches,
+                fallback=lambda batch: [self._fallback_score(university, user_profile) for university in batch],
+                max_in_flight=self.max_in_flight,
+                call_timeout=self.call_timeout,
+                deadline=deadline
+            )
+            logger.info(f"Scored {len(universities)} universities in {len(batches)} LLM batches: {stats}")
+            return [score for scores in batch_scores for score in scores]
+        
+        scores, stats = run_bounded(
+            lambda university: self.score_university_match(university, user_profile),
+            universities,
+            fallback=lambda university: self._fallback_score(university, user_profile),
+            max_in_flight=self.max_in_flight,
+            call_timeout=self.call_timeout,
+            deadline=deadline
+        )
+        logger.info(f"Scored {len(universities)} universities with LLM: {stats}")
+        return scores
+    
+    def generate_rationales(
+        self,
+        universities: List[Dict[str, Any]],
+        user_profile: Dict[str, Any],
+        weights: Dict[str, float],
+        deadline: Optional[float] = None
+    ) -> List[str]:
+        """
+        Generate rationales for many universities, calling the LLM API concurrently.
+        
+        Args:
+            universities: University information from dataset
+            user_profile: Student profile and preferences
+            weights: Weights used in recommendation scoring
+            deadline: ``time.monotonic()`` value after which fallback rationales are used
+            
+        Returns:
+            Rationales in the same order as ``universities``
+        """
+        rationales = [None] * len(universities)
+        for index, rationale in self.iter_rationales(universities, user_profile, weights, deadline):
+            rationales[index] = rationale
+        return rationales
+    
+    def iter_rationales(
+        self,
+        universities: List[Dict[str, Any]],
+        user_profile: Dict[str, Any],
+        weights: Dict[str, float],
+        deadline: Optional[float] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Generate rationales concurrently, yielding ``(index, rationale)`` as each finishes.
+        
+        Args:
+            universities: University information from dataset
+            user_profile: Student profile and preferences
+            weights: Weights used in recommendation scoring
+            deadline: ``time.monotonic()`` value after which fallback rationales are used
+        """
+        if not self.api_url:
+            for index, university in enumerate(universities):
+                yield index, self.generate_rationale(university, user_profile, weights)
+            return
+        
+        stats = {}
+        yield from iter_bounded(
+            lambda university: self.generate_rationale(university, user_profile, weights),
+            universities,
+            fallback=lambda university: self._fallback_rationale(university, weights),
+            max_in_flight=self.max_in_flight,
+            call_timeout=self.call_timeout,
+            deadline=deadline,
+            stats=stats
+        )
+        logger.info(
+            f"Generated {len(universities)} rationales with LLM: {stats}, cache: {rationale_cache.stats()}"
+        )
     
     def generate_rationale(
         self, 
@@ -36,29 +218,29 @@ class LLMService:
             Personalized rationale text
         """
         try:
-            # Create cache key for this specific combination
-            cache_key = f"rationale_{hash(str(university_data.get('id', '')))}_{hash(str(user_profile))}"
+            # The rule-based rationale is cheaper to rebuild than to look up
+            if not self.api_url:
+                return self._fallback_rationale(university_data, weights)
             
-            # Check cache first
-            cached_rationale = cache.get(cache_key)
+            # Only the fields the prompt uses are sent, and they alone make
+            # up the cache key, so identical academic profiles share entries
+            payload = {
+                'university_data': select_fields(university_data, UNIVERSITY_PROMPT_FIELDS),
+                'user_profile': select_fields(user_profile, PROFILE_PROMPT_FIELDS),
+                'weights': weights,
+                'prompt_type': 'university_rationale'
+            }
+            cache_key = make_cache_key('rationale', RATIONALE_PROMPT_VERSION, payload)
+            
+            # Check cache first (per-process LRU, then the shared cache)
+            cached_rationale = rationale_cache.get(cache_key)
             if cached_rationale:
                 return cached_rationale
             
-            # TODO (Vishal): Make API call to external LLM service
-            # Example API call structure:
-            # response = requests.post('https://your-llm-api.com/generate-rationale', json={
-            #     'university_data': university_data,
-            #     'user_profile': user_profile,
-            #     'weights': weights,
-            #     'prompt_type': 'university_rationale'
-            # })
-            # rationale = response.json()['rationale']
-            
-            # Fallback to simple rationale for now
-            rationale = self._fallback_rationale(university_data, weights)
+            rationale = self._post('generate-rationale', payload)['rationale']
             
             # Cache the result for 1 hour
-            cache.set(cache_key, rationale, 3600)
+            rationale_cache.set(cache_key, rationale)
             
             return rationale
             
@@ -189,17 +371,14 @@ Focus on the most important factors based on the student's weights. If academics
             Match score between 0.0 and 1.0
         """
         try:
-            # TODO (Vishal): Make API call to external LLM service for scoring
-            # Example API call structure:
-            # response = requests.post('https://your-llm-api.com/score-match', json={
-            #     'university_data': university_data,
-            #     'user_profile': user_profile,
-            #     'prompt_type': 'university_scoring'
-            # })
-            # score = float(response.json()['score'])
-            # return max(0.0, min(1.0, score))
+            if self.api_url:
+                score = float(self._post('score-match', {
+                    'university_data': select_fields(university_data, UNIVERSITY_PROMPT_FIELDS),
+                    'user_profile': select_fields(user_profile, PROFILE_PROMPT_FIELDS),
+                    'prompt_type': 'university_scoring'
+                })['score'])
+                return max(0.0, min(1.0, score))
             
-            # Fallback to simple scoring for now
             return self._fallback_score(university_data, user_profile)
             
         except Exception as e:
@@ -207,17 +386,8 @@ Focus on the most important factors based on the student's weights. If academics
             # Fallback to simple scoring
             return self._fallback_score(university_data, user_profile)
     
-    def create_scoring_prompt(self, university_data: Dict[str, Any], user_profile: Dict[str, Any]) -> str:
-        """
-        Create comprehensive prompt for university scoring.
-        
-        Args:
-            university_data: University information from dataset
-            user_profile: Student profile and preferences
-            
-        Returns:
-            Formatted prompt string for LLM
-        """
+    def _format_scoring_profile(self, user_profile: Dict[str, Any]) -> str:
+        """Format the student profile section shared by the scoring prompts."""
         # Extract student academic profile
         gpa = user_profile.get('gpa', 'Not specified')
         gpa_scale = user_profile.get('gpa_scale', '4.0')
@@ -225,21 +395,12 @@ Focus on the most important factors based on the student's weights. If academics
         graduation_year = user_profile.get('graduation_year', 'Not specified')
         test_scores = user_profile.get('test_scores_json', {})
         
-        # Extract university data
-        uni_name = university_data.get('display_name', 'Unknown University')
-        uni_country = university_data.get('country_code', 'Unknown')
-        uni_rank = university_data.get('webometrics_rank', 'Unranked')
-        works_count = university_data.get('works_count', 0)
-        cited_by_count = university_data.get('cited_by_count', 0)
-        homepage_url = university_data.get('homepage_url', 'Not available')
-        
-        # Extract user preferences and weights
-        filters = user_profile.get('filters', {})
+        # Extract user preferences
         disciplines = user_profile.get('disciplines', [])
         career_goals = user_profile.get('career_goals', [])
         locations = user_profile.get('locations', [])
-        budget_min = user_profile.get('budget_min', 0)
-        budget_max = user_profile.get('budget_max', 0)
+        budget_min = user_profile.get('budget_min') or 0
+        budget_max = user_profile.get('budget_max') or 0
         
         # Format test scores
         test_scores_str = ""
@@ -253,10 +414,7 @@ Focus on the most important factors based on the student's weights. If academics
         career_goals_str = ", ".join(career_goals) if career_goals else "Not specified"
         locations_str = ", ".join(locations) if locations else "No specific location preference"
         
-        prompt = f"""
-You are an expert university admissions counselor and academic advisor. Your task is to evaluate how well a specific university matches a student's profile and provide a compatibility score.
-
-## STUDENT ACADEMIC PROFILE
+        return f"""## STUDENT ACADEMIC PROFILE
 **Academic Standing:**
 - Current GPA: {gpa} (on {gpa_scale} scale)
 - Current Level: {current_level}
@@ -273,7 +431,31 @@ You are an expert university admissions counselor and academic advisor. Your tas
 - Preferred Locations: {locations_str}
 - Budget Range: ${budget_min:,} - ${budget_max:,} per year
 
-## UNIVERSITY PROFILE
+"""
+    
+    def create_scoring_prompt(self, university_data: Dict[str, Any], user_profile: Dict[str, Any]) -> str:
+        """
+        Create comprehensive prompt for university scoring.
+        
+        Args:
+            university_data: University information from dataset
+            user_profile: Student profile and preferences
+            
+        Returns:
+            Formatted prompt string for LLM
+        """
+        # Extract university data
+        uni_name = university_data.get('display_name', 'Unknown University')
+        uni_country = university_data.get('country_code', 'Unknown')
+        uni_rank = university_data.get('webometrics_rank', 'Unranked')
+        works_count = university_data.get('works_count') or 0
+        cited_by_count = university_data.get('cited_by_count') or 0
+        homepage_url = university_data.get('homepage_url', 'Not available')
+        
+        prompt = f"""
+You are an expert university admissions counselor and academic advisor. Your task is to evaluate how well a specific university matches a student's profile and provide a compatibility score.
+
+{self._format_scoring_profile(user_profile)}## UNIVERSITY PROFILE
 **Institution Details:**
 - Name: {uni_name}
 - Country: {uni_country}
@@ -282,26 +464,7 @@ You are an expert university admissions counselor and academic advisor. Your tas
 - Citation Impact: {cited_by_count:,} total citations
 - Website: {homepage_url}
 
-## EVALUATION CRITERIA
-Rate this university match on a scale of 0.0 to 1.0 based on:
-
-1. **Academic Fit (30% weight)**: How well does the student's academic profile align with the university's standards and programs?
-2. **Interest Alignment (20% weight)**: How well do the university's programs match the student's academic interests?
-3. **Career Preparation (20% weight)**: How well does the university prepare students for their career goals?
-4. **Location Suitability (10% weight)**: How well does the location match the student's preferences?
-5. **Financial Feasibility (10% weight)**: How realistic is the financial fit?
-6. **Prestige & Ranking (5% weight)**: How does the university's reputation align with student expectations?
-7. **Research Opportunities (5% weight)**: How well does the university support research in the student's field?
-
-## ADMISSION LIKELIHOOD ASSESSMENT
-Consider the following factors for admission probability:
-- Student's academic competitiveness relative to university standards
-- Typical admission requirements for the university
-- Student's test scores vs. university averages
-- Geographic diversity considerations
-- Program-specific admission rates
-
-## INSTRUCTIONS
+{SCORING_CRITERIA}## INSTRUCTIONS
 1. Analyze each criterion thoroughly
 2. Consider admission likelihood realistically
 3. Provide a single numerical score between 0.0 and 1.0
@@ -311,6 +474,131 @@ Score:"""
 
         return prompt
     
+    def score_university_batch(
+        self,
+        universities: List[Dict[str, Any]],
+        user_profile: Dict[str, Any]
+    ) -> List[float]:
+        """
+        Score several universities with a single LLM API call.
+        
+        Args:
+            universities: University information, small enough for one prompt
+            user_profile: Student profile and preferences
+            
+        Returns:
+            Match scores in the same order as ``universities``; universities
+            missing from the response get the fallback score
+        """
+        response = self._post('score-batch', {
+            'university_ids': [university.get('id') for university in universities],
+            'prompt': self.create_batch_scoring_prompt(universities, user_profile),
+            'prompt_type': 'university_batch_scoring'
+        })
+        scores = self.parse_batch_scores(response.get('scores'), universities)
+        
+        return [
+            score if score is not None else self._fallback_score(university, user_profile)
+            for university, score in zip(universities, scores)
+        ]
+    
+    def plan_scoring_batches(
+        self,
+        universities: List[Dict[str, Any]],
+        user_profile: Dict[str, Any]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Group universities into batches whose prompts fit the token budget.
+        
+        Starts from a single batch and halves any batch whose prompt is over
+        ``LLM_BATCH_TOKEN_BUDGET``, keeping the original order.
+        """
+        pending = [list(universities)] if universities else []
+        batches = []
+        
+        while pending:
+            batch = pending.pop(0)
+            prompt = self.create_batch_scoring_prompt(batch, user_profile)
+            if len(batch) > 1 and estimate_tokens(prompt) > self.batch_token_budget:
+                middle = len(batch) // 2
+                pending[:0] = [batch[:middle], batch[middle:]]
+            else:
+                batches.append(batch)
+        
+        return batches
+    
+    def parse_batch_scores(self, raw: Any, universities: List[Dict[str, Any]]) -> List[Optional[float]]:
+        """
+        Parse the scores returned for a batch prompt.
+        
+        Accepts the model output as text or already decoded JSON: a list of
+        ``{"id": ..., "score": ...}`` objects, or a bare list of numbers in
+        prompt order. Scores that are missing or invalid come back as None.
+        """
+        if isinstance(raw, str):
+            start, end = raw.find('['), raw.rfind(']')
+            try:
+                raw = json.loads(raw[start:end + 1]) if start != -1 and end > start else None
+            except ValueError:
+                raw = None
+        
+        if not isinstance(raw, list):
+            return [None] * len(universities)
+        
+        def clamp(value):
+            try:
+                return max(0.0, min(1.0, float(value)))
+            except (TypeError, ValueError):
+                return None
+        
+        if all(isinstance(entry, dict) for entry in raw):
+            by_id = {str(entry.get('id')): clamp(entry.get('score')) for entry in raw}
+            return [by_id.get(str(university.get('id'))) for university in universities]
+        
+        if len(raw) == len(universities):
+            return [clamp(entry) for entry in raw]
+        
+        return [None] * len(universities)
+    
+    def create_batch_scoring_prompt(self, universities: List[Dict[str, Any]], user_profile: Dict[str, Any]) -> str:
+        """
+        Create one prompt scoring several universities for the same student.
+        
+        The student profile and evaluation criteria appear once, followed by
+        a one-line summary per university.
+        
+        Args:
+            universities: University information from dataset
+            user_profile: Student profile and preferences
+            
+        Returns:
+            Formatted prompt string for LLM
+        """
+        summaries = "\n".join(
+            f"- id={university.get('id')} | {university.get('display_name', 'Unknown University')} | "
+            f"country={university.get('country_code') or 'Unknown'} | "
+            f"rank={university.get('webometrics_rank') or 'Unranked'} | "
+            f"publications={university.get('works_count') or 0:,} | "
+            f"citations={university.get('cited_by_count') or 0:,}"
+            for university in universities
+        )
+        
+        prompt = f"""
+You are an expert university admissions counselor and academic advisor. Your task is to evaluate how well each university below matches a student's profile and provide a compatibility score for each one.
+
+{self._format_scoring_profile(user_profile)}## UNIVERSITIES
+{summaries}
+
+{SCORING_CRITERIA}## INSTRUCTIONS
+1. Analyze each criterion thoroughly for every university
+2. Consider admission likelihood realistically
+3. Provide a numerical score between 0.0 and 1.0 for every university listed
+4. Respond with ONLY a JSON array with one object per university, e.g. [{{"id": "<id>", "score": 0.75}}] - no explanation needed
+
+Scores:"""
+
+        return prompt
+    
     def analyze_student_profile(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze student profile using external LLM API.
@@ -480,6 +768,10 @@ Based on preferences and profile, provide insights about:
     def _fallback_score(self, university_data: Dict[str, Any], user_profile: Dict[str, Any]) -> float:
         """Simple scoring fallback when LLM API is unavailable."""
         
+        # Already computed by the dataset's scoring query
+        if university_data.get('rule_score') is not None:
+            return university_data['rule_score']
+        
         score = 0.5  # Base score
         
         # Boost for ranking
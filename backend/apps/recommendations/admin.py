@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import Recommendation
+from .models import Recommendation, RecommendationJob, RecommendationRun
+
+
+@admin.register(RecommendationRun)
+class RecommendationRunAdmin(admin.ModelAdmin):
+    list_display = ('user', 'top_n', 'created_at')
+    list_filter = ('created_at',)
+    search_fields = ('user__email',)
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
 
 
 @admin.register(Recommendation)
@@ -9,3 +18,12 @@ class RecommendationAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'university_ref', 'program')
     readonly_fields = ('generated_at',)
     ordering = ('-generated_at', '-score')
+
+
+@admin.register(RecommendationJob)
+class RecommendationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'top_n', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('user__email', 'id')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
@@ -5,3 +5,6 @@ class RecommendationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.recommendations'
     verbose_name = 'Recommendations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,169 @@
+"""
+Memoized recommendation results.
+
+A recommendation request is fingerprinted by the active dataset version, the
+normalized filters and weights, a digest of the student's profile and top_n.
+When a student repeats a request with the same fingerprint, the run saved
+last time is returned instead of running the pipeline again.
+
+Entries are keyed per user under a generation token that is replaced
+whenever the student's ``StudentProfile`` or ``Preference`` is saved (see
+``signals``), which drops all of that user's entries at once. Activating a
+new dataset version changes the fingerprint, so entries for the old version
+are simply never read again.
+
+Hit, miss and invalidation counters live in the shared cache so they cover
+every worker process.
+"""
+
+import hashlib
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import canonical_json
+
+from .models import Recommendation
+
+KEY_PREFIX = 'recommendations'
+STAT_NAMES = ('hits', 'misses', 'invalidations')
+
+# Weight names accepted by the API, mapped to the names used for scoring
+WEIGHT_ALIASES = {'researchActivity': 'research_activity'}
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Drop empty filters and sort list values, so equivalent filters compare equal.
+
+    Filters are free-form JSON, so list items are ordered by their canonical
+    JSON rather than compared directly (which fails on mixed types or dicts).
+    """
+    normalized = {}
+    for name, value in (filters or {}).items():
+        if value in (None, '', [], {}):
+            continue
+        if isinstance(value, (list, tuple)):
+            if name in ('countries', 'country'):
+                value = sorted(str(item).strip().upper() for item in value)
+            else:
+                value = sorted(value, key=canonical_json)
+        elif isinstance(value, str):
+            value = value.strip()
+            if name in ('countries', 'country'):
+                value = value.upper()
+        normalized[name] = value
+    return normalized
+
+
+def normalize_weights(weights: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Use canonical weight names and round values to 4 decimals."""
+    return {
+        WEIGHT_ALIASES.get(name, name): round(float(value), 4)
+        for name, value in (weights or {}).items()
+    }
+
+
+def canonical_digest(payload: Any) -> str:
+    """Return the sha256 of ``payload`` serialized with sorted keys."""
+    return hashlib.sha256(canonical_json(payload).encode('utf-8')).hexdigest()
+
+
+def request_fingerprint(
+    dataset_version: str,
+    filters: Dict[str, Any],
+    weights: Dict[str, float],
+    profile: Dict[str, Any],
+    top_n: int
+) -> str:
+    """Return the fingerprint of a recommendation request."""
+    profile = {name: value for name, value in profile.items() if name not in ('email', 'filters')}
+    return canonical_digest({
+        'dataset_version': dataset_version,
+        'filters': normalize_filters(filters),
+        'weights': normalize_weights(weights),
+        'profile': canonical_digest(profile),
+        'top_n': top_n,
+    })
+
+
+def _generation(user_id: int) -> str:
+    """Return the token under which ``user_id``'s current entries are stored."""
+    key = f"{KEY_PREFIX}:generation:{user_id}"
+    token = cache.get(key)
+    if token is None:
+        # A missing token (never set, or evicted) must not match older entries
+        cache.add(key, uuid.uuid4().hex, None)
+        token = cache.get(key)
+    return token
+
+
+def _result_key(user_id: int, fingerprint: str) -> str:
+    return f"{KEY_PREFIX}:result:{user_id}:{_generation(user_id)}:{fingerprint}"
+
+
+def _count(stat: str):
+    key = f"{KEY_PREFIX}:stats:{stat}"
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def get_cached_result(user, fingerprint: str) -> Optional[Tuple[List[Dict[str, Any]], List[Recommendation]]]:
+    """
+    Return ``(candidates, recommendations)`` saved for this request, or None.
+
+    Misses also cover entries whose run has since been replaced.
+    """
+    entry = cache.get(_result_key(user.id, fingerprint))
+    if entry is not None:
+        recommendations = {
+            recommendation.university_ref: recommendation
+            for recommendation in Recommendation.objects.filter(user=user, run_id=entry['run_id']).select_related('run')
+        }
+        candidates = entry['candidates']
+        if candidates and len(recommendations) == len(candidates):
+            _count('hits')
+            return candidates, [recommendations[str(candidate['id'])] for candidate in candidates]
+
+    _count('misses')
+    return None
+
+
+def store_result(user, fingerprint: str, candidates: List[Dict[str, Any]], recommendations: List[Recommendation]):
+    """Remember the run saved for this request."""
+    if not recommendations:
+        return
+    timeout = getattr(settings, 'RECOMMENDATION_RESULT_CACHE_TIMEOUT', 86400)
+    cache.set(
+        _result_key(user.id, fingerprint),
+        {'run_id': recommendations[0].run_id, 'candidates': candidates},
+        timeout
+    )
+
+
+def invalidate_user(user_id: int):
+    """Drop every memoized result for ``user_id``."""
+    cache.set(f"{KEY_PREFIX}:generation:{user_id}", uuid.uuid4().hex, None)
+    _count('invalidations')
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Return hit/miss/invalidation counts and the hit ratio."""
+    stats = {
+        stat: cache.get(f"{KEY_PREFIX}:stats:{stat}", 0)
+        for stat in STAT_NAMES
+    }
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_stats():
+    """Zero the counters."""
+    cache.delete_many([f"{KEY_PREFIX}:stats:{stat}" for stat in STAT_NAMES])
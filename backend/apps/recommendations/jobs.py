@@ -0,0 +1,225 @@
+"""
+Background execution of recommendation jobs.
+
+Jobs are rows in the ``recommendation_jobs`` table. ``submit_job`` inserts a
+PENDING row unless an identical job (same user, filters, weights and top_n)
+is already pending or running, in which case that job is returned instead.
+Workers claim the oldest pending job with a conditional UPDATE, so any
+number of threads and processes can share the table, then run
+``RecommendationService.generate_recommendations`` and record the outcome.
+
+Each web process starts ``RECOMMENDATION_JOB_WORKERS`` worker threads on the
+first submission. Set it to 0 and run ``manage.py run_recommendation_workers``
+to execute jobs in dedicated processes instead.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .cache import canonical_digest, normalize_filters, normalize_weights
+from .models import RecommendationJob, RecommendationRun
+
+logger = logging.getLogger(__name__)
+
+# Seconds between status checks while long-polling a job run elsewhere
+LONG_POLL_INTERVAL = 0.25
+
+# Notified whenever a job in this process finishes, to wake long-polls early
+_job_finished = threading.Condition()
+
+
+def job_dedup_key(user_id: int, filters: Dict[str, Any], weights: Dict[str, float], top_n: int) -> str:
+    """Return the key identical submissions share, equal for equivalent filters and weights."""
+    return canonical_digest({
+        'user': user_id,
+        'filters': normalize_filters(filters),
+        'weights': normalize_weights(weights),
+        'top_n': top_n,
+    })
+
+
+def submit_job(user, filters: Dict[str, Any], weights: Dict[str, float], top_n: int) -> Tuple[RecommendationJob, bool]:
+    """
+    Queue recommendation generation for ``user``.
+
+    Returns:
+        Tuple of (job, created); ``created`` is False when an identical job
+        was already pending or running and is returned instead
+    """
+    dedup_key = job_dedup_key(user.id, filters, weights, top_n)
+    active = RecommendationJob.objects.filter(dedup_key=dedup_key, status__in=RecommendationJob.ACTIVE_STATUSES)
+
+    job = active.first()
+    if job is not None:
+        return job, False
+
+    try:
+        with transaction.atomic():
+            job = RecommendationJob.objects.create(
+                user=user, filters=filters, weights=weights, top_n=top_n, dedup_key=dedup_key
+            )
+    except IntegrityError:
+        # An identical submission won the race
+        job = active.first()
+        if job is None:
+            raise
+        return job, False
+
+    pool = get_worker_pool()
+    if pool is not None:
+        transaction.on_commit(pool.notify)
+    return job, True
+
+
+def claim_next_job(worker: str) -> Optional[RecommendationJob]:
+    """Mark the oldest pending job as RUNNING for ``worker`` and return it."""
+    pending = RecommendationJob.objects.filter(status='PENDING')
+
+    while True:
+        job_id = pending.order_by('created_at').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+
+        # Only one worker's UPDATE matches; the others move on to the next job
+        claimed = pending.filter(id=job_id).update(status='RUNNING', worker=worker, started_at=timezone.now())
+        if claimed:
+            return RecommendationJob.objects.select_related('user').get(id=job_id)
+
+
+def fail_stale_jobs() -> int:
+    """Fail RUNNING jobs whose worker has exceeded RECOMMENDATION_JOB_TIMEOUT."""
+    timeout = getattr(settings, 'RECOMMENDATION_JOB_TIMEOUT', 300)
+    return RecommendationJob.objects.filter(
+        status='RUNNING',
+        started_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status='FAILED', error='Job timed out', finished_at=timezone.now())
+
+
+def execute_job(job: RecommendationJob, service=None) -> RecommendationJob:
+    """Generate the recommendations for a claimed job and record the outcome."""
+    from .services import RecommendationService
+
+    try:
+        service = service or RecommendationService()
+        recommendations = service.generate_recommendations(
+            user=job.user,
+            filters=job.filters,
+            weights=job.weights,
+            top_n=job.top_n
+        )
+        if recommendations:
+            job.run_id = recommendations[0].run_id
+        else:
+            job.run = RecommendationRun.objects.filter(user=job.user).first()
+        job.status = 'SUCCESS'
+    except Exception as e:
+        logger.error(f"Recommendation job {job.id} failed: {e}")
+        job.status = 'FAILED'
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'run', 'error', 'finished_at'])
+
+    with _job_finished:
+        _job_finished.notify_all()
+    return job
+
+
+def wait_for_job(job: RecommendationJob, timeout: float) -> RecommendationJob:
+    """Long-poll: return ``job`` once it finishes or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + timeout
+
+    while not job.is_completed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # Jobs run by this process wake us immediately, others are polled
+        with _job_finished:
+            _job_finished.wait(min(LONG_POLL_INTERVAL, remaining))
+        job.refresh_from_db()
+
+    return job
+
+
+class JobWorkerPool:
+    """Threads that claim and execute pending recommendation jobs."""
+
+    def __init__(self, workers: int, poll_interval: float = 1.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wake = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work,
+                args=(f"{os.getpid()}-{i}",),
+                name=f'recommendation-worker-{i}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.workers} recommendation job workers")
+
+    def notify(self):
+        """Wake an idle worker to look for new jobs."""
+        with self._wake:
+            self._wake.notify()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the jobs in progress finish."""
+        self._stopping.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self, worker: str):
+        """Worker loop: run jobs until none are pending, then sleep."""
+        try:
+            while not self._stopping.is_set():
+                close_old_connections()
+                try:
+                    job = claim_next_job(worker)
+                    if job is not None:
+                        execute_job(job)
+                        continue
+                    fail_stale_jobs()
+                except Exception as e:
+                    logger.error(f"Recommendation worker {worker} error: {e}")
+
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+
+_pool: Optional[JobWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[JobWorkerPool]:
+    """Return this process's worker pool, starting it on first use (None if disabled)."""
+    global _pool
+    workers = getattr(settings, 'RECOMMENDATION_JOB_WORKERS', 2)
+    if workers <= 0:
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = JobWorkerPool(workers, getattr(settings, 'RECOMMENDATION_JOB_POLL_INTERVAL', 1.0))
+                pool.start()
+                _pool = pool
+    return _pool
@@ -0,0 +1,321 @@
+"""
+Django management command to benchmark recommendation generation.
+
+Uses synthetic candidates and a representative student profile, so results
+do not depend on the real dataset or on a live LLM backend.
+
+Example usage:
+    python manage.py benchmark_recommendations --suite prompts --top-n 20
+    python manage.py benchmark_recommendations --suite scoring --rows 100000
+    python manage.py benchmark_recommendations --suite persistence --top-n 100
+    python manage.py benchmark_recommendations --suite jobs --requests 40 --clients 8 --workers 4
+"""
+
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from apps.dataset.engine import get_engine, reset_engine
+from apps.dataset.management.commands.benchmark_dataset import (
+    percentile, synthetic_institutions, write_synthetic_dataset
+)
+from apps.dataset.services import DatasetService
+from apps.llm.services import LLMService, estimate_tokens
+from apps.recommendations.jobs import JobWorkerPool, submit_job
+from apps.recommendations.models import Recommendation, RecommendationJob
+from apps.recommendations.services import RecommendationService
+
+SAMPLE_PROFILE = {
+    'gpa': 3.7,
+    'gpa_scale': 4.0,
+    'current_level': 'undergraduate',
+    'graduation_year': 2026,
+    'test_scores_json': {'SAT': 1480, 'TOEFL': 108},
+    'disciplines': ['Computer Science', 'Data Science'],
+    'career_goals': ['Machine learning engineer'],
+    'locations': ['US', 'CA', 'GB'],
+    'budget_min': 20000,
+    'budget_max': 60000,
+    'filters': {'countries': ['US', 'CA', 'GB']},
+}
+
+
+@contextmanager
+def temporary_database():
+    """Create a throwaway copy of the default database, so nothing is written to the configured one."""
+    temp_dir = tempfile.mkdtemp(prefix='uniquest-bench-')
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    if connection.vendor == 'sqlite':
+        test_settings['NAME'] = str(Path(temp_dir) / 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark recommendation generation against synthetic candidates'
+
+    suites = ['prompts', 'scoring', 'persistence', 'jobs']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--suite',
+            choices=self.suites,
+            action='append',
+            help='Benchmark suite to run (repeatable, defaults to all)'
+        )
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=20,
+            help='Recommendations requested per run (candidates scored = 2 x top-n)'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Number of synthetic institutions for the scoring suite'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Number of timed runs per scenario (submissions for the jobs suite)'
+        )
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=8,
+            help='Concurrent clients for the jobs suite'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Job workers for the jobs suite'
+        )
+
+    def handle(self, *args, **options):
+        self.top_n = options['top_n']
+        self.rows = options['rows']
+        self.requests = options['requests']
+        self.clients = options['clients']
+        self.workers = options['workers']
+        for suite in options['suite'] or self.suites:
+            getattr(self, f'_bench_{suite}')()
+
+    def _candidates(self):
+        """Candidate universities in the shape returned by the dataset service."""
+        return synthetic_institutions(self.top_n * 2).to_dicts()
+
+    def _bench_prompts(self):
+        """Prompt tokens and request count: per-university vs batched scoring."""
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"LLM scoring prompts for top_n={self.top_n} ({self.top_n * 2} candidates)"
+        ))
+
+        candidates = self._candidates()
+        service = LLMService()
+
+        single_tokens = sum(
+            estimate_tokens(service.create_scoring_prompt(candidate, SAMPLE_PROFILE))
+            for candidate in candidates
+        )
+        self._report('per-university', len(candidates), single_tokens)
+
+        for budget in (service.batch_token_budget, 2000, 1000):
+            with override_settings(LLM_BATCH_TOKEN_BUDGET=budget):
+                batches = LLMService().plan_scoring_batches(candidates, SAMPLE_PROFILE)
+            batch_tokens = sum(
+                estimate_tokens(service.create_batch_scoring_prompt(batch, SAMPLE_PROFILE))
+                for batch in batches
+            )
+            self._report(f'batched (budget {budget})', len(batches), batch_tokens)
+            self.stdout.write(
+                f"    {single_tokens / batch_tokens:.1f}x fewer tokens, "
+                f"{len(candidates) / len(batches):.1f}x fewer requests"
+            )
+
+    def _bench_scoring(self):
+        """Rank every institution: per-row Python scoring vs the feature matrix."""
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Rule-based ranking of {self.rows} institutions (top {self.top_n})"
+        ))
+
+        temp_dir = tempfile.mkdtemp(prefix='uniquest-bench-')
+        try:
+            write_synthetic_dataset(temp_dir, 'bench', self.rows)
+            with override_settings(DATASET_BASE_PATH=temp_dir):
+                reset_engine()
+                get_engine().load()
+                dataset_service = DatasetService()
+                llm_service = LLMService()
+                recommendation_service = RecommendationService()
+                weights = {'academics': 0.8, 'ranking': 0.6, 'research_activity': 0.4}
+
+                def python_scoring():
+                    # Before: fetch rows, build dicts, score each in Python, sort
+                    candidates = dataset_service.get_matching_universities(limit=self.rows)
+                    for candidate in candidates:
+                        score = llm_service._fallback_score(candidate, SAMPLE_PROFILE)
+                        candidate['score'] = recommendation_service._apply_user_weights(score, weights)
+                    candidates.sort(key=lambda x: x['score'], reverse=True)
+                    return candidates[:self.top_n]
+
+                def feature_scoring():
+                    return dataset_service.get_matching_universities(
+                        limit=self.top_n, weights=weights, profile=SAMPLE_PROFILE
+                    )
+
+                self._report_latency('per-row Python (before)', self._time(python_scoring))
+                self._report_latency('feature matrix top-k (after)', self._time(feature_scoring))
+        finally:
+            reset_engine()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _bench_persistence(self):
+        """Write one run of top_n recommendations: per-row INSERTs vs one bulk INSERT."""
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Saving {self.top_n} recommendations ({connection.vendor})"
+        ))
+
+        with temporary_database():
+            user = get_user_model().objects.create_user(
+                email='bench@example.com', password='bench', username='bench'
+            )
+            filters = SAMPLE_PROFILE['filters']
+            weights = {'academics': 0.8, 'ranking': 0.6, 'research_activity': 0.4}
+            scored = [
+                dict(candidate, score=0.9 - i / 1000)
+                for i, candidate in enumerate(synthetic_institutions(self.top_n).to_dicts())
+            ]
+            rationales = [
+                f"{candidate['display_name']} is recommended for its located in {candidate['country_code']}."
+                for candidate in scored
+            ]
+            service = RecommendationService()
+
+            def per_row():
+                # Before: autocommitted DELETE, then one INSERT per recommendation
+                Recommendation.objects.filter(user=user).delete()
+                for rec_data, rationale in zip(scored, rationales):
+                    Recommendation.objects.create(
+                        user=user,
+                        university_ref=rec_data['id'],
+                        score=rec_data['score'],
+                        rationale=rationale
+                    )
+
+            def bulk():
+                service.save_run(user, filters, weights, self.top_n, scored, rationales)
+
+            self._report_latency('per-row create (before)', self._time(per_row))
+            self._report_latency('bulk_create run (after)', self._time(bulk))
+
+    def _bench_jobs(self):
+        """Concurrent submissions: generating inside the request vs queued jobs."""
+        clients = self.clients
+        users_count = max(1, self.requests // 2)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{users_count * 2} concurrent submissions from {clients} clients "
+            f"(each student submits twice), {self.workers} job workers, {self.rows} institutions"
+        ))
+
+        temp_dir = tempfile.mkdtemp(prefix='uniquest-bench-')
+        try:
+            write_synthetic_dataset(temp_dir, 'bench', self.rows)
+            with override_settings(DATASET_BASE_PATH=temp_dir, EXTERNAL_LLM_API_URL=None), temporary_database():
+                reset_engine()
+                get_engine().load()
+                User = get_user_model()
+                users = [
+                    User.objects.create_user(email=f'bench{i}@example.com', password='bench', username=f'bench{i}')
+                    for i in range(users_count)
+                ]
+                weights = {'academics': 0.8, 'ranking': 0.6, 'research_activity': 0.4}
+                submissions = [user for user in users for _ in range(2)]
+
+                def generate(user):
+                    RecommendationService().generate_recommendations(user, SAMPLE_PROFILE['filters'], weights, self.top_n)
+
+                # Before: every request generates recommendations itself
+                latencies, elapsed = self._run_clients(submissions, generate)
+                self._report_latency('in-request generation (before)', latencies)
+                self.stdout.write(f"    {len(submissions) / elapsed:.1f} requests/s, {len(submissions)} runs")
+
+                # After: requests only enqueue, the worker pool drains the table
+                pool = JobWorkerPool(self.workers, poll_interval=0.05)
+                pool.start()
+                try:
+                    start = time.perf_counter()
+                    jobs = []
+                    latencies, _ = self._run_clients(
+                        submissions,
+                        lambda user: jobs.append(submit_job(user, SAMPLE_PROFILE['filters'], weights, self.top_n))
+                    )
+                    while RecommendationJob.objects.filter(status__in=RecommendationJob.ACTIVE_STATUSES).exists():
+                        time.sleep(0.01)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    pool.stop()
+
+                executed = RecommendationJob.objects.count()
+                failed = RecommendationJob.objects.filter(status='FAILED').count()
+                self._report_latency('job submission (after)', latencies)
+                self.stdout.write(
+                    f"    {len(submissions) / elapsed:.1f} requests/s until all done, "
+                    f"{executed} runs ({len(submissions) - executed} deduplicated, {failed} failed)"
+                )
+        finally:
+            reset_engine()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _run_clients(self, items, func):
+        """Call ``func`` for every item from ``self.clients`` threads; return latencies and wall time."""
+        latencies = []
+
+        def call(item):
+            start = time.perf_counter()
+            try:
+                func(item)
+            finally:
+                latencies.append((time.perf_counter() - start) * 1000)
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.clients) as executor:
+            list(executor.map(call, items))
+        return latencies, time.perf_counter() - start
+
+    def _time(self, func):
+        """Call ``func`` repeatedly and return latencies in milliseconds."""
+        samples = []
+        for _ in range(self.requests):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def _report_latency(self, label, samples_ms):
+        """Print p50/p99 latency for a list of samples in milliseconds."""
+        self.stdout.write(
+            f"  {label:<32} p50={percentile(samples_ms, 50):8.2f} ms  "
+            f"p99={percentile(samples_ms, 99):8.2f} ms  "
+            f"mean={statistics.mean(samples_ms):8.2f} ms"
+        )
+
+    def _report(self, label, requests, tokens):
+        """Print request and prompt token counts for one scoring strategy."""
+        self.stdout.write(f"  {label:<24} requests={requests:4d}  prompt tokens={tokens:7d}")
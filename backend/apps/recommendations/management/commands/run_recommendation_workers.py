@@ -0,0 +1,47 @@
+"""
+Django management command to execute queued recommendation jobs.
+
+Runs a pool of worker threads that claim jobs from the recommendation_jobs
+table until interrupted. Use it with RECOMMENDATION_JOB_WORKERS=0 so web
+processes only enqueue jobs.
+
+Example usage:
+    python manage.py run_recommendation_workers --workers 4
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.recommendations.jobs import JobWorkerPool
+
+
+class Command(BaseCommand):
+    help = 'Execute queued recommendation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of worker threads'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'RECOMMENDATION_JOB_POLL_INTERVAL', 1.0),
+            help='Seconds an idle worker waits before checking for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        pool = JobWorkerPool(options['workers'], options['poll_interval'])
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"Running {options['workers']} recommendation workers"))
+
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after jobs in progress finish...")
+            pool.stop()
@@ -0,0 +1,129 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:00
+
+import json
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_runs(apps, schema_editor):
+    """Move each user's filters/weights snapshot from its recommendations onto a run."""
+    Recommendation = apps.get_model("recommendations", "Recommendation")
+    RecommendationRun = apps.get_model("recommendations", "RecommendationRun")
+
+    runs = {}
+    for recommendation in Recommendation.objects.order_by("generated_at").iterator():
+        key = (
+            recommendation.user_id,
+            json.dumps(recommendation.filters, sort_keys=True),
+            json.dumps(recommendation.weights, sort_keys=True),
+        )
+        if key not in runs:
+            runs[key] = RecommendationRun.objects.create(
+                user_id=recommendation.user_id,
+                filters=recommendation.filters,
+                weights=recommendation.weights,
+                top_n=0,
+            )
+        run = runs[key]
+        run.top_n += 1
+        recommendation.run = run
+        recommendation.save(update_fields=["run"])
+
+    for run in runs.values():
+        run.save(update_fields=["top_n"])
+
+
+def restore_snapshots(apps, schema_editor):
+    """Copy each run's filters/weights back onto its recommendations."""
+    Recommendation = apps.get_model("recommendations", "Recommendation")
+
+    for recommendation in Recommendation.objects.select_related("run").exclude(run=None).iterator():
+        recommendation.filters = recommendation.run.filters
+        recommendation.weights = recommendation.run.weights
+        recommendation.save(update_fields=["filters", "weights"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recommendations", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "filters",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Filters used when generating these recommendations",
+                    ),
+                ),
+                (
+                    "weights",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Weights used when generating these recommendations",
+                    ),
+                ),
+                (
+                    "top_n",
+                    models.PositiveIntegerField(
+                        default=20, help_text="Number of recommendations requested"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendation_runs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "recommendation_runs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at"],
+                        name="recommendat_user_id_b36881_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="recommendation",
+            name="run",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recommendations",
+                to="recommendations.recommendationrun",
+            ),
+        ),
+        migrations.RunPython(create_runs, restore_snapshots),
+        migrations.RemoveField(
+            model_name="recommendation",
+            name="filters",
+        ),
+        migrations.RemoveField(
+            model_name="recommendation",
+            name="weights",
+        ),
+    ]
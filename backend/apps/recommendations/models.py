@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -5,6 +7,46 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 User = get_user_model()
 
 
+class RecommendationRun(models.Model):
+    """One recommendation generation for a user, with the inputs it used."""
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendation_runs'
+    )
+    
+    # Snapshot of filters used for this run
+    filters = models.JSONField(
+        default=dict,
+        help_text="Filters used when generating these recommendations"
+    )
+    
+    # Snapshot of weights used for this run
+    weights = models.JSONField(
+        default=dict,
+        help_text="Weights used when generating these recommendations"
+    )
+    
+    top_n = models.PositiveIntegerField(
+        default=20,
+        help_text="Number of recommendations requested"
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'recommendation_runs'
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Recommendation run for {self.user.email} at {self.created_at}"
+
+
 class Recommendation(models.Model):
     """University recommendation for a user."""
     
@@ -14,6 +56,15 @@ class Recommendation(models.Model):
         related_name='recommendations'
     )
     
+    # Run that produced this recommendation (holds the filters/weights snapshot)
+    run = models.ForeignKey(
+        RecommendationRun,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        null=True,
+        blank=True
+    )
+    
     # University reference (OpenAlex ID or canonical key)
     university_ref = models.CharField(
         max_length=255,
@@ -39,18 +90,6 @@ class Recommendation(models.Model):
         help_text="Explanation for why this university was recommended"
     )
     
-    # Snapshot of filters used for this recommendation
-    filters = models.JSONField(
-        default=dict,
-        help_text="Filters used when generating this recommendation"
-    )
-    
-    # Snapshot of weights used for this recommendation
-    weights = models.JSONField(
-        default=dict,
-        help_text="Weights used when generating this recommendation"
-    )
-    
     # Timestamps
     generated_at = models.DateTimeField(auto_now_add=True)
     
@@ -72,6 +111,16 @@ class Recommendation(models.Model):
         """Return score as percentage."""
         return int(self.score * 100)
     
+    @property
+    def filters(self):
+        """Filters used when generating this recommendation."""
+        return self.run.filters if self.run_id else {}
+    
+    @property
+    def weights(self):
+        """Weights used when generating this recommendation."""
+        return self.run.weights if self.run_id else {}
+    
     def get_filter_value(self, filter_name):
         """Get a specific filter value."""
         return self.filters.get(filter_name)
@@ -79,3 +128,106 @@ class Recommendation(models.Model):
     def get_weight_value(self, weight_name):
         """Get a specific weight value."""
         return self.weights.get(weight_name, 0.0)
+
+
+class RecommendationJob(models.Model):
+    """Queued recommendation generation, executed by a background worker."""
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('SUCCESS', 'Success'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    # Jobs in these states block identical submissions
+    ACTIVE_STATUSES = ['PENDING', 'RUNNING']
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendation_jobs'
+    )
+    
+    filters = models.JSONField(
+        default=dict,
+        help_text="Filters to generate recommendations with"
+    )
+    
+    weights = models.JSONField(
+        default=dict,
+        help_text="Weights to generate recommendations with"
+    )
+    
+    top_n = models.PositiveIntegerField(
+        default=20,
+        help_text="Number of recommendations requested"
+    )
+    
+    dedup_key = models.CharField(
+        max_length=64,
+        help_text="sha256 of user, filters, weights and top_n"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='PENDING'
+    )
+    
+    # Run written by the job once it succeeds
+    run = models.ForeignKey(
+        RecommendationRun,
+        on_delete=models.SET_NULL,
+        related_name='jobs',
+        null=True,
+        blank=True
+    )
+    
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker that claimed the job"
+    )
+    
+    error = models.TextField(
+        blank=True,
+        help_text="Error message if the job failed"
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'recommendation_jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['user', '-created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_active_recommendation_job'
+            ),
+        ]
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Recommendation job {self.id} for {self.user.email} ({self.status})"
+    
+    @property
+    def is_completed(self):
+        """Return True if the job has finished (success or failed)."""
+        return self.status in ['SUCCESS', 'FAILED']
+    
+    @property
+    def duration_seconds(self):
+        """Return run time in seconds if finished."""
+        if self.finished_at and self.started_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return None
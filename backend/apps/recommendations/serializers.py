@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Recommendation
+from django.conf import settings
+from .models import Recommendation, RecommendationJob
 
 
 class RecommendationSerializer(serializers.ModelSerializer):
@@ -10,10 +11,10 @@ class RecommendationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recommendation
         fields = [
-            'id', 'university_ref', 'program', 'score', 'score_percentage',
+            'id', 'run', 'university_ref', 'program', 'score', 'score_percentage',
             'rationale', 'filters', 'weights', 'generated_at'
         ]
-        read_only_fields = ['id', 'generated_at']
+        read_only_fields = ['id', 'run', 'generated_at']
 
 
 class RecommendationRequestSerializer(serializers.Serializer):
@@ -73,3 +74,39 @@ class RecommendationRequestSerializer(serializers.Serializer):
                 )
         
         return value
+
+
+class RecommendationJobSerializer(serializers.ModelSerializer):
+    """Serializer for queued recommendation jobs."""
+    
+    recommendations = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = RecommendationJob
+        fields = [
+            'id', 'status', 'filters', 'weights', 'top_n', 'run', 'error',
+            'created_at', 'started_at', 'finished_at', 'recommendations'
+        ]
+        read_only_fields = fields
+    
+    def get_recommendations(self, obj):
+        """Return the job's recommendations once it has succeeded."""
+        if obj.status != 'SUCCESS' or obj.run_id is None:
+            return None
+        recommendations = obj.run.recommendations.select_related('run').order_by('-score')
+        return RecommendationSerializer(recommendations, many=True).data
+
+
+class RecommendationJobWaitSerializer(serializers.Serializer):
+    """Serializer for job status query parameters."""
+    
+    wait = serializers.FloatField(
+        required=False,
+        default=0,
+        min_value=0,
+        help_text="Seconds to wait for the job to finish (long-poll)"
+    )
+    
+    def validate_wait(self, value):
+        """Cap the wait at RECOMMENDATION_JOB_MAX_WAIT."""
+        return min(value, getattr(settings, 'RECOMMENDATION_JOB_MAX_WAIT', 20.0))
@@ -1,7 +1,13 @@
 import logging
-from typing import List, Dict, Any
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Recommendation
+from django.db import transaction
+from . import cache as result_cache
+from .models import Recommendation, RecommendationRun
+from ..dataset.engine import get_base_path, read_current_version
+from ..dataset.scoring import weight_factor
 from ..dataset.services import DatasetService
 from ..preferences.models import Preference
 from ..llm.services import LLMService
@@ -36,6 +42,30 @@ class RecommendationService:
         Returns:
             List of Recommendation objects
         """
+        for event, data in self.stream_recommendations(user, filters, weights, top_n):
+            if event == 'done':
+                return data
+    
+    def stream_recommendations(
+        self,
+        user: User,
+        filters: Dict[str, Any],
+        weights: Dict[str, float],
+        top_n: int = 20
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Generate recommendations, yielding progress as ``(event, data)`` pairs.
+        
+        Events, in order:
+            ``candidates``: ranked university dicts, as soon as scoring is done
+            ``rationale``: ``(index, rationale)`` for each university as its
+                rationale finishes, in completion order
+            ``done``: the saved Recommendation objects
+        
+        A repeat of an earlier request (same dataset version, filters,
+        weights, profile and top_n) replays the saved run from the result
+        cache instead.
+        """
         try:
             # Get user preferences if weights not provided
             if not weights:
@@ -48,58 +78,112 @@ class RecommendationService:
             # Get user profile for LLM context
             user_profile = self._build_user_profile(user, filters)
             
-            # Get basic university matches from dataset (without complex scoring)
+            fingerprint = result_cache.request_fingerprint(
+                read_current_version(get_base_path()), filters, weights, user_profile, top_n
+            )
+            cached = result_cache.get_cached_result(user, fingerprint)
+            if cached is not None:
+                top_recommendations, recommendations = cached
+                yield 'candidates', top_recommendations
+                for index, recommendation in enumerate(recommendations):
+                    yield 'rationale', (index, recommendation.rationale)
+                logger.info(f"Served {len(recommendations)} cached recommendations for user {user.id}")
+                yield 'done', recommendations
+                return
+            
+            # LLM calls for both phases must finish by this deadline; anything
+            # still outstanding then falls back to rule-based scores/rationales
+            deadline = time.monotonic() + getattr(settings, 'LLM_RECOMMENDATION_DEADLINE', 30.0)
+            
+            # Score every matching university in DuckDB and keep the best;
+            # the LLM re-ranks twice as many candidates as it returns
+            use_llm = bool(self.llm_service.api_url)
             dataset_recommendations = self.dataset_service.get_matching_universities(
                 filters=filters,
-                limit=top_n * 2  # Get more candidates for LLM scoring
+                limit=top_n * 2 if use_llm else top_n,
+                weights=weights,
+                profile=user_profile
             )
             
-            # Use LLM to score and rank universities
-            scored_recommendations = []
-            for rec_data in dataset_recommendations:
-                # Use LLM for scoring
-                llm_score = self.llm_service.score_university_match(rec_data, user_profile)
+            if use_llm:
+                # Use LLM to score and rank universities (calls run concurrently)
+                llm_scores = self.llm_service.score_universities(
+                    dataset_recommendations, user_profile, deadline=deadline
+                )
                 
-                # Apply user weights to adjust score
-                final_score = self._apply_user_weights(llm_score, weights)
+                for rec_data, llm_score in zip(dataset_recommendations, llm_scores):
+                    # Apply user weights to adjust score
+                    rec_data['score'] = self._apply_user_weights(llm_score, weights)
                 
-                rec_data['score'] = final_score
-                scored_recommendations.append(rec_data)
+                # Sort by score and take top N
+                dataset_recommendations.sort(key=lambda x: x['score'], reverse=True)
+            
+            # Without an LLM the rule-based scores and order come from the query
+            top_recommendations = dataset_recommendations[:top_n]
+            yield 'candidates', top_recommendations
+            
+            # Generate personalized rationales using LLM (calls run concurrently)
+            rationales = [None] * len(top_recommendations)
+            for index, rationale in self.llm_service.iter_rationales(
+                top_recommendations, user_profile, weights, deadline=deadline
+            ):
+                rationales[index] = rationale
+                yield 'rationale', (index, rationale)
             
-            # Sort by score and take top N
-            scored_recommendations.sort(key=lambda x: x['score'], reverse=True)
-            top_recommendations = scored_recommendations[:top_n]
+            # Persist the run and its recommendations in one transaction
+            recommendations = self.save_run(user, filters, weights, top_n, top_recommendations, rationales)
+            result_cache.store_result(user, fingerprint, top_recommendations, recommendations)
+            
+            logger.info(f"Generated {len(recommendations)} LLM-powered recommendations for user {user.id}")
+            yield 'done', recommendations
             
+        except Exception as e:
+            logger.error(f"Error generating recommendations for user {user.id}: {str(e)}")
+            raise
+    
+    def save_run(
+        self,
+        user: User,
+        filters: Dict[str, Any],
+        weights: Dict[str, float],
+        top_n: int,
+        scored_universities: List[Dict[str, Any]],
+        rationales: List[str]
+    ) -> List[Recommendation]:
+        """
+        Replace the user's recommendations with a new run in one transaction.
+        
+        The filters/weights snapshot is stored once on the run and the
+        recommendations are written with a single bulk INSERT.
+        
+        Args:
+            user: User the recommendations belong to
+            filters: Filters used for this run
+            weights: Weights used for this run
+            top_n: Number of recommendations requested
+            scored_universities: University dicts with ``id`` and ``score``, best first
+            rationales: Rationales in the same order as ``scored_universities``
+            
+        Returns:
+            List of saved Recommendation objects
+        """
+        with transaction.atomic():
             # Delete existing recommendations for this user to avoid clutter
             Recommendation.objects.filter(user=user).delete()
+            RecommendationRun.objects.filter(user=user).delete()
             
-            # Create Recommendation objects with LLM-generated rationales
-            recommendations = []
-            for i, rec_data in enumerate(top_recommendations):
-                # Generate personalized rationale using LLM
-                rationale = self.llm_service.generate_rationale(
-                    university_data=rec_data,
-                    user_profile=user_profile,
-                    weights=weights
-                )
-                
-                recommendation = Recommendation.objects.create(
+            run = RecommendationRun.objects.create(user=user, filters=filters, weights=weights, top_n=top_n)
+            return Recommendation.objects.bulk_create([
+                Recommendation(
                     user=user,
+                    run=run,
                     university_ref=rec_data['id'],
                     program=rec_data.get('suggested_program'),
                     score=rec_data['score'],
-                    rationale=rationale,
-                    filters=filters,
-                    weights=weights
+                    rationale=rationale
                 )
-                recommendations.append(recommendation)
-            
-            logger.info(f"Generated {len(recommendations)} LLM-powered recommendations for user {user.id}")
-            return recommendations
-            
-        except Exception as e:
-            logger.error(f"Error generating recommendations for user {user.id}: {str(e)}")
-            raise
+                for rec_data, rationale in zip(scored_universities, rationales)
+            ])
     
     def _build_user_profile(self, user: User, filters: Dict[str, Any]) -> Dict[str, Any]:
         """Build comprehensive user profile for LLM context."""
@@ -145,9 +229,7 @@ class RecommendationService:
         """Apply user preference weights to adjust LLM base score."""
         
         # This is a simple adjustment - in practice you might want more sophisticated weighting
-        weight_factor = sum(weights.values()) / len(weights) if weights else 1.0
-        
-        # Adjust score based on overall preference intensity
-        adjusted_score = base_score * weight_factor
+        # (the same factor is applied in SQL by apps.dataset.scoring)
+        adjusted_score = base_score * weight_factor(weights)
         
         return max(0.0, min(1.0, adjusted_score))  # Clamp between 0 and 1
\ No newline at end of file
@@ -0,0 +1,19 @@
+"""
+Invalidate memoized recommendation results when their inputs change.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..preferences.models import Preference
+from ..students.models import StudentProfile
+from .cache import invalidate_user
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_save, sender=Preference)
+@receiver(post_delete, sender=Preference)
+def invalidate_cached_recommendations(sender, instance, **kwargs):
+    """Drop the user's cached results after a profile or preference change."""
+    invalidate_user(instance.user_id)
@@ -1,14 +1,86 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
-from .models import Recommendation
+from apps.llm.cache import make_cache_key, rationale_cache
+from apps.students.models import StudentProfile
+from .cache import cache_stats, normalize_filters, request_fingerprint
+from .jobs import claim_next_job, execute_job, submit_job
+from .models import Recommendation, RecommendationJob, RecommendationRun
 from .services import RecommendationService
 
 User = get_user_model()
 
 
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Answers the LLM API endpoints after a per-university delay."""
+    
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        
+        if self.path.endswith('/score-batch'):
+            ids = payload['university_ids']
+            delay = server.default_latency
+        else:
+            name = payload['university_data']['display_name']
+            delay = server.latency.get(name, server.default_latency)
+        
+        with server.lock:
+            server.calls.append((self.path, payload))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(delay)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        
+        if self.path.endswith('/score-batch'):
+            # Raw model output, as the batch prompt asks for
+            body = {'scores': 'Scores: ' + json.dumps([{'id': i, 'score': 0.8} for i in ids])}
+        elif self.path.endswith('/score-match'):
+            body = {'score': 0.8}
+        else:
+            body = {'rationale': f'LLM rationale for {name}'}
+        
+        encoded = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_llm_server(default_latency, latency=None):
+    """Start a local fake LLM API on a free port."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeLLMHandler)
+    server.daemon_threads = True
+    server.block_on_close = False
+    server.lock = threading.Lock()
+    server.calls = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.default_latency = default_latency
+    server.latency = latency or {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
 class RecommendationModelTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -101,6 +173,469 @@ class RecommendationServiceTest(TestCase):
         self.assertIn('Stanford University', recommendations[0].rationale)
 
 
+class RecommendationRunTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            username='testuser',
+            first_name='Test',
+            last_name='User'
+        )
+        self.service = RecommendationService()
+    
+    def save_run(self, count):
+        scored = [{'id': f'openalex_{i}', 'score': 0.9 - i / 1000} for i in range(count)]
+        rationales = [f'Rationale {i}' for i in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            recommendations = self.service.save_run(
+                self.user, {'countries': ['US']}, {'academics': 1.0}, count, scored, rationales
+            )
+        return recommendations, len(queries)
+    
+    def test_save_run_stores_snapshot_once(self):
+        """Test a run keeps filters/weights once and replaces the previous run."""
+        self.save_run(3)
+        recommendations, _ = self.save_run(5)
+        
+        run = RecommendationRun.objects.get(user=self.user)
+        self.assertEqual(run.filters, {'countries': ['US']})
+        self.assertEqual(run.top_n, 5)
+        self.assertEqual(Recommendation.objects.filter(user=self.user, run=run).count(), 5)
+        self.assertEqual(recommendations[0].weights, {'academics': 1.0})
+        self.assertEqual(recommendations[4].rationale, 'Rationale 4')
+    
+    def test_save_run_query_count_is_constant(self):
+        """Test writing a run costs the same number of queries for 2 or 100 recommendations."""
+        self.save_run(2)
+        _, small = self.save_run(2)
+        _, large = self.save_run(100)
+        self.assertEqual(small, large)
+
+
+class RecommendationResultCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            username='testuser',
+            first_name='Test',
+            last_name='User'
+        )
+        cache.clear()
+        patcher = patch('apps.recommendations.services.DatasetService')
+        self.mock_dataset_service = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.mock_dataset_service.get_matching_universities.side_effect = lambda **kwargs: [
+            {'id': 'openalex_1', 'display_name': 'Stanford University', 'country_code': 'US', 'rule_score': 0.9, 'score': 0.9},
+            {'id': 'openalex_2', 'display_name': 'MIT', 'country_code': 'US', 'rule_score': 0.8, 'score': 0.8},
+        ]
+    
+    def generate(self, **kwargs):
+        request = {'filters': {'countries': ['US', 'CA']}, 'weights': {'academics': 1.0}, 'top_n': 2}
+        request.update(kwargs)
+        return RecommendationService().generate_recommendations(user=self.user, **request)
+    
+    def test_repeat_request_is_served_from_cache(self):
+        """Test an equivalent request returns the saved run without scoring again."""
+        first = self.generate()
+        second = self.generate(filters={'countries': ['ca', 'us'], 'city': ''})
+        
+        self.assertEqual(self.mock_dataset_service.get_matching_universities.call_count, 1)
+        self.assertEqual([r.id for r in second], [r.id for r in first])
+        self.assertEqual(RecommendationRun.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(cache_stats()['hits'], 1)
+        self.assertEqual(cache_stats()['hit_ratio'], 0.5)
+        
+        self.generate(top_n=1)
+        self.assertEqual(self.mock_dataset_service.get_matching_universities.call_count, 2)
+    
+    def test_profile_change_invalidates(self):
+        """Test saving the student's profile drops their cached results."""
+        self.generate()
+        StudentProfile.objects.create(user=self.user, gpa=3.5)
+        self.generate()
+        self.generate()
+        
+        self.assertEqual(self.mock_dataset_service.get_matching_universities.call_count, 2)
+        self.assertEqual(cache_stats()['invalidations'], 1)
+
+    def test_normalize_filters_orders_mixed_list_values(self):
+        """Test list filters of mixed types or dicts normalize in any order."""
+        self.assertEqual(normalize_filters({'programs': ['CS', 1]}), normalize_filters({'programs': [1, 'CS']}))
+        self.assertEqual(
+            normalize_filters({'ranges': [{'a': 1}, {'b': 2}], 'countries': [' us', 'ca']}),
+            normalize_filters({'ranges': [{'b': 2}, {'a': 1}], 'countries': ['CA', 'US']})
+        )
+
+        profile = {'user_id': 1, 'gpa': 3.5}
+        self.assertEqual(
+            request_fingerprint('2025.09', {'programs': ['CS', 1, None]}, {}, profile, 10),
+            request_fingerprint('2025.09', {'programs': [None, 1, 'CS']}, {}, profile, 10)
+        )
+
+    def test_fingerprint_includes_dataset_version(self):
+        """Test activating a new dataset version changes the fingerprint."""
+        profile = {'user_id': 1, 'email': 'test@example.com', 'gpa': 3.5}
+        fingerprint = request_fingerprint('2025.09', {'country': 'us'}, {'researchActivity': 0.5}, profile, 10)
+        
+        self.assertEqual(fingerprint, request_fingerprint(
+            '2025.09', {'country': 'US', 'city': None}, {'research_activity': 0.50001}, dict(profile, email='new@example.com'), 10
+        ))
+        self.assertNotEqual(fingerprint, request_fingerprint('2025.10', {'country': 'US'}, {'research_activity': 0.5}, profile, 10))
+        
+        self.generate()
+        with override_settings(DATASET_CURRENT_VERSION='2099.01', DATASET_BASE_PATH='/nonexistent'):
+            self.generate()
+        self.assertEqual(self.mock_dataset_service.get_matching_universities.call_count, 2)
+
+
+class RecommendationJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            username='testuser',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    def test_identical_submissions_run_once(self):
+        """Test the same user/filters/weights only queue one job until it finishes."""
+        job, created = submit_job(self.user, {'countries': ['US']}, {'academics': 1.0}, 10)
+        duplicate, duplicate_created = submit_job(self.user, {'countries': ['US']}, {'academics': 1.0}, 10)
+        other, other_created = submit_job(self.user, {'countries': ['US']}, {'academics': 0.5}, 10)
+        
+        self.assertTrue(created)
+        self.assertFalse(duplicate_created)
+        self.assertEqual(duplicate.id, job.id)
+        self.assertTrue(other_created)
+        
+        # Equivalent filters and weights share the job
+        equivalent, equivalent_created = submit_job(self.user, {'countries': ['us'], 'q': ''}, {'academics': 1}, 10)
+        self.assertFalse(equivalent_created)
+        self.assertEqual(equivalent.id, job.id)
+        
+        self.assertEqual(claim_next_job('worker-1').id, job.id)
+        self.assertEqual(submit_job(self.user, {'countries': ['US']}, {'academics': 1.0}, 10)[0].id, job.id)
+        
+        execute_job(RecommendationJob.objects.get(id=job.id), service=MagicMock(
+            generate_recommendations=MagicMock(return_value=[])
+        ))
+        resubmitted, resubmitted_created = submit_job(self.user, {'countries': ['US']}, {'academics': 1.0}, 10)
+        self.assertTrue(resubmitted_created)
+        self.assertNotEqual(resubmitted.id, job.id)
+    
+    def test_execute_job_records_outcome(self):
+        """Test workers claim the oldest job and record its run or error."""
+        first, _ = submit_job(self.user, {}, {'academics': 1.0}, 2)
+        second, _ = submit_job(self.user, {}, {'academics': 0.5}, 2)
+        
+        service = RecommendationService()
+        run_universities = [{'id': 'openalex_1', 'score': 0.9}, {'id': 'openalex_2', 'score': 0.8}]
+        with patch.object(service, 'generate_recommendations', side_effect=lambda user, filters, weights, top_n: service.save_run(
+            user, filters, weights, top_n, run_universities, ['Rationale 1', 'Rationale 2']
+        )):
+            job = execute_job(claim_next_job('worker-1'), service=service)
+        
+        self.assertEqual(job.id, first.id)
+        self.assertEqual(job.status, 'SUCCESS')
+        self.assertEqual(job.worker, 'worker-1')
+        self.assertEqual(job.run.recommendations.count(), 2)
+        
+        with patch.object(service, 'generate_recommendations', side_effect=RuntimeError('dataset unavailable')):
+            job = execute_job(claim_next_job('worker-1'), service=service)
+        
+        self.assertEqual(job.id, second.id)
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.error, 'dataset unavailable')
+        self.assertIsNone(claim_next_job('worker-1'))
+
+
+class ConcurrentLLMScoringTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            username='testuser',
+            first_name='Test',
+            last_name='User'
+        )
+        cache.clear()
+        rationale_cache.clear_local()
+        rationale_cache.reset_stats()
+    
+    def start_server(self, default_latency, latency=None):
+        server = start_fake_llm_server(default_latency, latency)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+    
+    def run_service(self, server, candidates, top_n, **llm_settings):
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        with override_settings(EXTERNAL_LLM_API_URL=url, **llm_settings), \
+                patch('apps.recommendations.services.DatasetService') as mock_dataset_service:
+            mock_dataset_service.return_value.get_matching_universities.return_value = candidates
+            service = RecommendationService()
+            
+            start = time.monotonic()
+            recommendations = service.generate_recommendations(
+                user=self.user,
+                filters={},
+                weights={'academics': 1.0},
+                top_n=top_n
+            )
+            return recommendations, time.monotonic() - start
+    
+    def test_llm_calls_fan_out_with_bounded_concurrency(self):
+        """Test scoring and rationale calls overlap but never exceed the in-flight limit."""
+        server = self.start_server(default_latency=0.2)
+        candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US'}
+            for i in range(8)
+        ]
+        
+        recommendations, elapsed = self.run_service(
+            server, candidates, top_n=4,
+            LLM_MAX_IN_FLIGHT=4, LLM_CALL_TIMEOUT=5, LLM_RECOMMENDATION_DEADLINE=10,
+            LLM_BATCH_SCORING=False
+        )
+        
+        # 12 calls of 0.2s run serially would take 2.4s
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(server.max_in_flight, 4)
+        self.assertEqual(len(recommendations), 4)
+        self.assertTrue(all(r.score == 0.8 for r in recommendations))
+        self.assertTrue(all(r.rationale.startswith('LLM rationale for') for r in recommendations))
+        
+        # Only the prompt fields leave the service
+        match_calls = [payload for path, payload in server.calls if path.endswith('/score-match')]
+        self.assertEqual(len(match_calls), 8)
+        self.assertNotIn('email', match_calls[0]['user_profile'])
+    
+    def test_slow_calls_fall_back_at_timeout(self):
+        """Test a call past its timeout gets the fallback score and rationale."""
+        server = self.start_server(default_latency=0.05, latency={'Slow University': 5})
+        candidates = [
+            {'id': 'openalex_1', 'display_name': 'Fast University', 'country_code': 'US'},
+            {'id': 'openalex_2', 'display_name': 'Slow University', 'country_code': 'CA'},
+        ]
+        
+        recommendations, elapsed = self.run_service(
+            server, candidates, top_n=2,
+            LLM_MAX_IN_FLIGHT=4, LLM_CALL_TIMEOUT=0.3, LLM_RECOMMENDATION_DEADLINE=10,
+            LLM_BATCH_SCORING=False
+        )
+        
+        self.assertLess(elapsed, 2.0)
+        by_ref = {r.university_ref: r for r in recommendations}
+        self.assertEqual(by_ref['openalex_1'].score, 0.8)
+        self.assertEqual(by_ref['openalex_1'].rationale, 'LLM rationale for Fast University')
+        # Rule-based fallbacks for the university the LLM never answered for
+        self.assertEqual(by_ref['openalex_2'].score, 0.5)
+        self.assertEqual(by_ref['openalex_2'].rationale, 'Slow University is recommended for its located in CA.')
+    
+    def test_overall_deadline_bounds_the_run(self):
+        """Test calls not finished by the overall deadline fall back."""
+        server = self.start_server(default_latency=1.0)
+        candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US'}
+            for i in range(6)
+        ]
+        
+        recommendations, elapsed = self.run_service(
+            server, candidates, top_n=3,
+            LLM_MAX_IN_FLIGHT=2, LLM_CALL_TIMEOUT=5, LLM_RECOMMENDATION_DEADLINE=0.5
+        )
+        
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(len(recommendations), 3)
+        self.assertTrue(all(r.score == 0.5 for r in recommendations))
+    
+    def test_batch_scoring_sends_profile_once(self):
+        """Test all candidates are scored in one batched request."""
+        server = self.start_server(default_latency=0.05)
+        candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US'}
+            for i in range(8)
+        ]
+        
+        recommendations, _ = self.run_service(
+            server, candidates, top_n=4,
+            LLM_MAX_IN_FLIGHT=4, LLM_CALL_TIMEOUT=5, LLM_RECOMMENDATION_DEADLINE=10
+        )
+        
+        batch_calls = [payload for path, payload in server.calls if path.endswith('/score-batch')]
+        self.assertEqual(len(batch_calls), 1)
+        self.assertEqual(batch_calls[0]['university_ids'], [c['id'] for c in candidates])
+        self.assertEqual(batch_calls[0]['prompt'].count('## STUDENT ACADEMIC PROFILE'), 1)
+        self.assertTrue(all(r.score == 0.8 for r in recommendations))
+    
+    def test_batch_split_by_token_budget(self):
+        """Test batches over the token budget are split in order."""
+        from apps.llm.services import LLMService, estimate_tokens
+        
+        candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US'}
+            for i in range(10)
+        ]
+        service = LLMService()
+        one = estimate_tokens(service.create_batch_scoring_prompt(candidates[:1], {}))
+        three = estimate_tokens(service.create_batch_scoring_prompt(candidates[:3], {}))
+        
+        with override_settings(LLM_BATCH_TOKEN_BUDGET=three):
+            batches = LLMService().plan_scoring_batches(candidates, {})
+        
+        self.assertGreater(three, one)
+        self.assertEqual([len(batch) for batch in batches], [2, 3, 2, 3])
+        self.assertEqual([c['id'] for batch in batches for c in batch], [c['id'] for c in candidates])
+    
+    def test_parse_batch_scores(self):
+        """Test malformed or missing batch scores come back as None."""
+        from apps.llm.services import LLMService
+        
+        universities = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+        service = LLMService()
+        
+        self.assertEqual(
+            service.parse_batch_scores('[{"id": "b", "score": 1.4}, {"id": "a", "score": "0.3"}]', universities),
+            [0.3, 1.0, None]
+        )
+        self.assertEqual(service.parse_batch_scores([0.1, 0.2, 0.3], universities), [0.1, 0.2, 0.3])
+        self.assertEqual(service.parse_batch_scores('no scores', universities), [None, None, None])
+    
+    def test_identical_profiles_share_cached_rationales(self):
+        """Test a second student with the same academic profile reuses cached rationales."""
+        server = self.start_server(default_latency=0)
+        candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US'}
+            for i in range(3)
+        ]
+        
+        self.run_service(server, candidates, top_n=3)
+        self.user = User.objects.create_user(email='other@example.com', password='testpass123', username='other')
+        recommendations, _ = self.run_service(server, candidates, top_n=3)
+        
+        rationale_calls = [payload for path, payload in server.calls if path.endswith('/generate-rationale')]
+        self.assertEqual(len(rationale_calls), 3)
+        self.assertNotIn('email', rationale_calls[0]['user_profile'])
+        self.assertEqual(recommendations[0].rationale, 'LLM rationale for University 0')
+        
+        stats = rationale_cache.stats()
+        self.assertEqual(stats['local_hits'], 3)
+        self.assertEqual(stats['misses'], 3)
+        
+        # Another worker process only sees the shared tier
+        rationale_cache.clear_local()
+        self.user = User.objects.create_user(email='third@example.com', password='testpass123', username='third')
+        self.run_service(server, candidates, top_n=3)
+        self.assertEqual(rationale_cache.stats()['shared_hits'], 3)
+        self.assertEqual(len(server.calls), len(rationale_calls) + 3)
+
+
+class LLMCacheKeyTest(TestCase):
+    def test_key_ignores_field_order(self):
+        """Test cache keys depend on content, not dict ordering."""
+        first = make_cache_key('rationale', 1, {'weights': {'a': 1.0, 'b': 0.5}, 'profile': {'gpa': 3.5}})
+        second = make_cache_key('rationale', 1, {'profile': {'gpa': 3.5}, 'weights': {'b': 0.5, 'a': 1.0}})
+        
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('llm:rationale:v1:'))
+        self.assertNotEqual(first, make_cache_key('rationale', 1, {'profile': {'gpa': 3.6}, 'weights': {'a': 1.0, 'b': 0.5}}))
+        self.assertNotEqual(first, make_cache_key('rationale', 2, {'profile': {'gpa': 3.5}, 'weights': {'a': 1.0, 'b': 0.5}}))
+    
+    def test_key_is_stable_across_processes(self):
+        """Test processes with different hash seeds compute the same key."""
+        script = "from apps.llm.cache import make_cache_key; print(make_cache_key('rationale', 1, {'profile': {'gpa': 3.5}}))"
+        keys = set()
+        for seed in ('1', '2'):
+            result = subprocess.run(
+                [sys.executable, '-c', f"import django; django.setup(); {script}"],
+                capture_output=True, text=True, check=True,
+                env={**os.environ, 'PYTHONHASHSEED': seed}
+            )
+            keys.add(result.stdout.strip())
+        
+        self.assertEqual(keys, {make_cache_key('rationale', 1, {'profile': {'gpa': 3.5}})})
+
+
+def parse_events(body):
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class RecommendationStreamTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            username='testuser',
+            first_name='Test',
+            last_name='User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.candidates = [
+            {'id': f'openalex_{i}', 'display_name': f'University {i}', 'country_code': 'US', 'score': 0.7 - i / 10}
+            for i in range(3)
+        ]
+        cache.clear()
+        rationale_cache.clear_local()
+        
+        dataset_patch = patch('apps.recommendations.services.DatasetService')
+        mock_dataset_service = dataset_patch.start()
+        self.addCleanup(dataset_patch.stop)
+        mock_dataset_service.return_value.get_matching_universities.side_effect = (
+            lambda **kwargs: [dict(candidate) for candidate in self.candidates]
+        )
+    
+    def test_stream_sends_candidates_then_rationales_as_they_finish(self):
+        """Test the ranked list comes first and rationales arrive in completion order."""
+        server = start_fake_llm_server(default_latency=0.05, latency={'University 0': 0.4})
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        
+        with override_settings(EXTERNAL_LLM_API_URL=f'http://127.0.0.1:{server.server_address[1]}'):
+            response = self.client.post('/api/recommendations/stream/', {'top_n': 3}, format='json')
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            events = parse_events(b''.join(response.streaming_content).decode())
+        
+        self.assertEqual([event for event, _ in events], ['candidates', 'rationale', 'rationale', 'rationale', 'done'])
+        self.assertEqual([c['id'] for c in events[0][1]['candidates']], ['openalex_0', 'openalex_1', 'openalex_2'])
+        self.assertEqual(events[0][1]['candidates'][0]['rank'], 1)
+        
+        # The slow first-ranked university is the last rationale to arrive
+        self.assertEqual(events[3][1], {'rank': 1, 'id': 'openalex_0', 'rationale': 'LLM rationale for University 0'})
+        self.assertEqual(len(events[4][1]['data']), 3)
+        self.assertEqual(Recommendation.objects.filter(user=self.user).count(), 3)
+    
+    async def test_stream_is_async_under_asgi(self):
+        """Test ASGI requests get an async event stream."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            '/api/recommendations/stream/', {'top_n': 2}, content_type='application/json'
+        )
+        
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        events = parse_events(body)
+        self.assertEqual([event for event, _ in events], ['candidates', 'rationale', 'rationale', 'done'])
+        self.assertEqual(events[1][1]['rationale'], 'University 0 is recommended for its located in US.')
+    
+    def test_stream_reports_errors(self):
+        """Test failures after the stream started end with an error event."""
+        with patch.object(RecommendationService, 'save_run', side_effect=RuntimeError('database unavailable')):
+            response = self.client.post('/api/recommendations/stream/', {'top_n': 1}, format='json')
+            events = parse_events(b''.join(response.streaming_content).decode())
+        
+        self.assertEqual(events[-1][0], 'error')
+        self.assertEqual(events[-1][1]['details'], 'database unavailable')
+
+
 class RecommendationAPITest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -159,3 +694,49 @@ class RecommendationAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsNotNone(response.data['data'])
         self.assertIsNone(response.data['error'])
+
+    def test_cache_stats_requires_admin(self):
+        """Test only staff can read the recommendation cache stats."""
+        response = self.client.get('/api/recommendations/cache/stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/recommendations/cache/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_ratio', response.data['data']['results'])
+        self.assertIn('hit_rate', response.data['data']['rationales'])
+
+    def test_recommendation_jobs(self):
+        """Test job submission returns immediately, deduplicates and reports results."""
+        data = {'filters': {'country': 'US'}, 'weights': {'academics': 0.5}, 'top_n': 10}
+        
+        response = self.client.post('/api/recommendations/jobs/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['data']['status'], 'PENDING')
+        self.assertFalse(response.data['meta']['deduplicated'])
+        job_id = response.data['data']['id']
+        
+        response = self.client.post('/api/recommendations/jobs/', data, format='json')
+        self.assertEqual(response.data['data']['id'], job_id)
+        self.assertTrue(response.data['meta']['deduplicated'])
+        
+        response = self.client.get(f'/api/recommendations/jobs/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['meta']['completed'])
+        
+        service = RecommendationService()
+        with patch.object(service, 'generate_recommendations', side_effect=lambda user, filters, weights, top_n: service.save_run(
+            user, filters, weights, top_n, [{'id': 'openalex_1', 'score': 0.9}], ['Great match']
+        )):
+            execute_job(claim_next_job('worker-1'), service=service)
+        
+        response = self.client.get(f'/api/recommendations/jobs/{job_id}/', {'wait': 5})
+        self.assertTrue(response.data['meta']['completed'])
+        self.assertEqual(response.data['data']['status'], 'SUCCESS')
+        self.assertEqual(response.data['data']['recommendations'][0]['university_ref'], 'openalex_1')
+        
+        other = User.objects.create_user(email='other@example.com', password='testpass123', username='other')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(f'/api/recommendations/jobs/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import RecommendationListView, run_recommendations
+from .views import (
+    RecommendationListView, run_recommendations, stream_recommendations,
+    submit_recommendation_job, get_recommendation_job, recommendation_cache_stats
+)
 
 app_name = 'recommendations'
 
 urlpatterns = [
     path('', RecommendationListView.as_view(), name='recommendation-list'),
     path('run/', run_recommendations, name='run-recommendations'),
+    path('stream/', stream_recommendations, name='stream-recommendations'),
+    path('jobs/', submit_recommendation_job, name='recommendation-job-submit'),
+    path('jobs/<uuid:job_id>/', get_recommendation_job, name='recommendation-job-detail'),
+    path('cache/stats/', recommendation_cache_stats, name='recommendation-cache-stats'),
 ]
@@ -1,12 +1,26 @@
+import json
+
+from asgiref.sync import sync_to_async
+from djangorestframework_camel_case.util import camelize
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Recommendation
-from .serializers import RecommendationSerializer, RecommendationRequestSerializer
+from .models import Recommendation, RecommendationJob
+from .serializers import (
+    RecommendationSerializer, RecommendationRequestSerializer,
+    RecommendationJobSerializer, RecommendationJobWaitSerializer
+)
+from ..dataset.engine import get_base_path, read_current_version
 from ..dataset.services import DatasetService
+from ..llm.cache import rationale_cache
+from .cache import cache_stats
+from .jobs import submit_job, wait_for_job
 from .services import RecommendationService
 
 
@@ -25,7 +39,7 @@ class RecommendationListView(generics.ListAPIView):
     
     def get_queryset(self):
         """Get recommendations for the current user."""
-        return Recommendation.objects.filter(user=self.request.user)
+        return Recommendation.objects.filter(user=self.request.user).select_related('run')
     
     def list(self, request, *args, **kwargs):
         """List recommendations with standard error envelope."""
@@ -121,3 +135,196 @@ def run_recommendations(request):
                 'details': str(e)
             }
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_recommendation_job(request):
+    """Queue recommendation generation and return the job without waiting for it."""
+    try:
+        serializer = RecommendationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'data': None,
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'Invalid request data',
+                    'details': serializer.errors
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        validated_data = serializer.validated_data
+        job, created = submit_job(
+            request.user,
+            filters=validated_data.get('filters', {}),
+            weights=validated_data.get('weights', {}),
+            top_n=validated_data.get('top_n', 20)
+        )
+        
+        return Response({
+            'data': RecommendationJobSerializer(job).data,
+            'error': None,
+            'meta': {
+                'deduplicated': not created
+            }
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except Exception as e:
+        return Response({
+            'data': None,
+            'error': {
+                'code': 'JOB_ERROR',
+                'message': 'Error queuing recommendation job',
+                'details': str(e)
+            }
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommendation_job(request, job_id):
+    """Return a job's status, waiting up to ``wait`` seconds for it to finish."""
+    job = get_object_or_404(RecommendationJob, id=job_id, user=request.user)
+    
+    serializer = RecommendationJobWaitSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response({
+            'data': None,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid query parameters',
+                'details': serializer.errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        wait = serializer.validated_data['wait']
+        if wait:
+            job = wait_for_job(job, wait)
+        
+        return Response({
+            'data': RecommendationJobSerializer(job).data,
+            'error': None,
+            'meta': {
+                'completed': job.is_completed
+            }
+        })
+        
+    except Exception as e:
+        return Response({
+            'data': None,
+            'error': {
+                'code': 'JOB_ERROR',
+                'message': 'Error retrieving recommendation job',
+                'details': str(e)
+            }
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def recommendation_cache_stats(request):
+    """Return result cache hit ratio (all processes) and rationale cache stats (this process)."""
+    return Response({
+        'data': {
+            'results': cache_stats(),
+            'rationales': rationale_cache.stats(),
+        },
+        'error': None,
+        'meta': {
+            'dataset_version': read_current_version(get_base_path())
+        }
+    })
+
+
+# University fields sent with the ranked candidate list
+CANDIDATE_FIELDS = ('id', 'display_name', 'country_code', 'webometrics_rank', 'score')
+
+
+def format_event(event, data):
+    """Encode one Server-Sent Event with a camelCase JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(camelize(data), cls=DjangoJSONEncoder)}\n\n"
+
+
+async def iterate_in_thread(events):
+    """Drive a synchronous event iterator from ASGI, one event at a time."""
+    next_event = sync_to_async(next, thread_sensitive=True)
+    while True:
+        event = await next_event(events, None)
+        if event is None:
+            return
+        yield event
+
+
+def recommendation_events(recommendation_service, user, filters, weights, top_n):
+    """Yield the SSE stream for one recommendation run."""
+    try:
+        for event, data in recommendation_service.stream_recommendations(user, filters, weights, top_n):
+            if event == 'candidates':
+                candidates = [
+                    dict({field: university.get(field) for field in CANDIDATE_FIELDS}, rank=rank)
+                    for rank, university in enumerate(data, start=1)
+                ]
+                yield format_event('candidates', {'candidates': candidates, 'count': len(candidates)})
+            elif event == 'rationale':
+                index, rationale = data
+                yield format_event('rationale', {
+                    'rank': index + 1,
+                    'id': candidates[index]['id'],
+                    'rationale': rationale
+                })
+            elif event == 'done':
+                yield format_event('done', {
+                    'data': RecommendationSerializer(data, many=True).data,
+                    'meta': {
+                        'count': len(data),
+                        'filters_applied': filters,
+                        'weights_used': weights
+                    }
+                })
+    except Exception as e:
+        yield format_event('error', {
+            'code': 'RECOMMENDATION_ERROR',
+            'message': 'Error generating recommendations',
+            'details': str(e)
+        })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_recommendations(request):
+    """
+    Generate new recommendations, streaming progress as Server-Sent Events.
+    
+    Sends ``candidates`` (the ranked list) as soon as scoring finishes, one
+    ``rationale`` event per university as each is generated, then ``done``
+    with the saved recommendations (or ``error``).
+    """
+    serializer = RecommendationRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'data': None,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid request data',
+                'details': serializer.errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    validated_data = serializer.validated_data
+    events = recommendation_events(
+        RecommendationService(),
+        request.user,
+        filters=validated_data.get('filters', {}),
+        weights=validated_data.get('weights', {}),
+        top_n=validated_data.get('top_n', 20)
+    )
+    
+    # Under ASGI the stream must be an async iterator to be sent incrementally
+    if isinstance(request._request, ASGIRequest):
+        events = iterate_in_thread(events)
+    
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -2,6 +2,11 @@
 ASGI config for UniQuest project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it (e.g. ``gunicorn -k uvicorn.workers.UvicornWorker asgi:application``)
+for /api/recommendations/stream/ to flush each event as soon as it is
+produced, without a slow stream occupying a whole gunicorn sync worker. The
+events are still generated synchronously, so each open stream holds a
+``sync_to_async`` thread while it waits on the LLM.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
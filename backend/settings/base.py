@@ -101,6 +101,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Writers (requests and recommendation job workers) queue for the
+        # write lock up front instead of failing with "database is locked"
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -220,14 +226,55 @@ SPECTACULAR_SETTINGS = {
 DATASET_BASE_PATH = env('DATASET_BASE_PATH', default='/data')
 DATASET_CURRENT_VERSION = env('DATASET_CURRENT_VERSION', default='2025.09')
 
+# Seconds before a dataset version that failed to load is built again
+# (rewriting the ``current`` pointer retries at once)
+DATASET_ENGINE_RETRY_SECONDS = env.int('DATASET_ENGINE_RETRY_SECONDS', default=60)
+
+# Seconds search facet counts are cached per dataset version and filters
+DATASET_FACET_CACHE_TIMEOUT = env.int('DATASET_FACET_CACHE_TIMEOUT', default=3600)
+
+# Seconds clients and proxies may reuse university responses before revalidating
+DATASET_HTTP_MAX_AGE = env.int('DATASET_HTTP_MAX_AGE', default=300)
+
+# Rendered university responses: per-worker LRU size in bytes, whether the
+# shared cache also holds them, and their lifetime there in seconds
+DATASET_RESPONSE_CACHE_BYTES = env.int('DATASET_RESPONSE_CACHE_BYTES', default=32 * 1024 * 1024)
+DATASET_RESPONSE_CACHE_SHARED = env.bool('DATASET_RESPONSE_CACHE_SHARED', default=False)
+DATASET_RESPONSE_CACHE_TIMEOUT = env.int('DATASET_RESPONSE_CACHE_TIMEOUT', default=3600)
+
+# Seconds the readiness probe waits for its dataset and database checks
+HEALTH_CHECK_TIMEOUT = env.float('HEALTH_CHECK_TIMEOUT', default=2.0)
+
 # DuckDB Configuration
 DUCKDB_MEMORY_LIMIT = env('DUCKDB_MEMORY_LIMIT', default='2GB')
 DUCKDB_THREADS = env.int('DUCKDB_THREADS', default=4)
 
 # External LLM API Settings (for your own API integration)
-# TODO: Configure your LLM API endpoint and credentials here
-# EXTERNAL_LLM_API_URL = env('EXTERNAL_LLM_API_URL', default='https://your-llm-api.com')
-# EXTERNAL_LLM_API_KEY = env('EXTERNAL_LLM_API_KEY', default=None)
+# Leave EXTERNAL_LLM_API_URL unset to use the built-in fallback scoring and rationales
+EXTERNAL_LLM_API_URL = env('EXTERNAL_LLM_API_URL', default=None)
+EXTERNAL_LLM_API_KEY = env('EXTERNAL_LLM_API_KEY', default=None)
+
+# Concurrency limits for LLM calls made while generating recommendations
+LLM_MAX_IN_FLIGHT = env.int('LLM_MAX_IN_FLIGHT', default=8)
+LLM_CALL_TIMEOUT = env.float('LLM_CALL_TIMEOUT', default=10.0)
+LLM_RECOMMENDATION_DEADLINE = env.float('LLM_RECOMMENDATION_DEADLINE', default=30.0)
+
+# Score many universities per LLM request, splitting batches over the token budget
+LLM_BATCH_SCORING = env.bool('LLM_BATCH_SCORING', default=True)
+LLM_BATCH_TOKEN_BUDGET = env.int('LLM_BATCH_TOKEN_BUDGET', default=4000)
+
+# Entries kept in each worker's in-process LLM cache (in front of CACHES['default'])
+LLM_CACHE_LOCAL_SIZE = env.int('LLM_CACHE_LOCAL_SIZE', default=1024)
+
+# Recommendation jobs: worker threads per web process (0 = only run_recommendation_workers),
+# idle poll interval, longest long-poll wait and time before a running job is failed (seconds)
+RECOMMENDATION_JOB_WORKERS = env.int('RECOMMENDATION_JOB_WORKERS', default=2)
+RECOMMENDATION_JOB_POLL_INTERVAL = env.float('RECOMMENDATION_JOB_POLL_INTERVAL', default=1.0)
+RECOMMENDATION_JOB_MAX_WAIT = env.float('RECOMMENDATION_JOB_MAX_WAIT', default=20.0)
+RECOMMENDATION_JOB_TIMEOUT = env.int('RECOMMENDATION_JOB_TIMEOUT', default=300)
+
+# Seconds a repeated recommendation request is served from the result cache
+RECOMMENDATION_RESULT_CACHE_TIMEOUT = env.int('RECOMMENDATION_RESULT_CACHE_TIMEOUT', default=86400)
 
 # Logging Configuration
 LOG_LEVEL = env('LOG_LEVEL', default='INFO')
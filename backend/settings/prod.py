@@ -44,6 +44,7 @@ DATABASES = {
         'NAME': BASE_DIR / DB_NAME,
         'OPTIONS': {
             'timeout': 20,  # Prevent database locked errors
+            'transaction_mode': 'IMMEDIATE',  # Take the write lock at BEGIN so waits honor the timeout
         },
     }
 }
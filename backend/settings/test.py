@@ -66,6 +66,9 @@ CACHES = {
     }
 }
 
+# Recommendation jobs are executed explicitly in tests
+RECOMMENDATION_JOB_WORKERS = 0
+
 # Dataset path for tests
 DATASET_BASE_PATH = '/tmp/test_data'
 